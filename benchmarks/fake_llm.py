@@ -0,0 +1,203 @@
+"""Deterministic, scripted chat model for offline tests and benchmarks."""
+import asyncio
+import json
+import random
+import re
+import time
+import uuid
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence
+
+from langchain_core.callbacks import (
+    AsyncCallbackManagerForLLMRun,
+    CallbackManagerForLLMRun,
+)
+from langchain_core.language_models import BaseChatModel
+from langchain_core.messages import (
+    AIMessage,
+    AIMessageChunk,
+    BaseMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+
+# A script maps the conversation so far to the next assistant message
+Script = Callable[[Sequence[BaseMessage]], AIMessage]
+
+
+def tool_call(name: str, **args: Any) -> Dict[str, Any]:
+    """Builds a tool call with a fresh id."""
+    return {"name": name, "args": args, "id": f"call_{uuid.uuid4().hex[:12]}"}
+
+
+def sales_script(messages: Sequence[BaseMessage]) -> AIMessage:
+    """
+    Rule-based assistant covering the main customer journeys.
+
+    Keywords in the customer's message pick the tool calls (search, order,
+    order status, categories, recommendations); tool results are answered
+    with a short text summary.
+    """
+    # The prompt's system messages (instructions, per-call context) are not
+    # part of the conversation
+    messages = [m for m in messages if not isinstance(m, SystemMessage)]
+    last = messages[-1]
+    if isinstance(last, ToolMessage):
+        results = []
+        for message in reversed(messages):
+            if not isinstance(message, ToolMessage):
+                break
+            results.append(f"{message.name or 'tool'} returned {len(str(message.content))} characters")
+        return AIMessage(
+            content="Here is what I found for you: " + "; ".join(reversed(results)) + "."
+        )
+
+    text = last.content.lower() if isinstance(last, HumanMessage) else ""
+    calls = []
+    if "status" in text:
+        calls.append(tool_call("check_order_status", order_id=None))
+    elif match := re.search(r"(?:order|buy)\s+(\d+)?\s*(?:x\s+)?(.+)", text):
+        quantity = int(match.group(1) or 1)
+        calls.append(
+            tool_call(
+                "create_order",
+                products=[{"ProductName": match.group(2).strip(), "Quantity": quantity}],
+            )
+        )
+    else:
+        if "categor" in text:
+            calls.append(tool_call("get_available_categories"))
+        if match := re.search(r"(?:looking for|search|find)\s+(.+)", text):
+            calls.append(tool_call("search_products", query=match.group(1).strip()))
+        if "recommend" in text:
+            calls.append(tool_call("search_products_recommendations"))
+
+    if calls:
+        return AIMessage(content="", tool_calls=calls)
+    return AIMessage(content="Happy to help! What are you looking for today?")
+
+
+class ScriptedChatModel(BaseChatModel):
+    """
+    Chat model whose replies come from a script instead of an API.
+
+    Replies are deterministic for a given conversation. Latency is simulated
+    per call (time to first token) and per streamed token, drawn from a
+    seeded normal distribution, so graph, tool and checkpointer overhead
+    can be measured without network access.
+    """
+
+    script: Script = sales_script
+    first_token_latency_ms: float = 0.0
+    token_latency_ms: float = 0.0
+    latency_jitter: float = 0.2
+    seed: int = 0
+    calls: int = 0
+
+    _rng: Any = None
+
+    @property
+    def _llm_type(self) -> str:
+        return "scripted-chat-model"
+
+    def bind_tools(self, tools: Sequence[Any], **kwargs: Any):
+        """Accepts the tools like a real model; the script decides the calls."""
+        return self
+
+    def _delay(self, mean_ms: float) -> float:
+        if mean_ms <= 0:
+            return 0.0
+        if self._rng is None:
+            self._rng = random.Random(self.seed)
+        sigma = mean_ms * self.latency_jitter
+        return max(0.0, self._rng.gauss(mean_ms, sigma)) / 1000
+
+    def _reply(self, messages: List[BaseMessage]) -> AIMessage:
+        self.calls += 1
+        message = self.script(messages)
+        if message.id is None:
+            message.id = f"run-{uuid.uuid4()}"
+        return message
+
+    @staticmethod
+    def _tokens(message: AIMessage) -> List[str]:
+        return re.findall(r"\S+\s*", message.content) if isinstance(message.content, str) else []
+
+    def _chunks(self, message: AIMessage) -> Iterator[AIMessageChunk]:
+        for token in self._tokens(message):
+            yield AIMessageChunk(content=token, id=message.id)
+        if message.tool_calls:
+            yield AIMessageChunk(
+                content="",
+                id=message.id,
+                tool_call_chunks=[
+                    {
+                        "name": tc["name"],
+                        "args": json.dumps(tc["args"]),
+                        "id": tc["id"],
+                        "index": i,
+                    }
+                    for i, tc in enumerate(message.tool_calls)
+                ],
+            )
+
+    def _generate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = self._reply(messages)
+        time.sleep(
+            self._delay(self.first_token_latency_ms)
+            + sum(self._delay(self.token_latency_ms) for _ in self._tokens(message))
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    async def _agenerate(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> ChatResult:
+        message = self._reply(messages)
+        await asyncio.sleep(
+            self._delay(self.first_token_latency_ms)
+            + sum(self._delay(self.token_latency_ms) for _ in self._tokens(message))
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _stream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[CallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> Iterator[ChatGenerationChunk]:
+        message = self._reply(messages)
+        time.sleep(self._delay(self.first_token_latency_ms))
+        for chunk in self._chunks(message):
+            time.sleep(self._delay(self.token_latency_ms))
+            if run_manager and chunk.content:
+                run_manager.on_llm_new_token(chunk.content, chunk=ChatGenerationChunk(message=chunk))
+            yield ChatGenerationChunk(message=chunk)
+
+    async def _astream(
+        self,
+        messages: List[BaseMessage],
+        stop: Optional[List[str]] = None,
+        run_manager: Optional[AsyncCallbackManagerForLLMRun] = None,
+        **kwargs: Any,
+    ) -> AsyncIterator[ChatGenerationChunk]:
+        message = self._reply(messages)
+        await asyncio.sleep(self._delay(self.first_token_latency_ms))
+        for chunk in self._chunks(message):
+            await asyncio.sleep(self._delay(self.token_latency_ms))
+            if run_manager and chunk.content:
+                await run_manager.on_llm_new_token(
+                    chunk.content, chunk=ChatGenerationChunk(message=chunk)
+                )
+            yield ChatGenerationChunk(message=chunk)
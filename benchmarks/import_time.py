@@ -0,0 +1,117 @@
+"""
+Cold-start import budget check for the agent modules.
+
+Runs `python -X importtime -c "import <module>"` in a fresh interpreter and
+reports the cumulative import time, the slowest imports, and any heavy
+modules (pandas, the OpenAI client, Streamlit, ...) that should only load
+lazily. Exits with 1 when the budget is exceeded or a forbidden module is
+imported, so it can run in CI.
+
+Usage:
+    python -m benchmarks.import_time services.api --budget-ms 1500
+"""
+import argparse
+import os
+import subprocess
+import sys
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+DEFAULT_MODULES = (
+    "virtual_sales_agent.graph",
+    "virtual_sales_agent.tools",
+    "services.graph_service",
+    "services.api",
+)
+
+# Modules that must only be imported on the code paths that need them
+FORBIDDEN_MODULES = (
+    "pandas",
+    "pyarrow",
+    "numpy",
+    "langchain_openai",
+    "openai",
+    "streamlit",
+    "tiktoken",
+)
+
+
+@dataclass
+class ImportReport:
+    """Import timings of one module, in milliseconds."""
+
+    module: str
+    cumulative_ms: float
+    imported: Dict[str, float] = field(default_factory=dict)
+
+    def slowest(self, n: int = 10) -> List[tuple]:
+        return sorted(self.imported.items(), key=lambda kv: -kv[1])[:n]
+
+    def forbidden(self, names: Sequence[str] = FORBIDDEN_MODULES) -> List[str]:
+        return [name for name in names if name in self.imported]
+
+
+def measure(module: str, python: str = sys.executable) -> ImportReport:
+    """
+    Imports a module in a fresh interpreter and parses -X importtime output.
+
+    Args:
+        module (str): Dotted module name
+        python (str): Interpreter to use
+
+    Returns:
+        ImportReport: Cumulative time and per-module self times.
+    """
+    # Import from a clean slate: no credentials needed and no tracing
+    env = {
+        key: value
+        for key, value in os.environ.items()
+        if not key.startswith(("LANGSMITH_", "LANGCHAIN_", "OPENAI_"))
+    }
+    result = subprocess.run(
+        [python, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+        env=env,
+        cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+
+    imported: Dict[str, float] = {}
+    cumulative = 0.0
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "self [us]" in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|", 2)
+        name = name.strip()
+        imported[name] = int(self_us) / 1000
+        if name == module:
+            cumulative = int(cumulative_us) / 1000
+    return ImportReport(module, cumulative, imported)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Check cold-start import time.")
+    parser.add_argument("modules", nargs="*", default=list(DEFAULT_MODULES))
+    parser.add_argument("--budget-ms", type=float, default=2000.0, help="Maximum cumulative import time")
+    parser.add_argument("--top", type=int, default=5, help="Slowest imports to show")
+    args = parser.parse_args(argv)
+
+    failed = False
+    for module in args.modules:
+        report = measure(module)
+        forbidden = report.forbidden()
+        over = report.cumulative_ms > args.budget_ms
+        status = "FAIL" if over or forbidden else "ok"
+        print(f"{status:<5}{module}: {report.cumulative_ms:.0f} ms (budget {args.budget_ms:.0f} ms)")
+        for name, ms in report.slowest(args.top):
+            print(f"       {ms:8.1f} ms  {name}")
+        if forbidden:
+            print(f"       eagerly imports: {', '.join(forbidden)}")
+        failed = failed or over or bool(forbidden)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
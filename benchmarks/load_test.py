@@ -0,0 +1,327 @@
+"""
+End-to-end load benchmark for the sales agent graph.
+
+Drives N simulated customers concurrently through search, order (with the
+approval step) and order-status turns. It uses the real graph, tools and
+SQLite checkpointer, with the scripted chat model in place of OpenAI and a
+scratch copy of the store database. Nothing leaves the machine and the
+committed database is never modified.
+
+Usage:
+    python -m benchmarks.load_test --customers 50 --concurrency 20 \\
+        --first-token-ms 300 --token-ms 10 --json report.json
+"""
+import argparse
+import asyncio
+import json
+import math
+import resource
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Sequence
+
+from langchain_core.messages import HumanMessage
+
+DEFAULT_JOURNEY = (
+    "I'm looking for a gaming mouse",
+    "Show me your categories and recommend something",
+    "Order 1 Logitech G502 HERO",
+    "What is the status of my orders?",
+)
+
+
+@dataclass
+class TurnResult:
+    """Outcome of one request to the graph."""
+
+    kind: str
+    latency: float
+    ok: bool = True
+    error: Optional[str] = None
+
+
+def percentile(values: Sequence[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = math.ceil(pct / 100 * len(ordered))
+    return ordered[max(0, min(len(ordered), rank) - 1)]
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and kilobytes on Linux
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def build_environment(workdir: Path, args: argparse.Namespace):
+    """
+    Builds a graph wired to scratch databases and the scripted model.
+
+    Returns:
+        tuple: (graph, cleanup callable)
+    """
+    from benchmarks.fake_llm import ScriptedChatModel
+    from database.config import DEFAULT_CONFIG, DatabaseConfig
+    from database.db_manager import DatabaseManager
+    from database.order_writer import OrderWriter
+    from virtual_sales_agent import tools
+    from virtual_sales_agent.checkpointer import SqliteCheckpointer
+    from virtual_sales_agent.graph import build_graph
+    from virtual_sales_agent.recommender import RecommendationEngine
+
+    store_path = workdir / "store.db"
+    shutil.copy(DEFAULT_CONFIG.db_path, store_path)
+    db_manager = DatabaseManager(
+        DatabaseConfig(
+            db_name="store.db",
+            db_path=str(store_path),
+            pool_size=max(DEFAULT_CONFIG.pool_size, args.concurrency),
+        )
+    )
+    db_manager.run_migrations()
+    with db_manager.get_connection() as conn:
+        # Enough stock that every simulated order can succeed
+        conn.execute("UPDATE products SET Quantity = Quantity + ?", (args.customers * 10,))
+        conn.commit()
+
+    order_writer = OrderWriter(db_manager)
+    tools.db_manager = db_manager
+    tools.order_writer = order_writer
+    tools.recommender = RecommendationEngine(db_manager)
+
+    checkpointer = SqliteCheckpointer(
+        DatabaseConfig(db_name="checkpoints.db", db_path=str(workdir / "checkpoints.db")),
+        prune_interval=0,
+    )
+    llm = ScriptedChatModel(
+        first_token_latency_ms=args.first_token_ms,
+        token_latency_ms=args.token_ms,
+        latency_jitter=args.jitter,
+        seed=args.seed,
+    )
+
+    def cleanup():
+        order_writer.close()
+        checkpointer.close()
+        db_manager.close()
+
+    compact = not getattr(args, "raw_tool_results", False)
+    return build_graph(llm, checkpointer, compact_tool_results=compact), cleanup
+
+
+def _config(run_id: str, customer: int) -> Dict[str, Any]:
+    return {
+        "configurable": {
+            "customer_id": f"load-{customer}",
+            "thread_id": f"{run_id}-{customer}",
+        }
+    }
+
+
+async def run_customer_async(
+    graph: Any, run_id: str, customer: int, journey: Sequence[str]
+) -> List[TurnResult]:
+    """Runs one customer's journey on the event loop."""
+    config = _config(run_id, customer)
+    results = []
+    for message in journey:
+        payload = {"messages": [HumanMessage(content=message)]}
+        kind = "chat"
+        while True:
+            start = time.perf_counter()
+            try:
+                await graph.ainvoke(payload, config)
+                snapshot = await graph.aget_state(config)
+            except Exception as e:
+                results.append(TurnResult(kind, time.perf_counter() - start, False, repr(e)))
+                break
+            results.append(TurnResult(kind, time.perf_counter() - start))
+            # Approve pending sensitive actions, as a customer would
+            if not snapshot.next:
+                break
+            payload, kind = None, "approval"
+    return results
+
+
+def run_customer_sync(
+    graph: Any, run_id: str, customer: int, journey: Sequence[str]
+) -> List[TurnResult]:
+    """Runs one customer's journey on the calling thread."""
+    config = _config(run_id, customer)
+    results = []
+    for message in journey:
+        payload = {"messages": [HumanMessage(content=message)]}
+        kind = "chat"
+        while True:
+            start = time.perf_counter()
+            try:
+                graph.invoke(payload, config)
+                snapshot = graph.get_state(config)
+            except Exception as e:
+                results.append(TurnResult(kind, time.perf_counter() - start, False, repr(e)))
+                break
+            results.append(TurnResult(kind, time.perf_counter() - start))
+            if not snapshot.next:
+                break
+            payload, kind = None, "approval"
+    return results
+
+
+async def _run_async(graph, run_id, customers, concurrency, journey):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def bounded(customer):
+        async with semaphore:
+            return await run_customer_async(graph, run_id, customer, journey)
+
+    return await asyncio.gather(*(bounded(c) for c in range(customers)))
+
+
+def run_load(
+    graph: Any,
+    customers: int,
+    concurrency: int,
+    journey: Sequence[str] = DEFAULT_JOURNEY,
+    mode: str = "async",
+) -> Dict[str, Any]:
+    """
+    Runs the simulated customers and summarizes the results.
+
+    Args:
+        graph: The compiled graph
+        customers (int): Number of simulated customers
+        concurrency (int): Customers in flight at the same time
+        journey (Sequence[str]): Messages each customer sends
+        mode (str): "async" (one event loop) or "threads" (thread pool)
+
+    Returns:
+        Dict[str, Any]: The benchmark report.
+    """
+    run_id = f"load-{int(time.time() * 1000)}"
+    start = time.perf_counter()
+    if mode == "async":
+        per_customer = asyncio.run(_run_async(graph, run_id, customers, concurrency, journey))
+    else:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            per_customer = list(
+                executor.map(
+                    lambda c: run_customer_sync(graph, run_id, c, journey), range(customers)
+                )
+            )
+    elapsed = time.perf_counter() - start
+    return summarize([r for results in per_customer for r in results], elapsed, customers, mode)
+
+
+def _latency_stats(latencies: Sequence[float]) -> Dict[str, float]:
+    ms = [latency * 1000 for latency in latencies]
+    return {
+        "p50": round(percentile(ms, 50), 2),
+        "p95": round(percentile(ms, 95), 2),
+        "p99": round(percentile(ms, 99), 2),
+        "mean": round(statistics.fmean(ms), 2) if ms else 0.0,
+        "max": round(max(ms), 2) if ms else 0.0,
+    }
+
+
+def summarize(
+    results: Sequence[TurnResult], elapsed: float, customers: int, mode: str
+) -> Dict[str, Any]:
+    """Builds the report from individual turn results."""
+    ok = [r for r in results if r.ok]
+    errors = [r for r in results if not r.ok]
+    return {
+        "mode": mode,
+        "customers": customers,
+        "turns": len(results),
+        "errors": len(errors),
+        "error_samples": sorted({r.error for r in errors})[:5],
+        "elapsed_s": round(elapsed, 3),
+        "throughput_turns_per_s": round(len(ok) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": _latency_stats([r.latency for r in ok]),
+        "latency_ms_by_kind": {
+            kind: _latency_stats([r.latency for r in ok if r.kind == kind])
+            for kind in sorted({r.kind for r in ok})
+        },
+        "peak_rss_mb": round(peak_rss_mb(), 1),
+    }
+
+
+def format_report(report: Dict[str, Any]) -> str:
+    """Renders the report as a short text table."""
+    lines = [
+        f"mode={report['mode']} customers={report['customers']} "
+        f"turns={report['turns']} errors={report['errors']} "
+        f"elapsed={report['elapsed_s']}s",
+        f"throughput: {report['throughput_turns_per_s']} turns/s, "
+        f"peak RSS: {report['peak_rss_mb']} MB",
+        f"{'latency (ms)':<14}{'p50':>10}{'p95':>10}{'p99':>10}{'max':>10}",
+    ]
+    rows = [("all", report["latency_ms"])] + list(report["latency_ms_by_kind"].items())
+    for name, stats in rows:
+        lines.append(
+            f"{name:<14}{stats['p50']:>10}{stats['p95']:>10}{stats['p99']:>10}{stats['max']:>10}"
+        )
+    prompt = report.get("prompt_tokens")
+    if prompt:
+        lines.append(
+            f"prompt tokens: avg {prompt['avg_input_tokens']}, max {prompt['max_input_tokens']}, "
+            f"prefix {prompt['prefix_tokens']}, cached {prompt['cached_ratio']:.0%}"
+        )
+    for name, sizes in (report.get("tool_payloads") or {}).items():
+        lines.append(
+            f"{name}: {sizes['calls']} results, {sizes['raw_tokens']} -> "
+            f"{sizes['compact_tokens']} tokens ({sizes['reduction']:.0%} smaller)"
+        )
+    for sample in report["error_samples"]:
+        lines.append(f"error: {sample}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="Load test the sales agent graph offline.")
+    parser.add_argument("--customers", type=int, default=20, help="Simulated customers")
+    parser.add_argument("--concurrency", type=int, default=10, help="Customers in flight")
+    parser.add_argument("--mode", choices=("async", "threads"), default="async")
+    parser.add_argument("--first-token-ms", type=float, default=0.0, help="Mean LLM time to first token")
+    parser.add_argument("--token-ms", type=float, default=0.0, help="Mean LLM time per token")
+    parser.add_argument("--jitter", type=float, default=0.2, help="Latency std-dev as a fraction of the mean")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument(
+        "--raw-tool-results", action="store_true", help="Send tool results to the model as full JSON"
+    )
+    parser.add_argument("--json", dest="json_path", help="Also write the report to this file")
+    args = parser.parse_args(argv)
+
+    workdir = Path(tempfile.mkdtemp(prefix="sales-agent-load-"))
+    try:
+        graph, cleanup = build_environment(workdir, args)
+        try:
+            report = run_load(graph, args.customers, max(1, args.concurrency), mode=args.mode)
+            from virtual_sales_agent import tools
+            from virtual_sales_agent.graph import prompt_metrics
+
+            report["prompt_tokens"] = prompt_metrics.stats()
+            report["tool_payloads"] = tools.tool_payloads.report()
+        finally:
+            cleanup()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    print(format_report(report))
+    if args.json_path:
+        with open(args.json_path, "w") as f:
+            json.dump(report, f, indent=2)
+    return 1 if report["errors"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,11 +1,16 @@
 """Controller for chat interactions."""
-import streamlit as st
-from langchain_core.messages import HumanMessage
+import uuid
 
-from services.graph_service import stream_graph, extract_tool_call, get_graph_state, process_result
+import streamlit as st
+from langchain_core.messages import AIMessage, HumanMessage
 
-# Keep track of seen message IDs to avoid duplicates
-_SEEN_MESSAGE_IDS = set()
+from services.graph_service import (
+    ChatEntry,
+    extract_tool_call,
+    get_chat_view,
+    get_graph_state,
+    stream_graph,
+)
 
 def handle_user_input(prompt):
     """
@@ -22,46 +27,32 @@ def handle_user_input(prompt):
     # Reset error state
     clear_error()
     
-    # Add user message to chat history
-    human_message = HumanMessage(content=prompt)
-    st.session_state.messages.append(human_message)
+    # Show the user message right away; the view is refreshed from the
+    # checkpoint once the graph has run
+    st.session_state.messages.append(ChatEntry(str(uuid.uuid4()), "user", prompt))
     
     # Set typing indicator
     set_typing_state(True)
     
     return True
 
-def process_message():
+def process_message(prompt):
     """
     Process the pending message and update the UI.
     
+    Only the new message is sent to the graph; the checkpoint holds the
+    rest of the conversation.
+    
+    Args:
+        prompt: The user's message.
+        
     Returns:
         True if processing was successful, False otherwise.
     """
     from utils.session_manager import set_typing_state, set_error
     
-    global _SEEN_MESSAGE_IDS
-    
     try:
-        # Get current message history
-        events = stream_graph(st.session_state.messages)
-        
-        # Extract the last event
-        last_event = events[-1] if events else None
-        if last_event:
-            # Process the event to extract messages
-            _SEEN_MESSAGE_IDS, last_message = process_result(last_event, _SEEN_MESSAGE_IDS)
-            
-            # Add message to chat history if new
-            if last_message:
-                st.session_state.messages.append(last_message)
-            
-            # Check for tool calls
-            tool_call = extract_tool_call(last_event)
-            if tool_call:
-                snapshot = get_graph_state()
-                if snapshot.next:
-                    st.session_state.pending_approval = (snapshot, events[-1])
+        render_stream([HumanMessage(content=prompt)])
         
         # Reset typing indicator
         set_typing_state(False)
@@ -72,24 +63,63 @@ def process_message():
         set_typing_state(False)
         return False
 
-def process_events(event):
+def process_events(messages=None):
     """
-    Process events from the graph and extract messages.
+    Stream a run of the graph and render it.
     For use with tool approval flows.
     
     Args:
-        event: The event to process.
-        
-    Returns:
-        The extracted tool call, if any.
+        messages: Messages to send (e.g. denial results), or None to resume
+            the interrupted run.
     """
-    global _SEEN_MESSAGE_IDS
+    render_stream(messages)
+
+def render_stream(messages=None):
+    """
+    Stream a graph run into the chat, token by token.
+    
+    Tokens are written to a placeholder as they arrive. Afterwards the chat
+    view is refreshed from the checkpoint and a pending approval is recorded
+    if the run stopped before a sensitive tool.
     
-    _SEEN_MESSAGE_IDS, last_message = process_result(event, _SEEN_MESSAGE_IDS)
+    Args:
+        messages: The new messages to send to the graph, or None to resume.
+    """
+    with st.chat_message("assistant"):
+        status = st.empty()
+        placeholder = st.empty()
+        text, current_id = "", None
+        
+        for kind, data in stream_graph(messages):
+            if kind == "token":
+                # A new LLM call starts a new message
+                if data.id != current_id:
+                    current_id, text = data.id, ""
+                    status.empty()
+                text += data.content if isinstance(data.content, str) else ""
+                placeholder.markdown(text + "▌")
+                continue
+            
+            node, update = data
+            if not isinstance(update, dict):
+                continue
+            new_messages = update.get("messages") or []
+            if not isinstance(new_messages, list):
+                new_messages = [new_messages]
+            for message in new_messages:
+                if not isinstance(message, AIMessage):
+                    continue
+                if message.content:
+                    placeholder.markdown(message.content)
+                if message.tool_calls:
+                    names = ", ".join(sorted({tc["name"] for tc in message.tool_calls}))
+                    status.caption(f"🔧 Working on it ({names})...")
+        
+        status.empty()
     
-    if last_message:
-        st.session_state.messages.append(last_message)
-        with st.chat_message("assistant"):
-            st.write(last_message.content)
+    snapshot = get_graph_state()
+    st.session_state.messages = get_chat_view(snapshot)
     
-    return extract_tool_call(event)
\ No newline at end of file
+    # Check for tool calls waiting for approval
+    if snapshot.next and extract_tool_call(snapshot.values):
+        st.session_state.pending_approval = (snapshot, snapshot.values)
@@ -18,7 +18,7 @@ def handle_message_queue():
         st.session_state.process_message = None
         
         # Process the message
-        success = process_message()
+        success = process_message(message)
         
         # Set flag to reset typing indicator on next rerun
         st.session_state._reset_typing = True
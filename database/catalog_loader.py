@@ -0,0 +1,422 @@
+"""
+Bulk catalog ingestion.
+
+Records are streamed from JSON, JSONL, CSV or Parquet through pyarrow and
+written with executemany into a staging table, then merged into products in
+a single transaction. The products triggers (full-text index and catalog
+stats) and secondary indexes are dropped for the merge and rebuilt once at
+the end, instead of being maintained row by row.
+
+Usage:
+    python -m database.catalog_loader catalog.parquet
+"""
+import argparse
+import json
+import logging
+import sqlite3
+import sys
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import pyarrow as pa
+import pyarrow.compute as pc
+
+logger = logging.getLogger(__name__)
+
+FORMATS = ("json", "jsonl", "csv", "parquet")
+
+# Whitespace and commas between the objects of a JSON array
+JSON_SEPARATORS = frozenset(" \t\n\r,")
+
+# products column -> accepted source field names
+COLUMNS: Dict[str, Tuple[str, ...]] = {
+    "ProductName": ("product_name", "ProductName", "name"),
+    "Category": ("category", "Category"),
+    "Description": ("description", "Description"),
+    "Price": ("price", "Price"),
+    "Quantity": ("quantity", "Quantity"),
+    "ImageUrl": ("image_url", "ImageUrl"),
+}
+REQUIRED_COLUMNS = ("ProductName", "Category", "Price", "Quantity")
+
+# The name lookup index is used by the merge itself, so it stays in place
+MERGE_INDEXES = ("idx_product_name_nocase",)
+
+# Derived data rebuilt after a load, keyed by the table it lives in
+REFRESH_STATEMENTS: Dict[str, Tuple[str, ...]] = {
+    "products_fts": ("INSERT INTO products_fts (products_fts) VALUES ('rebuild')",),
+    "catalog_stats": (
+        "DELETE FROM category_stats",
+        """INSERT INTO category_stats (Category, ProductCount)
+           SELECT Category, COUNT(*) FROM products WHERE Quantity > 0 GROUP BY Category""",
+        """INSERT OR REPLACE INTO catalog_stats (Id, ProductCount, PriceSum, MinPrice, MaxPrice)
+           SELECT 1, COUNT(*), COALESCE(SUM(Price), 0), MIN(Price), MAX(Price)
+           FROM products WHERE Quantity > 0""",
+    ),
+    # The version triggers are deferred with the others, so bump it once
+    "catalog_version": (
+        """UPDATE catalog_version SET Version = Version + 1, TextVersion = TextVersion + 1
+           WHERE Id = 1""",
+    ),
+}
+
+
+@dataclass
+class LoadResult:
+    """Counts from one bulk load."""
+
+    rows_read: int = 0
+    inserted: int = 0
+    updated: int = 0
+    rejected: int = 0
+    elapsed: float = 0.0
+
+
+def detect_format(path: str) -> str:
+    """Infers the file format from the extension."""
+    suffix = Path(path).suffix.lower().lstrip(".")
+    if suffix == "ndjson":
+        return "jsonl"
+    if suffix in ("pq", "parq"):
+        return "parquet"
+    if suffix not in FORMATS:
+        raise ValueError(f"Unsupported catalog format: {path}")
+    return suffix
+
+
+def _iter_json_array(path: str, chunk_size: int = 1 << 20) -> Iterator[Dict[str, Any]]:
+    """Yields the objects of a top-level JSON array without loading the whole file."""
+    decoder = json.JSONDecoder()
+    with open(path, "r", encoding="utf-8") as f:
+        buffer = f.read(chunk_size).lstrip()
+        if not buffer.startswith("["):
+            raise ValueError(f"Expected a JSON array in {path}")
+        # Records are decoded in place from `idx`; the consumed part of the
+        # buffer is dropped once per chunk read, not once per record
+        idx = 1
+        eof = False
+        while True:
+            while idx < len(buffer) and buffer[idx] in JSON_SEPARATORS:
+                idx += 1
+            if buffer.startswith("]", idx):
+                return
+            try:
+                record, idx = decoder.raw_decode(buffer, idx)
+            except json.JSONDecodeError:
+                # The next object is split across chunks
+                if eof:
+                    raise
+                chunk = f.read(chunk_size)
+                eof = not chunk
+                buffer = buffer[idx:] + chunk
+                idx = 0
+                continue
+            yield record
+
+
+def _to_record_batch(records: List[Dict[str, Any]]) -> pa.RecordBatch:
+    # from_pylist only keeps the keys of the first record; records may each
+    # have a different subset of the fields, so use the union of their keys
+    keys = dict.fromkeys(key for record in records for key in record)
+    return pa.RecordBatch.from_pydict({key: [record.get(key) for record in records] for key in keys})
+
+
+def _batched(records: Iterator[Dict[str, Any]], batch_size: int) -> Iterator[pa.RecordBatch]:
+    batch: List[Dict[str, Any]] = []
+    for record in records:
+        batch.append(record)
+        if len(batch) >= batch_size:
+            yield _to_record_batch(batch)
+            batch = []
+    if batch:
+        yield _to_record_batch(batch)
+
+
+def iter_record_batches(
+    path: str, fmt: Optional[str] = None, batch_size: int = 50_000
+) -> Iterator[pa.RecordBatch]:
+    """
+    Streams a catalog file as Arrow record batches.
+
+    CSV and Parquet are read incrementally by pyarrow. JSON arrays are
+    decoded object by object. JSONL is parsed by pyarrow's multithreaded
+    reader into a columnar table and then sliced.
+
+    Args:
+        path (str): Catalog file
+        fmt (str, optional): One of FORMATS; inferred from the extension if None
+        batch_size (int): Maximum rows per batch
+
+    Yields:
+        pa.RecordBatch: Raw batches with the source column names.
+    """
+    fmt = fmt or detect_format(path)
+    if fmt == "parquet":
+        import pyarrow.parquet as pq
+
+        yield from pq.ParquetFile(path).iter_batches(batch_size=batch_size)
+    elif fmt == "csv":
+        import pyarrow.csv as pcsv
+
+        reader = pcsv.open_csv(path, read_options=pcsv.ReadOptions(block_size=16 << 20))
+        for batch in reader:
+            for offset in range(0, batch.num_rows, batch_size):
+                yield batch.slice(offset, batch_size)
+    elif fmt == "jsonl":
+        import pyarrow.json as pjson
+
+        yield from pjson.read_json(path).to_batches(max_chunksize=batch_size)
+    elif fmt == "json":
+        yield from _batched(_iter_json_array(path), batch_size)
+    else:
+        raise ValueError(f"Unsupported catalog format: {fmt}")
+
+
+def _column(batch: pa.RecordBatch, target: str) -> Optional[pa.Array]:
+    for name in COLUMNS[target]:
+        index = batch.schema.get_field_index(name)
+        if index >= 0:
+            return batch.column(index)
+    return None
+
+
+def normalize_batch(batch: pa.RecordBatch) -> List[Tuple[Any, ...]]:
+    """
+    Maps a raw batch onto products rows.
+
+    Names and categories are lowercased like insert_product does, prices
+    and quantities are cast to numbers.
+
+    Args:
+        batch (pa.RecordBatch): Batch with source column names
+
+    Returns:
+        List[Tuple[Any, ...]]: Rows in COLUMNS order.
+
+    Raises:
+        ValueError: If a required column is missing or cannot be cast.
+    """
+    types = {
+        "ProductName": pa.string(),
+        "Category": pa.string(),
+        "Description": pa.string(),
+        "Price": pa.float64(),
+        "Quantity": pa.int64(),
+        "ImageUrl": pa.string(),
+    }
+    columns = []
+    for target, arrow_type in types.items():
+        column = _column(batch, target)
+        if column is None:
+            if target in REQUIRED_COLUMNS:
+                raise ValueError(f"Catalog is missing the {COLUMNS[target][0]} column")
+            column = pa.nulls(batch.num_rows, arrow_type)
+        try:
+            column = column.cast(arrow_type)
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError) as e:
+            raise ValueError(f"Invalid values in the {COLUMNS[target][0]} column: {e}") from e
+        if target in ("ProductName", "Category"):
+            column = pc.utf8_lower(pc.utf8_trim_whitespace(column))
+        columns.append(_to_python(column))
+    return list(zip(*columns))
+
+
+def _to_python(column: pa.Array) -> List[Any]:
+    # Going through numpy is ~10x faster than to_pylist(); numeric nulls
+    # would turn into NaN there, so those columns take the slow path
+    if column.null_count and not pa.types.is_string(column.type):
+        return column.to_pylist()
+    return column.to_numpy(zero_copy_only=False).tolist()
+
+
+class CatalogLoader:
+    """Loads product catalogs in bulk through a staging table."""
+
+    def __init__(self, db_manager: Any, batch_size: int = 50_000):
+        """
+        Initialize the loader.
+
+        Args:
+            db_manager: The database manager providing connections
+            batch_size (int): Rows per executemany call
+        """
+        self.db_manager = db_manager
+        self.batch_size = max(1, batch_size)
+
+    def load(self, path: str, fmt: Optional[str] = None, upsert: bool = True) -> LoadResult:
+        """
+        Loads a catalog file into products in one transaction.
+
+        Args:
+            path (str): Catalog file (JSON array, JSONL, CSV or Parquet)
+            fmt (str, optional): File format; inferred from the extension if None
+            upsert (bool): Update products matched by name (case-insensitive)
+                instead of inserting duplicates. The last record wins when a
+                name repeats in the file.
+
+        Returns:
+            LoadResult: Rows read, inserted, updated and rejected.
+
+        Raises:
+            ValueError: If the file cannot be parsed.
+            sqlite3.Error: If the merge fails; nothing is written in that case.
+        """
+        return self.load_batches(iter_record_batches(path, fmt, self.batch_size), upsert)
+
+    def load_batches(self, batches: Iterator[pa.RecordBatch], upsert: bool = True) -> LoadResult:
+        """Loads already-read record batches; see load()."""
+        started = time.perf_counter()
+        result = LoadResult()
+        with self.db_manager.get_connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._create_staging(conn)
+                for batch in batches:
+                    rows = normalize_batch(batch)
+                    conn.executemany(
+                        """INSERT INTO temp.staging_products
+                           (ProductName, Category, Description, Price, Quantity, ImageUrl)
+                           VALUES (?, ?, ?, ?, ?, ?)""",
+                        rows,
+                    )
+                    result.rows_read += len(rows)
+                    logger.debug(f"Staged {result.rows_read} catalog rows")
+
+                result.rejected = conn.execute(
+                    """DELETE FROM temp.staging_products
+                       WHERE ProductName IS NULL OR ProductName = '' OR Category IS NULL
+                          OR Price IS NULL OR Price <= 0 OR Quantity IS NULL OR Quantity < 0"""
+                ).rowcount
+
+                deferred = self._drop_deferred(conn)
+                if upsert:
+                    result.updated, result.inserted = self._upsert(conn)
+                else:
+                    result.inserted = self._append(conn)
+                for sql in deferred:
+                    conn.execute(sql)
+                self._refresh_derived(conn)
+
+                conn.execute("DROP TABLE temp.staging_products")
+                conn.commit()
+            except BaseException:
+                conn.rollback()
+                raise
+
+        result.elapsed = time.perf_counter() - started
+        logger.info(
+            f"Loaded catalog: {result.rows_read} rows read, {result.inserted} inserted, "
+            f"{result.updated} updated, {result.rejected} rejected in {result.elapsed:.2f}s"
+        )
+        return result
+
+    @staticmethod
+    def _create_staging(conn: sqlite3.Connection) -> None:
+        conn.execute("DROP TABLE IF EXISTS temp.staging_products")
+        conn.execute(
+            """CREATE TEMP TABLE staging_products (
+                   Seq INTEGER PRIMARY KEY,
+                   ProductName TEXT COLLATE NOCASE,
+                   Category TEXT,
+                   Description TEXT,
+                   Price REAL,
+                   Quantity INTEGER,
+                   ImageUrl TEXT
+               )"""
+        )
+
+    @staticmethod
+    def _drop_deferred(conn: sqlite3.Connection) -> List[str]:
+        """Drops the products triggers and secondary indexes; returns their DDL."""
+        placeholders = ",".join("?" * len(MERGE_INDEXES))
+        rows = conn.execute(
+            f"""SELECT type, name, sql FROM sqlite_master
+                WHERE tbl_name = 'products' AND type IN ('trigger', 'index')
+                  AND sql IS NOT NULL AND name NOT IN ({placeholders})""",
+            MERGE_INDEXES,
+        ).fetchall()
+        for row in rows:
+            conn.execute(f'DROP {row["type"].upper()} "{row["name"]}"')
+        # Indexes first, so triggers are recreated against the final schema
+        return [row["sql"] for row in sorted(rows, key=lambda r: r["type"] != "index")]
+
+    @staticmethod
+    def _upsert(conn: sqlite3.Connection) -> Tuple[int, int]:
+        # Keep only the last record per name
+        conn.execute(
+            """DELETE FROM temp.staging_products WHERE Seq NOT IN (
+                   SELECT MAX(Seq) FROM temp.staging_products GROUP BY ProductName
+               )"""
+        )
+        conn.execute("CREATE INDEX temp.idx_staging_name ON staging_products(ProductName)")
+        updated = conn.execute(
+            """UPDATE products SET
+                   Category = s.Category,
+                   Description = s.Description,
+                   Price = s.Price,
+                   Quantity = s.Quantity,
+                   ImageUrl = s.ImageUrl
+               FROM temp.staging_products AS s
+               WHERE s.ProductName = products.ProductName"""
+        ).rowcount
+        inserted = conn.execute(
+            """INSERT INTO products (ProductName, Category, Description, Price, Quantity, ImageUrl)
+               SELECT ProductName, Category, Description, Price, Quantity, ImageUrl
+               FROM temp.staging_products AS s
+               WHERE NOT EXISTS (
+                   SELECT 1 FROM products AS p
+                   WHERE p.ProductName COLLATE NOCASE = s.ProductName
+               )
+               ORDER BY Seq"""
+        ).rowcount
+        return updated, inserted
+
+    @staticmethod
+    def _append(conn: sqlite3.Connection) -> int:
+        return conn.execute(
+            """INSERT INTO products (ProductName, Category, Description, Price, Quantity, ImageUrl)
+               SELECT ProductName, Category, Description, Price, Quantity, ImageUrl
+               FROM temp.staging_products ORDER BY Seq"""
+        ).rowcount
+
+    @staticmethod
+    def _refresh_derived(conn: sqlite3.Connection) -> None:
+        tables = {
+            row[0]
+            for row in conn.execute("SELECT name FROM sqlite_master WHERE type = 'table'")
+        }
+        for table, statements in REFRESH_STATEMENTS.items():
+            if table in tables:
+                for sql in statements:
+                    conn.execute(sql)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    from database.db_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Bulk load a product catalog.")
+    parser.add_argument("path", help="JSON, JSONL, CSV or Parquet catalog")
+    parser.add_argument("--format", choices=FORMATS, help="Defaults to the file extension")
+    parser.add_argument("--append", action="store_true", help="Insert every row instead of upserting by name")
+    parser.add_argument("--batch-size", type=int, default=50_000)
+    args = parser.parse_args(argv)
+
+    db_manager = DatabaseManager()
+    try:
+        db_manager.run_migrations()
+        result = CatalogLoader(db_manager, args.batch_size).load(
+            args.path, args.format, upsert=not args.append
+        )
+    finally:
+        db_manager.close()
+    print(
+        f"{result.rows_read} rows read, {result.inserted} inserted, {result.updated} updated, "
+        f"{result.rejected} rejected in {result.elapsed:.2f}s"
+    )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -11,6 +11,23 @@ class DatabaseConfig:
     schema_path: Optional[str] = None
     products_path: Optional[str] = None
 
+    # Connection pool settings
+    pool_size: int = 8
+    pool_timeout: float = 30.0
+
+    # SQLite pragmas applied to every pooled connection
+    busy_timeout_ms: int = 5000
+    cache_size_kib: int = 16384
+    mmap_size: int = 256 * 1024 * 1024
+
+    # Group-commit order writer settings
+    order_batch_size: int = 64
+    order_flush_interval_ms: float = 5.0
+
+    # Group-commit support request writer settings
+    support_batch_size: int = 16
+    support_flush_interval_ms: float = 5.0
+
 
 # Default configuration
 DEFAULT_CONFIG = DatabaseConfig(
@@ -19,3 +36,9 @@ DEFAULT_CONFIG = DatabaseConfig(
     schema_path="database/db/schemas.sql",
     products_path="database/db/products.json",
 )
+
+# Conversation checkpoints live in their own database file
+CHECKPOINT_CONFIG = DatabaseConfig(
+    db_name="checkpoints.db",
+    db_path="database/db/checkpoints.db",
+)
@@ -1,26 +1,197 @@
+import asyncio
+import functools
 import logging
 import os
 import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Generator, Optional, TYPE_CHECKING
-
-import pandas as pd
+from typing import Any, Callable, Dict, Generator, List, Optional, TYPE_CHECKING
 
 from database.config import DEFAULT_CONFIG, DatabaseConfig
 
+if TYPE_CHECKING:
+    from database.catalog_loader import LoadResult
+
 logging.basicConfig(
     level=logging.INFO, format="%(asctime)s - %(levelname)s - %(message)s"
 )
 logger = logging.getLogger(__name__)
 
 
+class ConnectionPool:
+    """
+    A bounded pool of reusable SQLite connections.
+
+    Connections are opened once in WAL mode with tuned pragmas and handed out
+    per thread: a thread that already holds a connection gets the same one back
+    on nested checkouts, and the connection only returns to the pool when the
+    outermost checkout ends.
+    """
+
+    def __init__(self, config: DatabaseConfig):
+        self.config = config
+        self.max_size = max(1, config.pool_size)
+        self.timeout = config.pool_timeout
+
+        self._local = threading.local()
+        self._condition = threading.Condition()
+        self._idle: List[sqlite3.Connection] = []
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+
+        # Stats
+        self._checkouts = 0
+        self._waits = 0
+        self._total_wait = 0.0
+        self._max_wait = 0.0
+
+    def _connect(self) -> sqlite3.Connection:
+        """Opens a new connection with the pool's pragmas applied."""
+        conn = sqlite3.connect(
+            self.config.db_path,
+            timeout=self.config.busy_timeout_ms / 1000,
+            check_same_thread=False,
+        )
+        conn.row_factory = sqlite3.Row
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(f"PRAGMA busy_timeout={int(self.config.busy_timeout_ms)}")
+        conn.execute(f"PRAGMA cache_size=-{int(self.config.cache_size_kib)}")
+        conn.execute(f"PRAGMA mmap_size={int(self.config.mmap_size)}")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        return conn
+
+    def _acquire(self) -> sqlite3.Connection:
+        """Takes an idle connection, opens a new one, or waits for a release."""
+        started = time.perf_counter()
+        waited = False
+        with self._condition:
+            while True:
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Connection pool is closed")
+                if self._idle:
+                    conn = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    conn = None
+                    break
+                waited = True
+                remaining = self.timeout - (time.perf_counter() - started)
+                if remaining <= 0 or not self._condition.wait(remaining):
+                    raise sqlite3.OperationalError(
+                        f"Timed out after {self.timeout}s waiting for a database connection"
+                    )
+
+            elapsed = time.perf_counter() - started
+            self._checkouts += 1
+            self._in_use += 1
+            if waited:
+                self._waits += 1
+            self._total_wait += elapsed
+            self._max_wait = max(self._max_wait, elapsed)
+
+        if conn is None:
+            try:
+                conn = self._connect()
+            except Exception:
+                with self._condition:
+                    self._size -= 1
+                    self._in_use -= 1
+                    self._condition.notify()
+                raise
+        return conn
+
+    def _release(self, conn: sqlite3.Connection) -> None:
+        """Returns a connection to the pool, discarding any open transaction."""
+        broken = False
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+        except sqlite3.Error as e:
+            logger.warning(f"Discarding broken pooled connection: {e}")
+            broken = True
+
+        with self._condition:
+            self._in_use -= 1
+            if broken or self._closed:
+                self._size -= 1
+                conn.close()
+            else:
+                self._idle.append(conn)
+            self._condition.notify()
+
+    @contextmanager
+    def connection(self) -> Generator[sqlite3.Connection, None, None]:
+        """
+        Context manager that checks out the calling thread's connection.
+
+        Yields:
+            sqlite3.Connection: Pooled database connection.
+        """
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            self._local.depth += 1
+            try:
+                yield conn
+            finally:
+                self._local.depth -= 1
+            return
+
+        conn = self._acquire()
+        self._local.conn = conn
+        self._local.depth = 1
+        try:
+            yield conn
+        finally:
+            self._local.conn = None
+            self._local.depth = 0
+            self._release(conn)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns pool size and checkout wait-time statistics.
+
+        Returns:
+            Dict[str, Any]: Current pool counters.
+        """
+        with self._condition:
+            return {
+                "max_size": self.max_size,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": self._checkouts,
+                "waits": self._waits,
+                "avg_wait_ms": round(
+                    self._total_wait / self._checkouts * 1000, 3
+                ) if self._checkouts else 0.0,
+                "max_wait_ms": round(self._max_wait * 1000, 3),
+            }
+
+    def close(self) -> None:
+        """Closes idle connections; connections in use are closed on release."""
+        with self._condition:
+            self._closed = True
+            while self._idle:
+                self._idle.pop().close()
+                self._size -= 1
+            self._condition.notify_all()
+
+
 class DatabaseManager:
     """Manages database operations including setup, connection, and data insertion."""
 
     def __init__(self, config: DatabaseConfig = DEFAULT_CONFIG):
         self.config = config
         self._ensure_db_directory()
+        self.pool = ConnectionPool(config)
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._executor_lock = threading.Lock()
 
     def _ensure_db_directory(self) -> None:
         """Ensures the database directory exists."""
@@ -64,17 +235,57 @@ class DatabaseManager:
         """
         Context manager for database connections.
 
+        Connections come from the manager's pool and are returned to it on
+        exit; any transaction left open is rolled back.
+
         Yields:
             sqlite3.Connection: Database connection object.
         """
-        conn = None
-        try:
-            conn = sqlite3.connect(self.config.db_path)
-            conn.row_factory = sqlite3.Row
+        with self.pool.connection() as conn:
             yield conn
-        finally:
-            if conn:
-                conn.close()
+
+    @property
+    def executor(self) -> ThreadPoolExecutor:
+        """Thread pool for database work offloaded from the event loop.
+
+        It is sized to the connection pool, so offloaded calls never queue
+        for a connection while holding a thread.
+        """
+        if self._executor is None:
+            with self._executor_lock:
+                if self._executor is None:
+                    self._executor = ThreadPoolExecutor(
+                        max_workers=self.config.pool_size, thread_name_prefix="db"
+                    )
+        return self._executor
+
+    async def run_in_executor(self, func: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """
+        Runs blocking database code without blocking the event loop.
+
+        Args:
+            func: The blocking callable
+            *args: Positional arguments for func
+            **kwargs: Keyword arguments for func
+
+        Returns:
+            Any: The return value of func.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(func, *args, **kwargs)
+        )
+
+    def pool_stats(self) -> Dict[str, Any]:
+        """Returns connection pool size and wait-time statistics."""
+        return self.pool.stats()
+
+    def close(self) -> None:
+        """Shuts down the executor and closes all pooled connections."""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+        self.pool.close()
 
     def execute_sql_file(self, file_path: str) -> bool:
         """
@@ -149,15 +360,48 @@ class DatabaseManager:
             logger.error(f"Error inserting product {product_name}: {e}")
             return False
             
+    def bulk_load_products(
+        self,
+        file_path: str,
+        file_format: Optional[str] = None,
+        upsert: bool = True,
+        batch_size: int = 50_000,
+    ) -> "LoadResult":
+        """
+        Loads a product catalog in bulk.
+
+        Records are streamed from JSON, JSONL, CSV or Parquet and merged in
+        one transaction, with the products triggers and secondary indexes
+        rebuilt once at the end. See database.catalog_loader.
+
+        Args:
+            file_path (str): Catalog file
+            file_format (str, optional): json, jsonl, csv or parquet; inferred
+                from the extension if None
+            upsert (bool): Update existing products matched by name instead of
+                inserting duplicates
+            batch_size (int): Rows per executemany call
+
+        Returns:
+            LoadResult: Rows read, inserted, updated and rejected.
+        """
+        # pyarrow is only needed for ingestion
+        from database.catalog_loader import CatalogLoader
+
+        return CatalogLoader(self, batch_size).load(file_path, file_format, upsert)
+
     def insert_products_from_json(self, file_path: Optional[str] = None) -> bool:
         """
         Inserts products from a JSON file into the database.
 
+        Products that already exist (by name) are updated rather than
+        duplicated.
+
         Args:
             file_path (str, optional): Path to JSON file. Uses config path if None.
 
         Returns:
-            bool: True if all insertions were successful, False otherwise.
+            bool: True if all products were loaded, False otherwise.
         """
         file_path = file_path or self.config.products_path
         if not file_path:
@@ -165,23 +409,13 @@ class DatabaseManager:
             return False
 
         try:
-            df = pd.read_json(file_path)
-        except ValueError as e:
-            logger.error(f"Failed to load JSON file: {e}")
+            result = self.bulk_load_products(file_path)
+        except (OSError, ValueError, sqlite3.Error) as e:
+            logger.error(f"Failed to load products from {file_path}: {e}")
             return False
 
-        success = True
-        for _, row in df.iterrows():
-            product_success = self.insert_product(
-                product_name=row.get("product_name"),
-                category=row.get("category"),
-                description=row.get("description"),
-                price=row.get("price"),
-                quantity=row.get("quantity"),
-                image_url=row.get("image_url"),
-            )
-            success = success and product_success
-
-        if success:
-            logger.info("All products inserted successfully")
-        return success
+        if result.rejected:
+            logger.error(f"Rejected {result.rejected} invalid products from {file_path}")
+            return False
+        logger.info("All products inserted successfully")
+        return True
@@ -0,0 +1,193 @@
+import asyncio
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Sentinel pushed onto the queue to stop the writer thread
+_STOP = object()
+
+
+class GroupCommitWriter:
+    """
+    Queues writes from many threads and commits them in micro-batches.
+
+    A background thread collects submitted items until either the batch is
+    full or the oldest item has waited `max_latency_ms`, then applies the
+    whole batch inside one BEGIN IMMEDIATE ... COMMIT. Each item runs under
+    its own savepoint, so a failing item is rolled back on its own and every
+    caller still gets an individual result or exception through its future.
+    Futures are only resolved once the batch has been committed.
+    """
+
+    def __init__(
+        self,
+        db_manager: Any,
+        handler: Callable[[sqlite3.Cursor, Any], Any],
+        max_batch_size: int = 64,
+        max_latency_ms: float = 5.0,
+        name: str = "group-commit-writer",
+    ):
+        """
+        Initialize the writer.
+
+        Args:
+            db_manager: The database manager providing connections
+            handler: Callable applying one item with the batch cursor and
+                returning its result; raising an exception fails only that item
+            max_batch_size (int): Maximum number of items per transaction
+            max_latency_ms (float): Maximum time the first item of a batch
+                waits for more items before the batch is flushed
+            name (str): Name of the background thread
+        """
+        self.db_manager = db_manager
+        self.handler = handler
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_latency = max(0.0, max_latency_ms) / 1000
+        self.name = name
+
+        self._queue: "queue.Queue[Any]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+        # Stats
+        self._batches = 0
+        self._items = 0
+        self._failed_items = 0
+        self._max_batch = 0
+
+    def _ensure_started(self) -> None:
+        """Starts the background writer thread on first use."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name=self.name, daemon=True)
+            self._thread.start()
+
+    def submit(self, item: Any) -> Future:
+        """
+        Queues an item for the next batch.
+
+        Args:
+            item: The item passed to the handler
+
+        Returns:
+            Future: Resolves to the handler's result once the batch commits.
+        """
+        future: Future = Future()
+        with self._lock:
+            if self._closed:
+                raise RuntimeError(f"{self.name} is closed")
+            self._ensure_started()
+            self._queue.put((item, future))
+        return future
+
+    def write(self, item: Any, timeout: Optional[float] = None) -> Any:
+        """Submits an item and blocks until its batch has been committed."""
+        return self.submit(item).result(timeout)
+
+    async def awrite(self, item: Any) -> Any:
+        """Submits an item and awaits its batch commit without blocking the loop."""
+        return await asyncio.wrap_future(self.submit(item))
+
+    def _run(self) -> None:
+        """Writer loop: collect a batch, flush it, repeat until stopped."""
+        while True:
+            entry = self._queue.get()
+            if entry is _STOP:
+                return
+
+            batch = [entry]
+            stop = False
+            deadline = time.monotonic() + self.max_latency
+            while len(batch) < self.max_batch_size:
+                remaining = deadline - time.monotonic()
+                try:
+                    if remaining > 0:
+                        entry = self._queue.get(timeout=remaining)
+                    else:
+                        entry = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                if entry is _STOP:
+                    stop = True
+                    break
+                batch.append(entry)
+
+            self._flush(batch)
+            if stop:
+                return
+
+    def _flush(self, batch: List[Tuple[Any, Future]]) -> None:
+        """Applies a batch in a single transaction and resolves its futures."""
+        outcomes: List[Tuple[Future, Any, Optional[BaseException]]] = []
+        try:
+            with self.db_manager.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("BEGIN IMMEDIATE")
+                for item, future in batch:
+                    cursor.execute("SAVEPOINT batch_item")
+                    try:
+                        result = self.handler(cursor, item)
+                    except Exception as e:
+                        cursor.execute("ROLLBACK TO batch_item")
+                        cursor.execute("RELEASE batch_item")
+                        outcomes.append((future, None, e))
+                    else:
+                        cursor.execute("RELEASE batch_item")
+                        outcomes.append((future, result, None))
+                cursor.execute("COMMIT")
+        except Exception as e:
+            logger.error(f"{self.name}: failed to commit batch of {len(batch)}: {e}")
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        failed = 0
+        for future, result, error in outcomes:
+            if error is not None:
+                failed += 1
+                future.set_exception(error)
+            else:
+                future.set_result(result)
+
+        with self._lock:
+            self._batches += 1
+            self._items += len(batch)
+            self._failed_items += failed
+            self._max_batch = max(self._max_batch, len(batch))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns batching statistics.
+
+        Returns:
+            Dict[str, Any]: Batch and item counters.
+        """
+        with self._lock:
+            return {
+                "batches": self._batches,
+                "items": self._items,
+                "failed_items": self._failed_items,
+                "max_batch_size": self._max_batch,
+                "avg_batch_size": round(self._items / self._batches, 2)
+                if self._batches
+                else 0.0,
+                "pending": self._queue.qsize(),
+            }
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """Flushes queued items and stops the writer thread."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            thread = self._thread
+            if thread is not None:
+                self._queue.put(_STOP)
+        if thread is not None:
+            thread.join(timeout)
@@ -0,0 +1,36 @@
+-- Migration: add_products_fts
+-- Created: 2026-10-18 09:12:40
+
+-- Full-text index over the searchable product columns. It is an external
+-- content table, so the text itself lives only in products.
+CREATE VIRTUAL TABLE IF NOT EXISTS products_fts USING fts5(
+    ProductName,
+    Description,
+    Category,
+    content='products',
+    content_rowid='ProductId',
+    tokenize='unicode61 remove_diacritics 2',
+    prefix='2 3'
+);
+
+-- Keep the index in sync with products
+CREATE TRIGGER IF NOT EXISTS products_fts_insert AFTER INSERT ON products BEGIN
+    INSERT INTO products_fts (rowid, ProductName, Description, Category)
+    VALUES (new.ProductId, new.ProductName, new.Description, new.Category);
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_delete AFTER DELETE ON products BEGIN
+    INSERT INTO products_fts (products_fts, rowid, ProductName, Description, Category)
+    VALUES ('delete', old.ProductId, old.ProductName, old.Description, old.Category);
+END;
+
+CREATE TRIGGER IF NOT EXISTS products_fts_update
+AFTER UPDATE OF ProductName, Description, Category ON products BEGIN
+    INSERT INTO products_fts (products_fts, rowid, ProductName, Description, Category)
+    VALUES ('delete', old.ProductId, old.ProductName, old.Description, old.Category);
+    INSERT INTO products_fts (rowid, ProductName, Description, Category)
+    VALUES (new.ProductId, new.ProductName, new.Description, new.Category);
+END;
+
+-- Index any products that already exist
+INSERT INTO products_fts (products_fts) VALUES ('rebuild');
@@ -0,0 +1,90 @@
+-- Migration: add_catalog_stats
+-- Created: 2026-10-18 09:47:05
+
+-- Materialized aggregates over in-stock products (Quantity > 0), used for
+-- search metadata instead of GROUP BY / MIN / MAX / AVG scans.
+CREATE TABLE IF NOT EXISTS category_stats (
+    Category TEXT PRIMARY KEY,
+    ProductCount INTEGER NOT NULL DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS catalog_stats (
+    Id INTEGER PRIMARY KEY CHECK (Id = 1),
+    ProductCount INTEGER NOT NULL DEFAULT 0,
+    PriceSum REAL NOT NULL DEFAULT 0,
+    MinPrice REAL,
+    MaxPrice REAL
+);
+
+-- Lets the triggers recompute MIN/MAX with a single index seek when the
+-- current extreme leaves the in-stock set
+CREATE INDEX IF NOT EXISTS idx_products_in_stock_price ON products(Price) WHERE Quantity > 0;
+
+CREATE TRIGGER IF NOT EXISTS catalog_stats_insert
+AFTER INSERT ON products WHEN new.Quantity > 0 BEGIN
+    INSERT INTO category_stats (Category, ProductCount) VALUES (new.Category, 1)
+    ON CONFLICT (Category) DO UPDATE SET ProductCount = ProductCount + 1;
+
+    UPDATE catalog_stats SET
+        ProductCount = ProductCount + 1,
+        PriceSum = PriceSum + new.Price,
+        MinPrice = CASE WHEN MinPrice IS NULL OR new.Price < MinPrice THEN new.Price ELSE MinPrice END,
+        MaxPrice = CASE WHEN MaxPrice IS NULL OR new.Price > MaxPrice THEN new.Price ELSE MaxPrice END
+    WHERE Id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS catalog_stats_delete
+AFTER DELETE ON products WHEN old.Quantity > 0 BEGIN
+    UPDATE category_stats SET ProductCount = ProductCount - 1 WHERE Category = old.Category;
+
+    UPDATE catalog_stats SET
+        ProductCount = ProductCount - 1,
+        PriceSum = PriceSum - old.Price,
+        MinPrice = CASE WHEN old.Price <= MinPrice
+            THEN (SELECT MIN(Price) FROM products WHERE Quantity > 0) ELSE MinPrice END,
+        MaxPrice = CASE WHEN old.Price >= MaxPrice
+            THEN (SELECT MAX(Price) FROM products WHERE Quantity > 0) ELSE MaxPrice END
+    WHERE Id = 1;
+END;
+
+-- Only fires when a row enters or leaves the in-stock set, or an in-stock
+-- row changes price or category; plain stock decrements are free.
+CREATE TRIGGER IF NOT EXISTS catalog_stats_update
+AFTER UPDATE OF Quantity, Price, Category ON products
+WHEN (old.Quantity > 0) <> (new.Quantity > 0)
+    OR (new.Quantity > 0 AND (old.Price <> new.Price OR old.Category <> new.Category))
+BEGIN
+    UPDATE category_stats SET ProductCount = ProductCount - 1
+    WHERE old.Quantity > 0 AND Category = old.Category;
+
+    INSERT INTO category_stats (Category, ProductCount)
+    SELECT new.Category, 1 WHERE new.Quantity > 0
+    ON CONFLICT (Category) DO UPDATE SET ProductCount = ProductCount + 1;
+
+    UPDATE catalog_stats SET
+        ProductCount = ProductCount - (old.Quantity > 0) + (new.Quantity > 0),
+        PriceSum = PriceSum
+            - (CASE WHEN old.Quantity > 0 THEN old.Price ELSE 0 END)
+            + (CASE WHEN new.Quantity > 0 THEN new.Price ELSE 0 END),
+        MinPrice = CASE
+            WHEN old.Quantity > 0 AND old.Price <= MinPrice
+                THEN (SELECT MIN(Price) FROM products WHERE Quantity > 0)
+            WHEN new.Quantity > 0 AND (MinPrice IS NULL OR new.Price < MinPrice)
+                THEN new.Price
+            ELSE MinPrice END,
+        MaxPrice = CASE
+            WHEN old.Quantity > 0 AND old.Price >= MaxPrice
+                THEN (SELECT MAX(Price) FROM products WHERE Quantity > 0)
+            WHEN new.Quantity > 0 AND (MaxPrice IS NULL OR new.Price > MaxPrice)
+                THEN new.Price
+            ELSE MaxPrice END
+    WHERE Id = 1;
+END;
+
+-- Seed from the current catalog
+INSERT OR REPLACE INTO category_stats (Category, ProductCount)
+SELECT Category, COUNT(*) FROM products WHERE Quantity > 0 GROUP BY Category;
+
+INSERT OR REPLACE INTO catalog_stats (Id, ProductCount, PriceSum, MinPrice, MaxPrice)
+SELECT 1, COUNT(*), COALESCE(SUM(Price), 0), MIN(Price), MAX(Price)
+FROM products WHERE Quantity > 0;
@@ -0,0 +1,5 @@
+-- Migration: add_product_name_nocase_index
+-- Created: 2026-10-18 10:21:33
+
+-- Case-insensitive product name lookups (ProductName COLLATE NOCASE IN (...))
+CREATE INDEX IF NOT EXISTS idx_product_name_nocase ON products(ProductName COLLATE NOCASE);
@@ -0,0 +1,24 @@
+-- Migration: add_catalog_version
+-- Created: 2026-10-18 11:05:12
+
+-- Monotonic counter bumped by every change to products, including stock
+-- decrements from orders. Result caches tag entries with it, so processes
+-- sharing the database never serve results from an older catalog.
+CREATE TABLE IF NOT EXISTS catalog_version (
+    Id INTEGER PRIMARY KEY CHECK (Id = 1),
+    Version INTEGER NOT NULL DEFAULT 0
+);
+
+INSERT OR IGNORE INTO catalog_version (Id, Version) VALUES (1, 0);
+
+CREATE TRIGGER IF NOT EXISTS catalog_version_insert AFTER INSERT ON products BEGIN
+    UPDATE catalog_version SET Version = Version + 1 WHERE Id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS catalog_version_delete AFTER DELETE ON products BEGIN
+    UPDATE catalog_version SET Version = Version + 1 WHERE Id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS catalog_version_update AFTER UPDATE ON products BEGIN
+    UPDATE catalog_version SET Version = Version + 1 WHERE Id = 1;
+END;
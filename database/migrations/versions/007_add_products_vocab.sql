@@ -0,0 +1,23 @@
+-- Migration: add_products_vocab
+-- Created: 2026-10-18 11:48:27
+
+-- Read-only view of the full-text index vocabulary (term, doc, cnt), used to
+-- build the spelling correction dictionary
+CREATE VIRTUAL TABLE IF NOT EXISTS products_vocab USING fts5vocab(products_fts, row);
+
+-- Separate counter for changes to the searchable text, so stock updates
+-- from orders do not trigger a vocabulary refresh
+ALTER TABLE catalog_version ADD COLUMN TextVersion INTEGER NOT NULL DEFAULT 0;
+
+CREATE TRIGGER IF NOT EXISTS catalog_text_version_insert AFTER INSERT ON products BEGIN
+    UPDATE catalog_version SET TextVersion = TextVersion + 1 WHERE Id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS catalog_text_version_delete AFTER DELETE ON products BEGIN
+    UPDATE catalog_version SET TextVersion = TextVersion + 1 WHERE Id = 1;
+END;
+
+CREATE TRIGGER IF NOT EXISTS catalog_text_version_update
+AFTER UPDATE OF ProductName, Description, Category ON products BEGIN
+    UPDATE catalog_version SET TextVersion = TextVersion + 1 WHERE Id = 1;
+END;
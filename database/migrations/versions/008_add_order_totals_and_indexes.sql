@@ -0,0 +1,25 @@
+-- Migration: add_order_totals_and_indexes
+-- Created: 2026-10-18 12:26:10
+
+-- Order totals are stored at write time, so listing a customer's orders
+-- needs no join or aggregate over orders_details
+ALTER TABLE orders ADD COLUMN TotalAmount REAL;
+ALTER TABLE orders ADD COLUMN ItemCount INTEGER;
+
+UPDATE orders SET
+    TotalAmount = (
+        SELECT COALESCE(SUM(Quantity * UnitPrice), 0)
+        FROM orders_details WHERE orders_details.OrderId = orders.OrderId
+    ),
+    ItemCount = (
+        SELECT COUNT(*) FROM orders_details WHERE orders_details.OrderId = orders.OrderId
+    );
+
+-- Covers the paginated order listing: seek to the customer, walk OrderId
+-- backwards from the cursor, and read every listed column from the index
+CREATE INDEX IF NOT EXISTS idx_orders_customer_order
+    ON orders(CustomerId, OrderId, OrderDate, Status, TotalAmount, ItemCount);
+
+-- Line items of an order (order details, recommendations)
+CREATE INDEX IF NOT EXISTS idx_orders_details_order
+    ON orders_details(OrderId, ProductId, Quantity, UnitPrice);
@@ -0,0 +1,17 @@
+-- Migration: add_support_requests
+-- Created: 2026-10-18 13:02:44
+
+-- Append-only log of customers asking for a human representative
+CREATE TABLE IF NOT EXISTS support_requests (
+    RequestId INTEGER PRIMARY KEY AUTOINCREMENT,
+    ThreadId TEXT NOT NULL,
+    CustomerId TEXT,
+    FullName TEXT NOT NULL,
+    Email TEXT NOT NULL,
+    Phone TEXT NOT NULL,
+    CreatedAt TEXT NOT NULL
+);
+
+-- Per-conversation retrieval and keyset-paginated exports
+CREATE INDEX IF NOT EXISTS idx_support_requests_thread
+    ON support_requests(ThreadId, RequestId);
@@ -0,0 +1,165 @@
+import sqlite3
+from datetime import datetime
+from decimal import Decimal
+from typing import Any, Dict, List, Optional
+
+from database.group_commit import GroupCommitWriter
+
+
+def write_order(
+    cursor: sqlite3.Cursor, customer_id: Any, products: List[Dict[str, Any]]
+) -> Dict[str, Any]:
+    """
+    Writes a single order using an open transaction.
+
+    Line items are resolved with one lookup on the NOCASE name index and
+    stock is decremented with a guarded UPDATE, so an order never oversells.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor inside an open write transaction
+        customer_id: The customer placing the order
+        products (List[Dict[str, Any]]): Items with ProductName and Quantity
+
+    Returns:
+        Dict[str, Any]: Order details including id, total and products.
+
+    Raises:
+        ValueError: If a product does not exist or is out of stock.
+    """
+    # Resolve every line item with one lookup on the NOCASE name index
+    names = list({item["ProductName"].lower() for item in products})
+    placeholders = ",".join("?" * len(names))
+    cursor.execute(
+        f"""SELECT ProductId, ProductName, Price FROM products
+            WHERE ProductName COLLATE NOCASE IN ({placeholders})
+            ORDER BY ProductId""",
+        names,
+    )
+    catalog = {}
+    for row in cursor.fetchall():
+        catalog.setdefault(row["ProductName"].lower(), row)
+
+    total_amount = Decimal("0")
+    ordered_products = []
+    order_details = []
+    requested = {}
+
+    # Process each product
+    for item in products:
+        product_name = item["ProductName"]
+        quantity = item["Quantity"]
+
+        product = catalog.get(product_name.lower())
+        if not product:
+            raise ValueError(f"Product not found: {product_name}")
+
+        requested.setdefault(product["ProductId"], [product_name, 0])
+        requested[product["ProductId"]][1] += quantity
+
+        order_details.append((product["ProductId"], quantity, product["Price"]))
+        total_amount += Decimal(str(product["Price"])) * Decimal(str(quantity))
+        ordered_products.append(
+            {
+                "product_id": str(product["ProductId"]),
+                "name": product_name,
+                "quantity": quantity,
+                "unit_price": float(product["Price"]),
+            }
+        )
+
+    # Create the order with its totals, so listing orders needs no join
+    cursor.execute(
+        """INSERT INTO orders (CustomerId, OrderDate, Status, TotalAmount, ItemCount)
+           VALUES (?, ?, ?, ?, ?)""",
+        (
+            customer_id,
+            datetime.now().isoformat(),
+            "Pending",
+            float(total_amount),
+            len(order_details),
+        ),
+    )
+    order_id = cursor.lastrowid
+
+    # Update inventory; the guard makes the stock check and the
+    # decrement a single atomic step
+    for product_id, (product_name, quantity) in requested.items():
+        cursor.execute(
+            """UPDATE products SET Quantity = Quantity - ?
+               WHERE ProductId = ? AND Quantity >= ?""",
+            (quantity, product_id, quantity),
+        )
+        if cursor.rowcount != 1:
+            raise ValueError(f"Insufficient stock for {product_name}")
+
+    # Add order details
+    cursor.executemany(
+        """INSERT INTO orders_details (OrderId, ProductId, Quantity, UnitPrice)
+           VALUES (?, ?, ?, ?)""",
+        [(order_id, *detail) for detail in order_details],
+    )
+
+    return {
+        "order_id": str(order_id),
+        "status": "success",
+        "message": "Order created successfully",
+        "total_amount": float(total_amount),
+        "products": ordered_products,
+        "customer_id": str(customer_id),
+    }
+
+
+class OrderWriter(GroupCommitWriter):
+    """Group-commit writer for orders coming from many sessions."""
+
+    def __init__(
+        self,
+        db_manager: Any,
+        max_batch_size: Optional[int] = None,
+        max_latency_ms: Optional[float] = None,
+    ):
+        """
+        Initialize the order writer.
+
+        Args:
+            db_manager: The database manager providing connections
+            max_batch_size (int, optional): Orders per transaction. Uses config if None.
+            max_latency_ms (float, optional): Flush latency. Uses config if None.
+        """
+        config = db_manager.config
+        super().__init__(
+            db_manager,
+            handler=self._write,
+            max_batch_size=max_batch_size or config.order_batch_size,
+            max_latency_ms=(
+                max_latency_ms
+                if max_latency_ms is not None
+                else config.order_flush_interval_ms
+            ),
+            name="order-writer",
+        )
+
+    @staticmethod
+    def _write(cursor: sqlite3.Cursor, item: tuple) -> Dict[str, Any]:
+        customer_id, products = item
+        return write_order(cursor, customer_id, products)
+
+    def create_order(
+        self, customer_id: Any, products: List[Dict[str, Any]], timeout: Optional[float] = None
+    ) -> Dict[str, Any]:
+        """
+        Queues an order and waits until its batch is committed.
+
+        Returns:
+            Dict[str, Any]: Order details from write_order.
+
+        Raises:
+            ValueError: If the order cannot be fulfilled.
+        """
+        return self.write((customer_id, products), timeout)
+
+    async def acreate_order(
+        self, customer_id: Any, products: List[Dict[str, Any]]
+    ) -> Dict[str, Any]:
+        """Async version of create_order; awaits the batch commit."""
+        return await self.awrite((customer_id, products))
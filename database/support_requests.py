@@ -0,0 +1,143 @@
+import csv
+import io
+import sqlite3
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Sequence
+
+from database.group_commit import GroupCommitWriter
+
+CSV_HEADER = ("Name", "Email", "Phone", "Timestamp")
+
+
+def write_support_request(cursor: sqlite3.Cursor, request: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Appends one support request using an open transaction.
+
+    Args:
+        cursor (sqlite3.Cursor): Cursor inside an open write transaction
+        request (Dict[str, Any]): thread_id, customer_id, full_name, email and phone
+
+    Returns:
+        Dict[str, Any]: The stored request with its id and timestamp.
+    """
+    created_at = datetime.now().isoformat()
+    cursor.execute(
+        """INSERT INTO support_requests (ThreadId, CustomerId, FullName, Email, Phone, CreatedAt)
+           VALUES (?, ?, ?, ?, ?, ?)""",
+        (
+            request["thread_id"],
+            request.get("customer_id"),
+            request["full_name"],
+            request["email"],
+            request["phone"],
+            created_at,
+        ),
+    )
+    return {**request, "request_id": cursor.lastrowid, "created_at": created_at}
+
+
+class SupportRequestWriter(GroupCommitWriter):
+    """Group-commit writer for support requests from many sessions."""
+
+    def __init__(
+        self,
+        db_manager: Any,
+        max_batch_size: Optional[int] = None,
+        max_latency_ms: Optional[float] = None,
+    ):
+        """
+        Initialize the support request writer.
+
+        Args:
+            db_manager: The database manager providing connections
+            max_batch_size (int, optional): Requests per transaction. Uses config if None.
+            max_latency_ms (float, optional): Flush latency. Uses config if None.
+        """
+        config = db_manager.config
+        super().__init__(
+            db_manager,
+            handler=write_support_request,
+            max_batch_size=max_batch_size or config.support_batch_size,
+            max_latency_ms=(
+                max_latency_ms
+                if max_latency_ms is not None
+                else config.support_flush_interval_ms
+            ),
+            name="support-request-writer",
+        )
+
+    def create_request(self, request: Dict[str, Any], timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Queues a request and waits until its batch is committed."""
+        return self.write(request, timeout)
+
+    async def acreate_request(self, request: Dict[str, Any]) -> Dict[str, Any]:
+        """Async version of create_request; awaits the batch commit."""
+        return await self.awrite(request)
+
+
+def get_support_requests(
+    db_manager: Any, thread_id: str, after_id: int = 0, limit: int = 500
+) -> List[sqlite3.Row]:
+    """
+    Returns a conversation's support requests, oldest first.
+
+    Args:
+        db_manager: The database manager providing connections
+        thread_id (str): The conversation's thread id
+        after_id (int): Only requests with a larger RequestId (keyset cursor)
+        limit (int): Maximum number of requests
+
+    Returns:
+        List[sqlite3.Row]: Matching support_requests rows.
+    """
+    with db_manager.get_connection() as conn:
+        return conn.execute(
+            """SELECT RequestId, FullName, Email, Phone, CreatedAt
+               FROM support_requests
+               WHERE ThreadId = ? AND RequestId > ?
+               ORDER BY RequestId
+               LIMIT ?""",
+            (thread_id, after_id, limit),
+        ).fetchall()
+
+
+def count_support_requests(db_manager: Any, thread_id: str) -> int:
+    """Returns how many support requests a conversation has recorded."""
+    with db_manager.get_connection() as conn:
+        return conn.execute(
+            "SELECT COUNT(*) FROM support_requests WHERE ThreadId = ?", (thread_id,)
+        ).fetchone()[0]
+
+
+def format_csv(rows: Sequence[sqlite3.Row], header: bool = False) -> str:
+    """Formats support request rows as CSV text."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    if header:
+        writer.writerow(CSV_HEADER)
+    writer.writerows(
+        (row["FullName"], row["Email"], row["Phone"], row["CreatedAt"]) for row in rows
+    )
+    return buffer.getvalue()
+
+
+def iter_support_requests_csv(
+    db_manager: Any, thread_id: str, batch_size: int = 500
+) -> Iterator[str]:
+    """
+    Streams a conversation's support requests as CSV chunks.
+
+    Rows are read in keyset-paginated batches, so the export never holds
+    more than one batch in memory or a connection between chunks.
+
+    Yields:
+        str: The header, then one chunk of CSV rows per batch.
+    """
+    yield format_csv([], header=True)
+    after_id = 0
+    while True:
+        rows = get_support_requests(db_manager, thread_id, after_id, batch_size)
+        if not rows:
+            return
+        yield format_csv(rows)
+        after_id = rows[-1]["RequestId"]
@@ -2,7 +2,6 @@
 Main entry point for the Tech Shop Assistant application.
 """
 import streamlit as st
-from langchain_core.messages import HumanMessage
 
 # Import UI components
 from ui.config import set_page_config, set_page_style
@@ -1,6 +1,7 @@
 import os
 import sqlite3
 from database.db_manager import DatabaseManager
+from virtual_sales_agent.embeddings import build_index
 
 def reset_database():
     """Reset the database by deleting it and recreating it with fresh data."""
@@ -31,6 +32,9 @@ def reset_database():
         if not db_manager.insert_products_from_json():
             print("Failed to insert products")
             return False
+
+        # Vector index for semantic product search
+        build_index(db_manager)
     
     print("Database reset successfully!")
     return True
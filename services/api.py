@@ -0,0 +1,346 @@
+"""
+Headless HTTP front-end for the sales agent graph.
+
+A plain ASGI application (no framework dependency) that serves chat turns,
+Server-Sent Event streams and the approve/deny step for sensitive tools.
+Conversations are keyed by customer_id and thread_id, and all state lives
+in the graph checkpointer, so any number of workers can serve the same
+threads. Run it with any ASGI server, e.g.:
+
+    uvicorn services.api:app --workers 4
+
+Endpoints:
+    GET  /health
+    GET  /threads/{thread_id}?customer_id=...
+    GET  /threads/{thread_id}/support-requests.csv?customer_id=...
+    POST /chat      {"customer_id", "thread_id", "message", "stream"?}
+    POST /approval  {"customer_id", "thread_id", "approved", "reason"?, "stream"?}
+
+With "stream": true the response is an SSE stream of "token", "tool_calls",
+"message", "approval_required", "error" and "done" events; otherwise the
+events of the turn are collected into a single JSON response.
+"""
+import json
+import logging
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from urllib.parse import parse_qs
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+from services import graph_service
+
+logger = logging.getLogger(__name__)
+
+MAX_BODY_BYTES = 64 * 1024
+
+# Support requests read per database round trip of a CSV export
+EXPORT_BATCH_SIZE = 500
+
+# Threads with a run in progress in this worker
+_active_threads: set = set()
+
+
+class HTTPError(Exception):
+    """An error returned to the client with a status code."""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def _run_config(customer_id: str, thread_id: str) -> Dict[str, Any]:
+    """Builds the graph config; threads are namespaced by customer."""
+    return {
+        "configurable": {
+            "customer_id": customer_id,
+            "thread_id": f"{customer_id}:{thread_id}",
+        }
+    }
+
+
+def _require_str(body: Dict[str, Any], key: str) -> str:
+    value = body.get(key)
+    if not isinstance(value, str) or not value.strip():
+        raise HTTPError(422, f"'{key}' must be a non-empty string")
+    return value.strip()
+
+
+def _tool_call_payload(tool_call: Dict[str, Any]) -> Dict[str, Any]:
+    return {"id": tool_call["id"], "name": tool_call["name"], "args": tool_call["args"]}
+
+
+async def _pending_approval(config: Dict[str, Any]) -> List[Dict[str, Any]]:
+    snapshot = await graph_service.aget_graph_state(config)
+    if not snapshot.next:
+        return []
+    return graph_service.extract_tool_calls(snapshot.values)
+
+
+async def _run_turn(
+    messages: Optional[list], config: Dict[str, Any]
+) -> AsyncIterator[Tuple[str, Dict[str, Any]]]:
+    """Runs the graph and yields (event, data) pairs for the client."""
+    async for kind, data in graph_service.astream_graph(messages, config):
+        if kind == "token":
+            if isinstance(data.content, str):
+                yield "token", {"content": data.content}
+            continue
+
+        node, update = data
+        if not isinstance(update, dict):
+            continue
+        new_messages = update.get("messages") or []
+        if not isinstance(new_messages, list):
+            new_messages = [new_messages]
+        for message in new_messages:
+            if not isinstance(message, AIMessage):
+                continue
+            if message.tool_calls:
+                yield "tool_calls", {
+                    "names": sorted({tc["name"] for tc in message.tool_calls})
+                }
+            if message.content:
+                yield "message", {"id": message.id, "content": message.content}
+
+    pending = await _pending_approval(config)
+    if pending:
+        yield "approval_required", {
+            "tool_calls": [_tool_call_payload(tc) for tc in pending]
+        }
+
+
+async def _read_json(receive) -> Dict[str, Any]:
+    chunks, size = [], 0
+    while True:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            raise HTTPError(400, "Client disconnected")
+        chunk = message.get("body", b"")
+        size += len(chunk)
+        if size > MAX_BODY_BYTES:
+            raise HTTPError(413, "Request body too large")
+        chunks.append(chunk)
+        if not message.get("more_body", False):
+            break
+    try:
+        body = json.loads(b"".join(chunks) or b"{}")
+    except ValueError:
+        raise HTTPError(400, "Request body must be JSON")
+    if not isinstance(body, dict):
+        raise HTTPError(400, "Request body must be a JSON object")
+    return body
+
+
+async def _send_json(send, status: int, payload: Any) -> None:
+    body = json.dumps(payload, default=str).encode()
+    await send(
+        {
+            "type": "http.response.start",
+            "status": status,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        }
+    )
+    await send({"type": "http.response.body", "body": body})
+
+
+async def _send_events(
+    send, events: AsyncIterator[Tuple[str, Dict[str, Any]]]
+) -> None:
+    """Streams events to the client as Server-Sent Events."""
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ],
+        }
+    )
+    try:
+        async for event, data in events:
+            frame = f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+            await send(
+                {"type": "http.response.body", "body": frame.encode(), "more_body": True}
+            )
+    except Exception as e:
+        logger.error(f"Error while streaming a turn: {e}")
+        frame = f"event: error\ndata: {json.dumps({'message': str(e)})}\n\n"
+        await send(
+            {"type": "http.response.body", "body": frame.encode(), "more_body": True}
+        )
+    await send({"type": "http.response.body", "body": b"event: done\ndata: {}\n\n"})
+
+
+async def _collect(
+    thread_id: str, events: AsyncIterator[Tuple[str, Dict[str, Any]]]
+) -> Dict[str, Any]:
+    """Collects the events of a turn into one JSON response."""
+    messages, pending = [], []
+    async for event, data in events:
+        if event == "message":
+            messages.append(data)
+        elif event == "approval_required":
+            pending = data["tool_calls"]
+    return {"thread_id": thread_id, "messages": messages, "pending_approval": pending}
+
+
+async def _respond_with_turn(
+    send, body: Dict[str, Any], config: Dict[str, Any], messages: Optional[list]
+) -> None:
+    key = config["configurable"]["thread_id"]
+    if key in _active_threads:
+        raise HTTPError(409, "A turn is already running on this thread")
+    _active_threads.add(key)
+    try:
+        events = _run_turn(messages, config)
+        if body.get("stream"):
+            await _send_events(send, events)
+        else:
+            await _send_json(send, 200, await _collect(body["thread_id"], events))
+    finally:
+        _active_threads.discard(key)
+
+
+async def handle_chat(send, body: Dict[str, Any]) -> None:
+    """Runs one chat turn; only the new message is sent to the graph."""
+    config = _run_config(_require_str(body, "customer_id"), _require_str(body, "thread_id"))
+    message = _require_str(body, "message")
+    if await _pending_approval(config):
+        raise HTTPError(409, "The thread is waiting for an approval decision")
+    await _respond_with_turn(send, body, config, [HumanMessage(content=message)])
+
+
+async def handle_approval(send, body: Dict[str, Any]) -> None:
+    """Approves or denies the pending sensitive tool calls of a thread."""
+    config = _run_config(_require_str(body, "customer_id"), _require_str(body, "thread_id"))
+    approved = body.get("approved")
+    if not isinstance(approved, bool):
+        raise HTTPError(422, "'approved' must be a boolean")
+
+    pending = await _pending_approval(config)
+    if not pending:
+        raise HTTPError(409, "No action is waiting for approval")
+
+    if approved:
+        messages = None
+    else:
+        reason = body.get("reason") or "No reason given"
+        messages = graph_service.deny_tool_calls(pending, reason)
+    await _respond_with_turn(send, body, config, messages)
+
+
+async def handle_thread(send, thread_id: str, query: Dict[str, List[str]]) -> None:
+    """Returns the displayed conversation and any pending approval."""
+    customer_id = (query.get("customer_id") or [""])[0]
+    if not customer_id:
+        raise HTTPError(422, "'customer_id' query parameter is required")
+    config = _run_config(customer_id, thread_id)
+    snapshot = await graph_service.aget_graph_state(config)
+    pending = graph_service.extract_tool_calls(snapshot.values) if snapshot.next else []
+    await _send_json(
+        send,
+        200,
+        {
+            "thread_id": thread_id,
+            "messages": [
+                entry._asdict() for entry in graph_service.get_chat_view(snapshot)
+            ],
+            "pending_approval": [_tool_call_payload(tc) for tc in pending],
+        },
+    )
+
+
+async def handle_support_requests_csv(
+    send, thread_id: str, query: Dict[str, List[str]]
+) -> None:
+    """Streams the support requests of a thread as a CSV download."""
+    from database.support_requests import format_csv, get_support_requests
+    from virtual_sales_agent.tools import get_db_manager
+
+    customer_id = (query.get("customer_id") or [""])[0]
+    if not customer_id:
+        raise HTTPError(422, "'customer_id' query parameter is required")
+    key = _run_config(customer_id, thread_id)["configurable"]["thread_id"]
+    db_manager = get_db_manager()
+
+    await send(
+        {
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/csv; charset=utf-8"),
+                (b"content-disposition", b'attachment; filename="support_requests.csv"'),
+            ],
+        }
+    )
+    await send(
+        {"type": "http.response.body", "body": format_csv([], header=True).encode(), "more_body": True}
+    )
+    # Each page is read on the database executor, so the export neither
+    # blocks the event loop nor holds a connection while the client reads
+    after_id = 0
+    while True:
+        rows = await db_manager.run_in_executor(
+            get_support_requests, db_manager, key, after_id, EXPORT_BATCH_SIZE
+        )
+        if not rows:
+            break
+        await send(
+            {"type": "http.response.body", "body": format_csv(rows).encode(), "more_body": True}
+        )
+        after_id = rows[-1]["RequestId"]
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def _lifespan(receive, send) -> None:
+    while True:
+        message = await receive()
+        if message["type"] == "lifespan.startup":
+            await send({"type": "lifespan.startup.complete"})
+        elif message["type"] == "lifespan.shutdown":
+            await send({"type": "lifespan.shutdown.complete"})
+            return
+
+
+async def app(scope, receive, send) -> None:
+    """ASGI entry point."""
+    if scope["type"] == "lifespan":
+        await _lifespan(receive, send)
+        return
+    if scope["type"] != "http":
+        return
+
+    method, path = scope["method"], scope["path"].rstrip("/")
+    try:
+        if path == "/health" and method == "GET":
+            await _send_json(send, 200, {"status": "ok"})
+        elif path == "/chat" and method == "POST":
+            await handle_chat(send, await _read_json(receive))
+        elif path == "/approval" and method == "POST":
+            await handle_approval(send, await _read_json(receive))
+        elif (
+            path.startswith("/threads/")
+            and path.endswith("/support-requests.csv")
+            and method == "GET"
+        ):
+            query = parse_qs(scope.get("query_string", b"").decode())
+            thread_id = path[len("/threads/"):-len("/support-requests.csv")]
+            await handle_support_requests_csv(send, thread_id, query)
+        elif path.startswith("/threads/") and method == "GET":
+            query = parse_qs(scope.get("query_string", b"").decode())
+            await handle_thread(send, path[len("/threads/"):], query)
+        elif path in ("/health", "/chat", "/approval") or path.startswith("/threads/"):
+            raise HTTPError(405, "Method not allowed")
+        else:
+            raise HTTPError(404, "Not found")
+    except HTTPError as e:
+        await _send_json(send, e.status, {"error": e.message})
+    except Exception as e:
+        logger.error(f"Unhandled error for {method} {path}: {e}")
+        await _send_json(send, 500, {"error": "Internal server error"})
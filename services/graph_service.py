@@ -1,94 +1,211 @@
 """Service for interacting with the LangGraph."""
-import streamlit as st
-from langchain_core.messages import AIMessage
-from virtual_sales_agent.graph import graph
+from typing import NamedTuple
 
-def invoke_graph(payload=None):
+from langchain_core.messages import AIMessageChunk, HumanMessage, ToolMessage
+from virtual_sales_agent.graph import get_graph
+from virtual_sales_agent.utils import pending_tool_calls
+
+def _get_config(config=None):
+    """Returns the given run config, defaulting to the Streamlit session's."""
+    if config is not None:
+        return config
+    import streamlit as st
+
+    return st.session_state.config
+
+def invoke_graph(payload=None, config=None):
     """
     Invoke the graph with optional payload.
     
     Args:
         payload: Optional payload to send to the graph.
+        config: Optional run config; defaults to the session's.
         
     Returns:
         The result of the graph invocation.
     """
-    config = st.session_state.config
-    return graph.invoke(payload, config)
+    return get_graph().invoke(payload, _get_config(config))
 
-def stream_graph(messages):
+async def ainvoke_graph(payload=None, config=None):
     """
-    Stream events from the graph.
+    Invoke the graph on the running event loop.
     
     Args:
-        messages: The messages to stream to the graph.
+        payload: Optional payload to send to the graph.
+        config: Optional run config; defaults to the session's.
         
     Returns:
-        A list of events from the graph.
-    """
-    config = st.session_state.config
-    return list(
-        graph.stream(
-            {"messages": messages},
-            config,
-            stream_mode="values",
-        )
-    )
+        The result of the graph invocation.
+    """
+    return await get_graph().ainvoke(payload, _get_config(config))
+
+class ChatEntry(NamedTuple):
+    """A message as displayed in the chat."""
+
+    id: str
+    role: str
+    content: str
+
+def _stream_events(mode, chunk):
+    """Converts a ("messages" | "updates") stream chunk into UI events."""
+    if mode == "messages":
+        message, metadata = chunk
+        if (
+            isinstance(message, AIMessageChunk)
+            and message.content
+            and metadata.get("langgraph_node") == "assistant"
+        ):
+            yield "token", message
+    elif isinstance(chunk, dict):
+        for node, update in chunk.items():
+            yield "update", (node, update)
+
+def stream_graph(messages=None, config=None):
+    """
+    Stream a run of the graph as it happens.
+    
+    Uses the "messages" and "updates" stream modes, so LLM tokens are
+    yielded while the assistant is generating and node updates as soon as
+    each node finishes, instead of after the whole run.
+    
+    Only new messages should be sent; the checkpoint already holds the
+    rest of the conversation.
+    
+    Args:
+        messages: The new messages to send to the graph, or None to resume
+            an interrupted run.
+        config: Optional run config; defaults to the session's.
+        
+    Yields:
+        ("token", AIMessageChunk) for each assistant token and
+        ("update", (node, update)) for each finished node.
+    """
+    payload = {"messages": messages} if messages is not None else None
+    for mode, chunk in get_graph().stream(
+        payload, _get_config(config), stream_mode=["messages", "updates"]
+    ):
+        yield from _stream_events(mode, chunk)
+
+async def astream_graph(messages=None, config=None):
+    """
+    Async version of stream_graph, for serving many conversations on one
+    event loop.
+    
+    Args:
+        messages: The new messages to send to the graph, or None to resume
+            an interrupted run.
+        config: Optional run config; defaults to the session's.
+        
+    Yields:
+        The same events as stream_graph.
+    """
+    payload = {"messages": messages} if messages is not None else None
+    async for mode, chunk in get_graph().astream(
+        payload, _get_config(config), stream_mode=["messages", "updates"]
+    ):
+        for event in _stream_events(mode, chunk):
+            yield event
 
-def get_graph_state():
+def get_graph_state(config=None):
     """
     Get the current state of the graph.
     
+    Args:
+        config: Optional run config; defaults to the session's.
+        
     Returns:
         The current state of the graph.
     """
-    config = st.session_state.config
-    return graph.get_state(config)
+    return get_graph().get_state(_get_config(config))
 
-def extract_tool_call(event):
+async def aget_graph_state(config=None):
     """
-    Extract tool call from an event if present.
+    Get the current state of the graph without blocking the event loop.
     
     Args:
-        event: The event to extract the tool call from.
+        config: Optional run config; defaults to the session's.
         
     Returns:
-        The tool call if present, None otherwise.
+        The current state of the graph.
     """
-    if isinstance(event, dict) and "messages" in event:
-        messages = event["messages"]
-        last_message = messages[-1] if messages else None
+    return await get_graph().aget_state(_get_config(config))
 
-        if isinstance(last_message, AIMessage):
-            if hasattr(last_message, "tool_calls") and last_message.tool_calls:
-                return last_message.tool_calls[0]
+def get_chat_view(snapshot=None, config=None):
+    """
+    Build the displayed chat from the checkpointed conversation.
     
-    return None
+    The checkpoint is the single source of truth for the conversation; the
+    UI only keeps this lightweight view of the customer and assistant
+    messages that have text.
+    
+    Args:
+        snapshot: A state snapshot to use instead of fetching the current one.
+        config: Optional run config; defaults to the session's.
+        
+    Returns:
+        A list of ChatEntry.
+    """
+    if snapshot is None:
+        snapshot = get_graph_state(config)
+    view = []
+    for message in snapshot.values.get("messages", []):
+        if message.type not in ("human", "ai") or not message.content:
+            continue
+        content = message.content
+        if not isinstance(content, str):
+            content = " ".join(
+                part.get("text", "") for part in content if isinstance(part, dict)
+            )
+        role = "user" if isinstance(message, HumanMessage) else "assistant"
+        view.append(ChatEntry(message.id, role, content))
+    return view
 
-def process_result(result, seen_ids=None):
+def extract_tool_call(event):
     """
-    Process a result from the graph and extract any messages.
+    Extract tool call from an event if present.
     
     Args:
-        result: The result to process.
-        seen_ids: A set of already processed message IDs.
+        event: The event to extract the tool call from.
         
     Returns:
-        A tuple of (updated_seen_ids, last_message) where last_message is the last AIMessage
-        extracted from the result, or None if no new message was found.
+        The first pending tool call if present, None otherwise.
     """
-    if seen_ids is None:
-        seen_ids = set()
-        
-    last_message = None
+    tool_calls = extract_tool_calls(event)
+    return tool_calls[0] if tool_calls else None
+
+def extract_tool_calls(event, tool_names=None):
+    """
+    Extract the pending tool calls from an event.
+    
+    Safe tools may already have answered some of the calls of the last
+    assistant message, so only the calls without a result are returned.
     
-    if isinstance(result, dict) and "messages" in result:
-        messages = result["messages"]
-        message = messages[-1] if messages else None
+    Args:
+        event: The event to extract the tool calls from.
+        tool_names: Optional set of tool names to filter on.
         
-        if isinstance(message, AIMessage):
-            if message.id not in seen_ids and message.content:
-                seen_ids.add(message.id)
-                last_message = message
+    Returns:
+        A list of pending tool calls, empty if there are none.
+    """
+    if isinstance(event, dict) and "messages" in event:
+        return pending_tool_calls(event["messages"], tool_names)
+    return []
+
+def deny_tool_calls(tool_calls, reason):
+    """
+    Build the tool results that tell the assistant its actions were denied.
     
-    return seen_ids, last_message
\ No newline at end of file
+    Args:
+        tool_calls: The pending tool calls being denied.
+        reason: The customer's reason for the denial.
+        
+    Returns:
+        A list of ToolMessage, one per tool call.
+    """
+    return [
+        ToolMessage(
+            tool_call_id=tool_call["id"],
+            content=f"API call denied by user. Reasoning: '{reason}'. Continue assisting, accounting for the user's input.",
+        )
+        for tool_call in tool_calls
+    ]
@@ -1,4 +1,5 @@
 from database.db_manager import DatabaseManager, logger
+from virtual_sales_agent.embeddings import build_index
 
 
 def main():
@@ -16,6 +17,9 @@ def main():
             logger.error("Failed to insert products")
             return False
 
+        # Vector index for semantic product search
+        build_index(db_manager)
+
     logger.info("Database setup completed successfully")
     return True
 
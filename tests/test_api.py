@@ -0,0 +1,192 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import httpx
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import END, START, MessagesState, StateGraph
+
+from database.config import DatabaseConfig
+from database.db_manager import DatabaseManager
+from services import api, graph_service
+from virtual_sales_agent import tools
+from virtual_sales_agent.utils import create_tool_node_with_fallback, pending_tool_calls
+
+
+@tool
+def create_order(item: str) -> str:
+    """Places an order."""
+    return f"ordered {item}"
+
+
+def build_test_graph():
+    """A small graph with the same approval flow as the sales agent."""
+
+    def assistant(state: MessagesState):
+        last = state["messages"][-1]
+        if isinstance(last, ToolMessage):
+            return {"messages": AIMessage(content=f"Done: {last.content}")}
+        if "order" in last.content:
+            return {
+                "messages": AIMessage(
+                    content="",
+                    tool_calls=[{"name": "create_order", "args": {"item": "mouse"}, "id": "call-1"}],
+                )
+            }
+        llm = GenericFakeChatModel(messages=iter([AIMessage(content="Hello there")]))
+        return {"messages": llm.invoke(state["messages"])}
+
+    def route(state: MessagesState):
+        return "sensitive_tools" if pending_tool_calls(state["messages"]) else END
+
+    builder = StateGraph(MessagesState)
+    builder.add_node("assistant", assistant)
+    builder.add_node("sensitive_tools", create_tool_node_with_fallback([create_order]))
+    builder.add_edge(START, "assistant")
+    builder.add_conditional_edges("assistant", route, ["sensitive_tools", END])
+    builder.add_edge("sensitive_tools", "assistant")
+    return builder.compile(checkpointer=MemorySaver(), interrupt_before=["sensitive_tools"])
+
+
+class TestApi(unittest.IsolatedAsyncioTestCase):
+    """Test cases for the HTTP/SSE front-end."""
+
+    async def asyncSetUp(self):
+        test_graph = build_test_graph()
+        patcher = patch.object(graph_service, "get_graph", lambda: test_graph)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.client = httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=api.app), base_url="http://test"
+        )
+
+    async def asyncTearDown(self):
+        await self.client.aclose()
+
+    def _body(self, **kwargs):
+        return {"customer_id": "c1", "thread_id": "t1", **kwargs}
+
+    async def test_health(self):
+        response = await self.client.get("/health")
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json(), {"status": "ok"})
+
+    async def test_chat_turn(self):
+        response = await self.client.post("/chat", json=self._body(message="hi"))
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertEqual([m["content"] for m in payload["messages"]], ["Hello there"])
+        self.assertEqual(payload["pending_approval"], [])
+
+    async def test_chat_stream_sends_tokens(self):
+        response = await self.client.post(
+            "/chat", json=self._body(message="hi", stream=True)
+        )
+        self.assertEqual(response.headers["content-type"], "text/event-stream")
+        events = [
+            line.split(": ", 1)[1]
+            for line in response.text.splitlines()
+            if line.startswith("event: ")
+        ]
+        self.assertIn("token", events)
+        self.assertIn("message", events)
+        self.assertEqual(events[-1], "done")
+
+    async def test_approval_flow(self):
+        response = await self.client.post("/chat", json=self._body(message="order a mouse"))
+        pending = response.json()["pending_approval"]
+        self.assertEqual([tc["name"] for tc in pending], ["create_order"])
+
+        # The thread waits for a decision before taking new messages
+        response = await self.client.post("/chat", json=self._body(message="hi"))
+        self.assertEqual(response.status_code, 409)
+
+        response = await self.client.post("/approval", json=self._body(approved=True))
+        self.assertEqual(response.json()["messages"][0]["content"], "Done: ordered mouse")
+
+        response = await self.client.post("/approval", json=self._body(approved=True))
+        self.assertEqual(response.status_code, 409)
+
+    async def test_denial(self):
+        await self.client.post("/chat", json=self._body(message="order a mouse"))
+        response = await self.client.post(
+            "/approval", json=self._body(approved=False, reason="too expensive")
+        )
+        content = response.json()["messages"][0]["content"]
+        self.assertIn("denied", content)
+        self.assertIn("too expensive", content)
+
+    async def test_threads_are_scoped_to_customers(self):
+        await self.client.post("/chat", json=self._body(message="hi"))
+
+        response = await self.client.get("/threads/t1", params={"customer_id": "c1"})
+        roles = [m["role"] for m in response.json()["messages"]]
+        self.assertEqual(roles, ["user", "assistant"])
+
+        response = await self.client.get("/threads/t1", params={"customer_id": "c2"})
+        self.assertEqual(response.json()["messages"], [])
+
+    async def test_support_requests_csv_export(self):
+        with tempfile.TemporaryDirectory() as temp_dir:
+            config = DatabaseConfig(
+                db_name="test_store.db",
+                db_path=os.path.join(temp_dir, "test_store.db"),
+                schema_path="database/db/schemas.sql",
+                products_path="database/db/products.json",
+            )
+            db_manager = DatabaseManager(config)
+            db_manager.create_database()
+            try:
+                with db_manager.get_connection() as conn:
+                    conn.executemany(
+                        """INSERT INTO support_requests
+                           (ThreadId, CustomerId, FullName, Email, Phone, CreatedAt)
+                           VALUES (?, ?, ?, ?, ?, '2026-01-01T00:00:00')""",
+                        [
+                            (f"{customer}:t1", customer, f"{customer} {i}", "a@b.co", "5550100")
+                            for customer in ("c1", "c2")
+                            for i in range(3)
+                        ],
+                    )
+                    conn.commit()
+                with patch.object(tools, "db_manager", db_manager), patch.object(
+                    api, "EXPORT_BATCH_SIZE", 2
+                ):
+                    response = await self.client.get(
+                        "/threads/t1/support-requests.csv", params={"customer_id": "c1"}
+                    )
+                    missing = await self.client.get("/threads/t1/support-requests.csv")
+            finally:
+                db_manager.close()
+
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.headers["content-type"].startswith("text/csv"))
+        lines = response.text.splitlines()
+        self.assertEqual(lines[0], "Name,Email,Phone,Timestamp")
+        self.assertEqual([line.split(",")[0] for line in lines[1:]], ["c1 0", "c1 1", "c1 2"])
+        self.assertEqual(missing.status_code, 422)
+
+    async def test_validation_errors(self):
+        response = await self.client.post("/chat", json={"thread_id": "t1", "message": "hi"})
+        self.assertEqual(response.status_code, 422)
+
+        response = await self.client.post(
+            "/chat", content=b"not json", headers={"content-type": "application/json"}
+        )
+        self.assertEqual(response.status_code, 400)
+
+        response = await self.client.get("/chat")
+        self.assertEqual(response.status_code, 405)
+
+        response = await self.client.get("/nowhere")
+        self.assertEqual(response.status_code, 404)
+        self.assertIn("error", json.loads(response.text))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import argparse
+import asyncio
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+
+from benchmarks import import_time, load_test
+from benchmarks.fake_llm import ScriptedChatModel, sales_script
+from virtual_sales_agent import tools
+
+
+class TestScriptedChatModel(unittest.TestCase):
+    """Test cases for the scripted chat model."""
+
+    def test_script_emits_tool_calls(self):
+        model = ScriptedChatModel().bind_tools([tools.search_products])
+        result = model.invoke([HumanMessage(content="I'm looking for a gaming mouse")])
+        self.assertEqual(result.tool_calls[0]["name"], "search_products")
+        self.assertEqual(result.tool_calls[0]["args"], {"query": "a gaming mouse"})
+
+        result = model.invoke([HumanMessage(content="Order 2 Logitech G502 HERO")])
+        self.assertEqual(
+            result.tool_calls[0]["args"]["products"],
+            [{"ProductName": "logitech g502 hero", "Quantity": 2}],
+        )
+
+    def test_tool_results_get_a_text_reply(self):
+        messages = [
+            HumanMessage(content="find keyboards"),
+            AIMessage(content="", tool_calls=[{"name": "search_products", "args": {}, "id": "1"}]),
+            ToolMessage(content="[]", tool_call_id="1", name="search_products"),
+        ]
+        self.assertIn("search_products", sales_script(messages).content)
+
+    def test_streams_tokens_and_tool_calls(self):
+        model = ScriptedChatModel()
+        chunks = list(model.stream([HumanMessage(content="hello")]))
+        self.assertGreater(len(chunks), 1)
+        self.assertEqual(
+            "".join(c.content for c in chunks), "Happy to help! What are you looking for today?"
+        )
+
+        async def astream():
+            return [c async for c in model.astream([HumanMessage(content="find mice")])]
+
+        chunks = asyncio.run(astream())
+        merged = sum(chunks[1:], chunks[0])
+        self.assertEqual(merged.tool_calls[0]["name"], "search_products")
+
+    def test_latency_is_seeded(self):
+        first = ScriptedChatModel(first_token_latency_ms=100, seed=7)
+        second = ScriptedChatModel(first_token_latency_ms=100, seed=7)
+        self.assertEqual(
+            [first._delay(100) for _ in range(5)], [second._delay(100) for _ in range(5)]
+        )
+
+
+class TestLoadTest(unittest.TestCase):
+    """Test cases for the load benchmark."""
+
+    def setUp(self):
+        self.workdir = Path(tempfile.mkdtemp())
+        self.saved = {
+            name: getattr(tools, name) for name in ("db_manager", "order_writer", "recommender")
+        }
+
+    def tearDown(self):
+        for name, value in self.saved.items():
+            setattr(tools, name, value)
+        shutil.rmtree(self.workdir)
+
+    def test_percentile(self):
+        values = list(range(1, 101))
+        self.assertEqual(load_test.percentile(values, 50), 50)
+        self.assertEqual(load_test.percentile(values, 99), 99)
+        self.assertEqual(load_test.percentile([], 95), 0.0)
+
+    def test_small_run_completes_every_journey(self):
+        args = argparse.Namespace(
+            customers=3, concurrency=2, first_token_ms=0.0, token_ms=0.0, jitter=0.2, seed=0
+        )
+        graph, cleanup = load_test.build_environment(self.workdir, args)
+        try:
+            report = load_test.run_load(graph, customers=3, concurrency=2)
+        finally:
+            cleanup()
+
+        self.assertEqual(report["errors"], 0, report["error_samples"])
+        # Four messages per customer plus the order approval
+        self.assertEqual(report["turns"], 3 * (len(load_test.DEFAULT_JOURNEY) + 1))
+        self.assertIn("approval", report["latency_ms_by_kind"])
+        self.assertGreater(report["throughput_turns_per_s"], 0)
+        self.assertIn("p99", load_test.format_report(report))
+
+
+class TestImportTime(unittest.TestCase):
+    """Test cases for the import-time budget."""
+
+    def test_agent_modules_import_lazily(self):
+        for module in ("virtual_sales_agent.graph", "services.api"):
+            report = import_time.measure(module)
+            self.assertEqual(report.forbidden(), [], module)
+            self.assertGreater(report.cumulative_ms, 0)
+            self.assertIn("virtual_sales_agent.tools", report.imported)
+
+
+if __name__ == '__main__':
+    unittest.main()
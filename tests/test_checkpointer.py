@@ -0,0 +1,101 @@
+import unittest
+import tempfile
+import shutil
+import time
+from pathlib import Path
+from typing import Annotated
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langgraph.graph import END, START, StateGraph
+from langgraph.graph.message import AnyMessage, add_messages
+from typing_extensions import TypedDict
+
+from database.config import DatabaseConfig
+from virtual_sales_agent.checkpointer import SqliteCheckpointer
+
+
+class State(TypedDict):
+    messages: Annotated[list[AnyMessage], add_messages]
+
+
+def echo(state: State):
+    return {"messages": [AIMessage(content=f"echo: {state['messages'][-1].content}")]}
+
+
+class TestSqliteCheckpointer(unittest.TestCase):
+    """Test cases for the SQLite checkpointer."""
+
+    def setUp(self):
+        """Set up a temporary checkpoint database."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = DatabaseConfig(
+            db_name="checkpoints.db",
+            db_path=str(Path(self.temp_dir) / "checkpoints.db"),
+        )
+        builder = StateGraph(State)
+        builder.add_node("echo", echo)
+        builder.add_edge(START, "echo")
+        builder.add_edge("echo", END)
+        self.builder = builder
+        self.savers = []
+
+    def tearDown(self):
+        """Clean up the temporary directory."""
+        for saver in self.savers:
+            saver.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _graph(self, **kwargs):
+        saver = SqliteCheckpointer(self.config, prune_interval=0, **kwargs)
+        self.savers.append(saver)
+        return saver, self.builder.compile(checkpointer=saver)
+
+    def test_conversation_survives_restart(self):
+        """Test state is restored by a new checkpointer on the same file."""
+        _, graph = self._graph()
+        config = {"configurable": {"thread_id": "thread-1"}}
+        graph.invoke({"messages": [HumanMessage(content="hello")]}, config)
+        graph.invoke({"messages": [HumanMessage(content="again")]}, config)
+
+        _, restarted = self._graph()
+        messages = restarted.get_state(config).values["messages"]
+        self.assertEqual(
+            [m.content for m in messages], ["hello", "echo: hello", "again", "echo: again"]
+        )
+
+    def test_retention_keeps_last_checkpoints(self):
+        """Test only the newest N checkpoints per thread are stored."""
+        saver, graph = self._graph(max_checkpoints_per_thread=3)
+        config = {"configurable": {"thread_id": "thread-1"}}
+        for i in range(5):
+            graph.invoke({"messages": [HumanMessage(content=f"message {i}")]}, config)
+
+        history = list(saver.list(config))
+        self.assertEqual(len(history), 3)
+        self.assertEqual(len(graph.get_state(config).values["messages"]), 10)
+
+    def test_large_checkpoints_are_compressed(self):
+        """Test big checkpoints round-trip through compression."""
+        saver, graph = self._graph(compress_threshold=64)
+        config = {"configurable": {"thread_id": "thread-1"}}
+        graph.invoke({"messages": [HumanMessage(content="x" * 5000)]}, config)
+
+        with saver.db_manager.get_connection() as conn:
+            types = {row[0] for row in conn.execute("SELECT type FROM checkpoints")}
+        self.assertTrue(any(t.endswith("+zlib") for t in types))
+        self.assertEqual(graph.get_state(config).values["messages"][0].content, "x" * 5000)
+
+    def test_prune_idle_threads(self):
+        """Test idle threads are deleted while active ones are kept."""
+        saver, graph = self._graph()
+        graph.invoke({"messages": [HumanMessage(content="old")]}, {"configurable": {"thread_id": "old"}})
+        time.sleep(0.05)
+        graph.invoke({"messages": [HumanMessage(content="new")]}, {"configurable": {"thread_id": "new"}})
+
+        self.assertEqual(saver.prune_idle_threads(idle_for=0.03), 1)
+        self.assertIsNone(saver.get_tuple({"configurable": {"thread_id": "old"}}))
+        self.assertIsNotNone(saver.get_tuple({"configurable": {"thread_id": "new"}}))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,80 @@
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+
+from virtual_sales_agent.context import ConversationWindow, count_text_tokens
+
+
+def make_turn(i, reply_chars=400):
+    call_id = f"call_{i}"
+    return [
+        HumanMessage(content=f"Question {i} about gaming mice", id=f"h{i}"),
+        AIMessage(
+            content="",
+            id=f"a{i}",
+            tool_calls=[{"name": "search_products", "args": {"query": "mouse"}, "id": call_id}],
+        ),
+        ToolMessage(
+            content="x" * 2000, name="search_products", tool_call_id=call_id, id=f"t{i}"
+        ),
+        AIMessage(content=f"Answer {i} " + "y" * reply_chars, id=f"r{i}"),
+    ]
+
+
+class TestConversationWindow(unittest.TestCase):
+    def test_history_within_budget_is_unchanged(self):
+        window = ConversationWindow(max_tokens=100000)
+        messages = make_turn(1) + make_turn(2)
+        self.assertEqual(window(messages), messages)
+
+    def test_long_history_fits_budget(self):
+        window = ConversationWindow(max_tokens=3000, keep_recent_turns=2)
+        messages = [m for i in range(40) for m in make_turn(i)]
+
+        result = window(messages)
+
+        self.assertLessEqual(window.count_tokens(result), 3000)
+        # Recent turns are kept verbatim, including tool results
+        self.assertEqual(result[-8:], messages[-8:])
+        # The oldest turns are folded into a summary
+        self.assertIsInstance(result[0], SystemMessage)
+        self.assertIn("Summary of the earlier conversation", result[0].content)
+
+    def test_older_turns_drop_tool_messages(self):
+        window = ConversationWindow(max_tokens=1200, keep_recent_turns=1)
+        messages = [m for i in range(3) for m in make_turn(i)]
+
+        result = window(messages)
+        older = result[:-4]
+
+        self.assertTrue(older)
+        self.assertFalse(any(isinstance(m, ToolMessage) for m in older))
+        self.assertFalse(any(getattr(m, "tool_calls", None) for m in older))
+        self.assertTrue(any("[Tools used: search_products]" in m.content for m in older))
+
+    def test_token_counts_are_cached(self):
+        window = ConversationWindow()
+        message = HumanMessage(content="hello there", id="m1")
+        first = window.count_message_tokens(message)
+        self.assertEqual(window.count_message_tokens(message), first)
+        self.assertEqual(len(window._cache), 1)
+        self.assertEqual(count_text_tokens(""), 0)
+
+    def test_cache_is_shared_between_threads(self):
+        window = ConversationWindow(cache_size=8)
+        messages = [HumanMessage(content=f"message {i}", id=f"m{i}") for i in range(32)]
+        expected = [window.count_message_tokens(m) for m in messages]
+
+        def count():
+            for _ in range(50):
+                self.assertEqual([window.count_message_tokens(m) for m in messages], expected)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            for future in [pool.submit(count) for _ in range(8)]:
+                future.result()
+        self.assertEqual(len(window._cache), 8)
+
+
+if __name__ == "__main__":
+    unittest.main()
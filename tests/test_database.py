@@ -2,10 +2,18 @@ import unittest
 import os
 import tempfile
 import shutil
+import threading
+import json
 from pathlib import Path
 
+import pyarrow as pa
+import pyarrow.csv as pcsv
+import pyarrow.parquet as pq
+
+from database import catalog_loader
 from database.db_manager import DatabaseManager
 from database.config import DatabaseConfig
+from database.group_commit import GroupCommitWriter
 
 
 class TestDatabaseManager(unittest.TestCase):
@@ -29,6 +37,7 @@ class TestDatabaseManager(unittest.TestCase):
 
     def tearDown(self):
         """Clean up the temporary directory."""
+        self.db_manager.close()
         shutil.rmtree(self.temp_dir)
 
     def test_create_database(self):
@@ -76,6 +85,220 @@ class TestDatabaseManager(unittest.TestCase):
             count = cursor.fetchone()["count"]
             self.assertGreater(count, 0)
 
+    def test_connection_pool_uses_wal(self):
+        """Test pooled connections are opened in WAL mode and reused."""
+        self.db_manager.create_database()
+
+        with self.db_manager.get_connection() as conn:
+            mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+            self.assertEqual(mode, "wal")
+            with self.db_manager.get_connection() as nested:
+                self.assertIs(nested, conn)
+
+        with self.db_manager.get_connection() as again:
+            self.assertIs(again, conn)
+
+        stats = self.db_manager.pool_stats()
+        self.assertEqual(stats["size"], 1)
+        self.assertEqual(stats["in_use"], 0)
+
+    def test_connection_pool_concurrent_checkouts(self):
+        """Test concurrent threads share a bounded number of connections."""
+        self.db_manager.create_database()
+        errors = []
+
+        def worker():
+            try:
+                for _ in range(20):
+                    self.db_manager.insert_product(
+                        product_name="Pool Product",
+                        category="Test Category",
+                        description="Test Description",
+                        price=9.99,
+                        quantity=1,
+                    )
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(16)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        stats = self.db_manager.pool_stats()
+        self.assertLessEqual(stats["size"], self.config.pool_size)
+        self.assertEqual(stats["in_use"], 0)
+
+        with self.db_manager.get_connection() as conn:
+            count = conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+            self.assertEqual(count, 16 * 20)
+
+    def test_group_commit_writer_isolates_failed_items(self):
+        """Test a failing item in a batch does not affect the others."""
+        self.db_manager.create_database()
+
+        def insert(cursor, item):
+            if item["price"] <= 0:
+                # Partially written items are rolled back to their savepoint
+                cursor.execute(
+                    "INSERT INTO products (ProductName, Category, Price, Quantity) VALUES (?, 'c', 1, 1)",
+                    (item["name"] + " partial",),
+                )
+                raise ValueError("invalid price")
+            cursor.execute(
+                "INSERT INTO products (ProductName, Category, Price, Quantity) VALUES (?, 'c', ?, 1)",
+                (item["name"], item["price"]),
+            )
+            return cursor.lastrowid
+
+        writer = GroupCommitWriter(self.db_manager, insert, max_batch_size=10, max_latency_ms=50)
+        futures = [
+            writer.submit({"name": f"item {i}", "price": 0 if i == 3 else 5})
+            for i in range(6)
+        ]
+        writer.close()
+
+        with self.assertRaises(ValueError):
+            futures[3].result()
+        self.assertTrue(all(f.result() for i, f in enumerate(futures) if i != 3))
+        self.assertEqual(writer.stats()["batches"], 1)
+
+        with self.db_manager.get_connection() as conn:
+            names = {row[0] for row in conn.execute("SELECT ProductName FROM products")}
+        self.assertEqual(names, {f"item {i}" for i in range(6) if i != 3})
+
+
+class TestCatalogLoader(unittest.TestCase):
+    """Test cases for bulk catalog ingestion."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = DatabaseConfig(
+            db_name="test_store.db",
+            db_path=str(Path(self.temp_dir) / "test_store.db"),
+            schema_path="database/db/schemas.sql",
+        )
+        self.db_manager = DatabaseManager(self.config)
+        self.db_manager.create_database()
+        self.records = [
+            {"product_name": f"Product {i}", "category": f"Cat {i % 3}",
+             "description": f"Description {i}", "price": 10.0 + i,
+             "quantity": i % 4, "image_url": None}
+            for i in range(50)
+        ]
+
+    def tearDown(self):
+        self.db_manager.close()
+        shutil.rmtree(self.temp_dir)
+
+    def _write(self, name, records=None):
+        path = Path(self.temp_dir) / name
+        records = self.records if records is None else records
+        table = pa.Table.from_pylist(records)
+        if name.endswith(".json"):
+            path.write_text(json.dumps(records, indent=2))
+        elif name.endswith(".jsonl"):
+            path.write_text("\n".join(json.dumps(r) for r in records))
+        elif name.endswith(".csv"):
+            pcsv.write_csv(table, path)
+        else:
+            pq.write_table(table, path)
+        return str(path)
+
+    def _query(self, sql, params=()):
+        with self.db_manager.get_connection() as conn:
+            return [tuple(row) for row in conn.execute(sql, params).fetchall()]
+
+    def test_formats(self):
+        for name in ("catalog.json", "catalog.jsonl", "catalog.csv", "catalog.parquet"):
+            with self.subTest(name=name):
+                result = self.db_manager.bulk_load_products(self._write(name), batch_size=7)
+                self.assertEqual(result.rows_read, 50)
+                self.assertEqual(self._query("SELECT COUNT(*) FROM products"), [(50,)])
+                self.assertEqual(
+                    self._query("SELECT Category, Price FROM products WHERE ProductName = 'product 7'"),
+                    [("cat 1", 17.0)],
+                )
+
+    def test_upsert_updates_by_name(self):
+        self.db_manager.bulk_load_products(self._write("catalog.parquet"))
+        changed = [dict(r, product_name=r["product_name"].upper(), price=99.0) for r in self.records[:5]]
+        new = [dict(self.records[0], product_name="Brand New")]
+        result = self.db_manager.bulk_load_products(self._write("update.jsonl", changed + new))
+
+        self.assertEqual((result.updated, result.inserted), (5, 1))
+        self.assertEqual(self._query("SELECT COUNT(*) FROM products"), [(51,)])
+        self.assertEqual(
+            self._query("SELECT Price FROM products WHERE ProductName = 'product 0'"), [(99.0,)]
+        )
+
+        result = self.db_manager.bulk_load_products(self._write("again.csv", new), upsert=False)
+        self.assertEqual(result.inserted, 1)
+        self.assertEqual(self._query("SELECT COUNT(*) FROM products"), [(52,)])
+
+    def test_invalid_rows_are_rejected(self):
+        records = self.records[:3] + [
+            dict(self.records[3], price=0),
+            dict(self.records[4], quantity=-1),
+            dict(self.records[5], product_name=None),
+        ]
+        result = self.db_manager.bulk_load_products(self._write("catalog.json", records))
+        self.assertEqual((result.rows_read, result.inserted, result.rejected), (6, 3, 3))
+
+        with self.assertRaises(ValueError):
+            self.db_manager.bulk_load_products(
+                self._write("bad.jsonl", [{"product_name": "x", "price": 1}])
+            )
+
+    def test_json_records_with_different_keys(self):
+        sparse = {"product_name": "Sparse", "category": "Cat", "price": 5.0, "quantity": 1}
+        unpriced = {"product_name": "Unpriced", "category": "Cat", "quantity": 1}
+        records = [unpriced, sparse, dict(self.records[0], image_url="img.png")]
+        result = self.db_manager.bulk_load_products(self._write("catalog.json", records))
+        self.assertEqual((result.rows_read, result.inserted, result.rejected), (3, 2, 1))
+        self.assertEqual(
+            self._query("SELECT Description, ImageUrl FROM products ORDER BY ProductName"),
+            [("Description 0", "img.png"), (None, None)],
+        )
+
+    def test_triggers_and_derived_data_are_rebuilt(self):
+        self.db_manager.bulk_load_products(self._write("catalog.parquet"))
+        triggers = self._query(
+            "SELECT name FROM sqlite_master WHERE type = 'trigger' AND tbl_name = 'products'"
+        )
+        self.assertGreater(len(triggers), 0)
+        self.assertEqual(
+            self._query("SELECT COUNT(*) FROM products_fts WHERE products_fts MATCH 'description'"),
+            [(50,)],
+        )
+        in_stock = [r for r in self.records if r["quantity"] > 0]
+        self.assertEqual(
+            self._query("SELECT ProductCount, MinPrice, MaxPrice FROM catalog_stats"),
+            [(len(in_stock), min(r["price"] for r in in_stock), max(r["price"] for r in in_stock))],
+        )
+
+        # Row-by-row writes keep working through the recreated triggers
+        self.db_manager.insert_product("Triggered", "cat 0", "fresh", 5.0, 1)
+        self.assertEqual(
+            self._query("SELECT MinPrice FROM catalog_stats"), [(5.0,)]
+        )
+        self.assertEqual(
+            self._query("SELECT COUNT(*) FROM products_fts WHERE products_fts MATCH 'fresh'"), [(1,)]
+        )
+
+    def test_json_array_streams_across_chunks(self):
+        path = self._write("catalog.json")
+        records = list(catalog_loader._iter_json_array(path, chunk_size=64))
+        self.assertEqual(records, self.records)
+
+    def test_truncated_json_array_is_rejected(self):
+        path = Path(self._write("catalog.json"))
+        path.write_text(path.read_text()[:-40])
+        with self.assertRaises(ValueError):
+            list(catalog_loader._iter_json_array(str(path), chunk_size=64))
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
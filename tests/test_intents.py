@@ -0,0 +1,81 @@
+import asyncio
+import unittest
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from benchmarks.fake_llm import ScriptedChatModel
+from virtual_sales_agent.graph import build_graph
+from virtual_sales_agent.intents import RETURN_POLICY, IntentRouter
+
+
+class TestIntentRouter(unittest.TestCase):
+    def setUp(self):
+        self.router = IntentRouter()
+
+    def classify(self, text):
+        return self.router.classify(self.router.normalize(text))
+
+    def test_suggestions_are_classified(self):
+        self.assertEqual(self.classify("What is your return policy?"), "return_policy")
+        self.assertEqual(self.classify("How do refunds work?"), "return_policy")
+        self.assertEqual(
+            self.classify("I'd like to speak with a human representative"), "contact"
+        )
+        self.assertEqual(self.classify("Hello there!"), "greeting")
+        self.assertEqual(self.classify("Good morning"), "greeting")
+
+    def test_open_ended_turns_pass_through(self):
+        for text in (
+            "Hi, I'm looking for a gaming mouse",
+            "Can I return the laptop from order 12?",
+            "Talk to an agent about my order",
+            "Show me your best-selling products",
+            "",
+        ):
+            self.assertIsNone(self.classify(text), text)
+
+    def test_only_customer_messages_are_answered(self):
+        self.assertIsNone(self.router.answer(AIMessage(content="hello")))
+        self.assertIsNone(
+            self.router.answer(ToolMessage(content="hello", tool_call_id="call-1"))
+        )
+        reply = self.router.answer(HumanMessage(content="what's your returns policy"))
+        self.assertIn(RETURN_POLICY, reply.content)
+        self.assertEqual(reply.response_metadata["intent"], "return_policy")
+
+    def test_classification_is_cached(self):
+        for _ in range(3):
+            self.router.answer(HumanMessage(content="Hello!"))
+        stats = self.router.stats()
+        self.assertEqual(stats["answered"], {"greeting": 3})
+        self.assertEqual(stats["cache_hits"], 2)
+
+
+class TestFastPathGraph(unittest.TestCase):
+    def setUp(self):
+        self.llm = ScriptedChatModel()
+        self.config = {"configurable": {"customer_id": "123", "thread_id": "fast-path"}}
+
+    def test_faq_turn_skips_the_model(self):
+        graph = build_graph(self.llm, MemorySaver(), fast_path=True)
+        result = graph.invoke(
+            {"messages": [HumanMessage(content="What is your return policy?")]}, self.config
+        )
+        self.assertEqual(self.llm.calls, 0)
+        self.assertIn("30 days", result["messages"][-1].content)
+
+        result = asyncio.run(
+            graph.ainvoke({"messages": [HumanMessage(content="Can you help me?")]}, self.config)
+        )
+        self.assertEqual(self.llm.calls, 1)
+        self.assertEqual(len(result["messages"]), 4)
+
+    def test_fast_path_can_be_disabled(self):
+        graph = build_graph(self.llm, MemorySaver(), fast_path=False)
+        graph.invoke({"messages": [HumanMessage(content="Hello")]}, self.config)
+        self.assertEqual(self.llm.calls, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import json
+import unittest
+
+from langchain_core.messages import AIMessage
+from langchain_core.tools import tool
+
+from virtual_sales_agent import tools
+from virtual_sales_agent.payloads import PayloadCompactor, Projection, encode_table, project
+from virtual_sales_agent.utils import create_tool_node_with_fallback
+
+PROJECTION = Projection(
+    "products",
+    ("name", "price", "description"),
+    max_items=2,
+    text_limits={"description": 10},
+    keep_metadata=("search_mode",),
+)
+
+
+def products(count):
+    return [
+        {
+            "product_id": str(i),
+            "name": f"item {i}",
+            "price": 10.5 * i,
+            "description": "A very | long\ndescription",
+            "image_url": "https://example.com/image.png",
+        }
+        for i in range(1, count + 1)
+    ]
+
+
+@tool
+def search_products(query: str) -> dict:
+    """Finds products."""
+    return {"status": "success", "products": products(3), "metadata": {"search_mode": "keyword"}}
+
+
+class TestPayloads(unittest.TestCase):
+    def test_encode_table(self):
+        table = encode_table(products(1), ("name", "price", "description"), {"description": 10})
+        self.assertEqual(table, "name|price|description\nitem 1|10.5|A very...")
+
+    def test_project_keeps_top_items_and_selected_keys(self):
+        result = {
+            "status": "success",
+            "products": products(3),
+            "metadata": {"search_mode": "hybrid", "categories": [{"name": "mice"}]},
+        }
+        text = project(result, PROJECTION)
+        self.assertEqual(
+            text.splitlines()[:3],
+            ["status: success", "search_mode: hybrid", "products: 2 of 3 shown, best first"],
+        )
+        self.assertNotIn("item 3", text)
+        self.assertNotIn("categories", text)
+        self.assertNotIn("example.com", text)
+
+    def test_errors_and_unknown_tools_pass_through(self):
+        compactor = PayloadCompactor({"search_products": PROJECTION})
+        error = json.dumps({"status": "error", "message": "boom"})
+        self.assertEqual(compactor.compact("search_products", error), error)
+        self.assertEqual(compactor.compact("other_tool", "{}"), "{}")
+        self.assertEqual(compactor.compact("search_products", "not json"), "not json")
+        self.assertEqual(compactor.report(), {})
+
+    def test_tool_node_compacts_results(self):
+        compactor = PayloadCompactor({"search_products": PROJECTION})
+        node = create_tool_node_with_fallback([search_products], payloads=compactor)
+        call = {"name": "search_products", "args": {"query": "item"}, "id": "call-1"}
+        output = node.invoke({"messages": [AIMessage(content="", tool_calls=[call])]})
+
+        message = output["messages"][0]
+        self.assertTrue(message.content.startswith("status: success"))
+        report = compactor.report()["search_products"]
+        self.assertEqual(report["calls"], 1)
+        self.assertLess(report["compact_tokens"], report["raw_tokens"])
+
+    def test_product_tools_are_projected(self):
+        for name in ("search_products", "search_products_recommendations"):
+            self.assertIn(name, tools.tool_payloads)
+            self.assertIn("image_url", tools.tool_payloads.projections[name].fields)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,89 @@
+import unittest
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from benchmarks.fake_llm import ScriptedChatModel
+from virtual_sales_agent import graph
+from virtual_sales_agent.prompts import AssistantPrompt, PromptMetrics
+
+
+class TestAssistantPrompt(unittest.TestCase):
+    def test_static_prefix_and_trailing_context(self):
+        prompt = AssistantPrompt("Be helpful.")
+        history = [HumanMessage(content="hi"), AIMessage(content="hello")]
+        first = prompt({"messages": history, "user_info": "c1"}).messages
+        second = prompt({"messages": history, "user_info": "c2"}).messages
+
+        # Everything but the context message is identical across customers
+        self.assertIs(first[0], second[0])
+        self.assertEqual(first[:-1], [SystemMessage(content="Be helpful.")] + history)
+        self.assertIn("<User>\nc1\n</User>", first[-1].content)
+        self.assertIn("Current time:", second[-1].content)
+
+    def test_context_templates_are_cached_per_customer(self):
+        prompt = AssistantPrompt("Be helpful.")
+        for customer in ("c1", "c2", "c1", "c1"):
+            prompt.context_message(customer)
+        info = prompt.context_template.cache_info()
+        self.assertEqual((info.hits, info.misses), (2, 2))
+
+    def test_message_like_tuples_are_converted(self):
+        prompt = AssistantPrompt("Be helpful.")
+        messages = prompt({"messages": [("user", "hi")], "user_info": "c1"}).messages
+        self.assertEqual(messages[1], HumanMessage(content="hi"))
+
+    def test_graph_prompt_has_no_volatile_fields(self):
+        self.assertNotIn("{", graph.SYSTEM_PROMPT)
+        self.assertIn("30 days", graph.SYSTEM_PROMPT)
+
+
+class TestPromptMetrics(unittest.TestCase):
+    def test_reported_usage(self):
+        metrics = PromptMetrics("prefix", count_tokens=lambda messages: 10 * len(messages))
+        result = AIMessage(
+            content="ok",
+            usage_metadata={
+                "input_tokens": 1000,
+                "output_tokens": 5,
+                "total_tokens": 1005,
+                "input_token_details": {"cache_read": 768},
+            },
+        )
+        self.assertEqual(metrics.record(result), 1000)
+        stats = metrics.stats()
+        self.assertEqual(stats["cached_tokens"], 768)
+        self.assertEqual(stats["cached_ratio"], 0.768)
+        self.assertEqual(stats["estimated_calls"], 0)
+
+    def test_estimate_without_usage(self):
+        metrics = PromptMetrics(
+            "prefix", prefix_extra=lambda: " tools", count_tokens=lambda messages: 10 * len(messages)
+        )
+        tokens = metrics.record(AIMessage(content="ok"), [HumanMessage(content="hi")] * 3)
+        self.assertEqual(tokens, metrics.prefix_tokens + 30)
+        self.assertEqual(metrics.stats()["estimated_calls"], 1)
+
+    def test_empty_reply_is_retried(self):
+        replies = iter([AIMessage(content=""), AIMessage(content="Here you go")])
+        llm = ScriptedChatModel(script=lambda messages: next(replies))
+        app = graph.build_graph(llm, MemorySaver(), fast_path=False)
+        result = app.invoke(
+            {"messages": [HumanMessage(content="Can you help me?")]},
+            {"configurable": {"customer_id": "c1", "thread_id": "empty-reply"}},
+        )
+        self.assertEqual(llm.calls, 2)
+        self.assertEqual(result["messages"][-1].content, "Here you go")
+
+    def test_assistant_records_every_call(self):
+        before = graph.prompt_metrics.stats()["calls"]
+        app = graph.build_graph(ScriptedChatModel(), MemorySaver(), fast_path=False)
+        app.invoke(
+            {"messages": [HumanMessage(content="Can you help me?")]},
+            {"configurable": {"customer_id": "c1", "thread_id": "metrics"}},
+        )
+        self.assertEqual(graph.prompt_metrics.stats()["calls"], before + 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+from langchain_core.messages import AIMessage, HumanMessage, ToolMessage
+from langgraph.checkpoint.memory import MemorySaver
+
+from benchmarks.fake_llm import ScriptedChatModel
+from database.config import DatabaseConfig
+from database.db_manager import DatabaseManager
+from virtual_sales_agent import tools
+from virtual_sales_agent.graph import build_graph
+from virtual_sales_agent.responses import (
+    DirectResponder,
+    render_categories,
+    render_order_status,
+)
+
+
+def tool_turn(*results):
+    calls = [
+        {"name": name, "args": {}, "id": f"call-{i}"} for i, (name, _) in enumerate(results)
+    ]
+    return [HumanMessage(content="hi"), AIMessage(content="", tool_calls=calls)] + [
+        ToolMessage(content=json.dumps(result), name=name, tool_call_id=f"call-{i}")
+        for i, (name, result) in enumerate(results)
+    ]
+
+
+class TestRenderers(unittest.TestCase):
+    def test_order_page(self):
+        text = render_order_status(
+            {
+                "status": "success",
+                "orders": [
+                    {
+                        "order_id": "7",
+                        "order_date": "2026-01-02T10:11:12.123",
+                        "status": "Pending",
+                        "item_count": 2,
+                        "total_amount": 1234.5,
+                    }
+                ],
+                "has_more": True,
+            }
+        )
+        self.assertIn("| #7 | 2026-01-02 10:11 | Pending | 2 | $1,234.50 |", text)
+        self.assertIn("older orders", text)
+
+    def test_errors_are_left_to_the_assistant(self):
+        self.assertIsNone(render_order_status({"status": "error", "message": "Order not found"}))
+        self.assertIsNone(render_categories({"categories": []}))
+
+    def test_responder_needs_every_result_rendered(self):
+        responder = DirectResponder()
+        reply = responder.render(tool_turn(("get_available_categories", {"categories": ["mice"]})))
+        self.assertIn("- Mice", reply.content)
+
+        mixed = tool_turn(
+            ("get_available_categories", {"categories": ["mice"]}),
+            ("search_products", {"status": "success", "products": []}),
+        )
+        self.assertIsNone(responder.render(mixed))
+        self.assertIsNone(responder.render([HumanMessage(content="hi")]))
+
+
+class TestDirectResponseGraph(unittest.TestCase):
+    def setUp(self):
+        self.temp_dir = tempfile.mkdtemp()
+        config = DatabaseConfig(
+            db_name="test_store.db",
+            db_path=str(Path(self.temp_dir) / "test_store.db"),
+            schema_path="database/db/schemas.sql",
+            products_path="database/db/products.json",
+        )
+        self.db_manager = DatabaseManager(config)
+        self.db_manager.create_database()
+        self.db_manager.insert_products_from_json()
+        patcher = patch.object(tools, "db_manager", self.db_manager)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.llm = ScriptedChatModel()
+        self.config = {"configurable": {"customer_id": "123", "thread_id": "direct"}}
+
+    def tearDown(self):
+        self.db_manager.close()
+        shutil.rmtree(self.temp_dir)
+
+    def ask(self, graph, text):
+        result = graph.invoke({"messages": [HumanMessage(content=text)]}, self.config)
+        return result["messages"][-1]
+
+    def test_templated_tools_take_one_model_call(self):
+        graph = build_graph(self.llm, MemorySaver(), direct_responses=True)
+        reply = self.ask(graph, "Which categories do you have?")
+        self.assertEqual(self.llm.calls, 1)
+        self.assertIn("product categories", reply.content)
+
+        reply = self.ask(graph, "What is the status of my orders?")
+        self.assertEqual(self.llm.calls, 2)
+        self.assertEqual(reply.response_metadata["direct_response"], ["check_order_status"])
+
+        # Other tools still go back through the assistant
+        self.ask(graph, "I'm looking for a gaming mouse")
+        self.assertEqual(self.llm.calls, 4)
+
+    def test_direct_responses_can_be_disabled(self):
+        graph = build_graph(self.llm, MemorySaver(), direct_responses=False)
+        self.ask(graph, "Which categories do you have?")
+        self.assertEqual(self.llm.calls, 2)
+
+    def test_direct_responses_are_opt_in(self):
+        with patch.dict(os.environ):
+            os.environ.pop("ASSISTANT_DIRECT_RESPONSES", None)
+            graph = build_graph(self.llm, MemorySaver())
+        self.ask(graph, "Which categories do you have?")
+        self.assertEqual(self.llm.calls, 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
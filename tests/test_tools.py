@@ -0,0 +1,628 @@
+import asyncio
+import unittest
+import tempfile
+import shutil
+import threading
+from datetime import datetime, timedelta
+from pathlib import Path
+from unittest.mock import patch
+
+from database.db_manager import DatabaseManager
+from database.config import DatabaseConfig
+from database.order_writer import OrderWriter
+from database.support_requests import SupportRequestWriter, iter_support_requests_csv
+from virtual_sales_agent.recommender import RecommendationEngine
+from virtual_sales_agent import tools
+from virtual_sales_agent.cache import ResultCache, normalize_arg
+from virtual_sales_agent import embeddings
+from virtual_sales_agent.spelling import SpellingIndex, damerau_levenshtein
+
+
+class TestTools(unittest.TestCase):
+    """Test cases for the agent tools against a temporary database."""
+
+    def setUp(self):
+        """Set up a temporary database with the sample catalog."""
+        self.temp_dir = tempfile.mkdtemp()
+        self.config = DatabaseConfig(
+            db_name="test_store.db",
+            db_path=str(Path(self.temp_dir) / "test_store.db"),
+            schema_path="database/db/schemas.sql",
+            products_path="database/db/products.json",
+        )
+        self.db_manager = DatabaseManager(self.config)
+        self.db_manager.create_database()
+        self.db_manager.insert_products_from_json()
+
+        self.order_writer = OrderWriter(self.db_manager, max_latency_ms=20)
+        self.support_writer = SupportRequestWriter(self.db_manager, max_latency_ms=20)
+        self.recommender = RecommendationEngine(self.db_manager)
+
+        for name, value in (
+            ("db_manager", self.db_manager),
+            ("order_writer", self.order_writer),
+            ("support_writer", self.support_writer),
+            ("recommender", self.recommender),
+        ):
+            patcher = patch.object(tools, name, value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+
+    def tearDown(self):
+        """Clean up the temporary directory."""
+        self.order_writer.close()
+        self.support_writer.close()
+        self.db_manager.close()
+        shutil.rmtree(self.temp_dir)
+
+    def test_search_products_ranks_full_text_matches(self):
+        """Test full-text search returns ranked, in-stock matches."""
+        result = tools.search_products.invoke({"query": "gaming mouse"})
+
+        self.assertEqual(result["status"], "success")
+        self.assertGreater(len(result["products"]), 0)
+        top = result["products"][0]
+        self.assertIn("mouse", (top["name"] + top["description"]).lower())
+        self.assertTrue(all(p["stock"] > 0 for p in result["products"]))
+
+    def test_search_products_matches_word_prefixes(self):
+        """Test query terms match as word prefixes."""
+        result = tools.search_products.invoke({"query": "logi"})
+        self.assertTrue(result["products"])
+        self.assertTrue(all("logitech" in p["name"] for p in result["products"]))
+
+    def test_search_products_limit_and_filters(self):
+        """Test the result limit and price filters."""
+        result = tools.search_products.invoke({"max_price": 100, "limit": 2})
+        self.assertLessEqual(len(result["products"]), 2)
+        self.assertTrue(all(p["price"] <= 100 for p in result["products"]))
+
+    def test_search_index_follows_product_updates(self):
+        """Test triggers keep the full-text index in sync with products."""
+        self.db_manager.insert_product(
+            product_name="Quasar Streaming Deck",
+            category="Accessories",
+            description="Programmable control surface",
+            price=149.99,
+            quantity=5,
+        )
+        result = tools.search_products.invoke({"query": "quasar"})
+        self.assertEqual(len(result["products"]), 1)
+
+        with self.db_manager.get_connection() as conn:
+            conn.execute(
+                "UPDATE products SET ProductName = ? WHERE ProductName = ?",
+                ("nebula streaming deck", "quasar streaming deck"),
+            )
+            conn.commit()
+
+        self.assertEqual(tools.search_products.invoke({"query": "quasar"})["products"], [])
+        self.assertEqual(len(tools.search_products.invoke({"query": "nebula"})["products"]), 1)
+
+    def _expected_metadata(self):
+        """Computes search metadata directly from the products table."""
+        with self.db_manager.get_connection() as conn:
+            categories = conn.execute(
+                """SELECT Category, COUNT(*) AS count FROM products
+                   WHERE Quantity > 0 GROUP BY Category ORDER BY Category"""
+            ).fetchall()
+            stats = conn.execute(
+                """SELECT MIN(Price), MAX(Price), AVG(Price) FROM products
+                   WHERE Quantity > 0"""
+            ).fetchone()
+        return (
+            [{"name": c["Category"], "product_count": c["count"]} for c in categories],
+            {"min": stats[0], "max": stats[1], "average": round(stats[2], 2)},
+        )
+
+    def test_search_metadata_tracks_inventory_changes(self):
+        """Test the materialized catalog stats follow inserts and updates."""
+        self.db_manager.insert_product(
+            product_name="Budget Cable",
+            category="Accessories",
+            description="USB-C cable",
+            price=1.99,
+            quantity=3,
+        )
+        with self.db_manager.get_connection() as conn:
+            # Sell out the most expensive product and reprice another one
+            conn.execute(
+                """UPDATE products SET Quantity = 0 WHERE ProductId =
+                   (SELECT ProductId FROM products ORDER BY Price DESC LIMIT 1)"""
+            )
+            conn.execute(
+                "UPDATE products SET Price = 2500, Category = 'workstations' WHERE ProductId = 1"
+            )
+            conn.execute("UPDATE products SET Quantity = Quantity - 1 WHERE ProductId = 2")
+            conn.commit()
+
+        metadata = tools.search_products.invoke({"query": "cable"})["metadata"]
+        categories, price_range = self._expected_metadata()
+
+        self.assertEqual(metadata["categories"], categories)
+        self.assertAlmostEqual(metadata["price_range"]["min"], price_range["min"])
+        self.assertAlmostEqual(metadata["price_range"]["max"], price_range["max"])
+        self.assertAlmostEqual(metadata["price_range"]["average"], price_range["average"])
+
+    def _stock(self, product_name):
+        """Returns the current stock for a product."""
+        with self.db_manager.get_connection() as conn:
+            return conn.execute(
+                "SELECT Quantity FROM products WHERE ProductName = ?", (product_name,)
+            ).fetchone()["Quantity"]
+
+    def _create_order(self, products, customer_id="42"):
+        return tools.create_order.invoke(
+            {"products": products},
+            config={"configurable": {"customer_id": customer_id}},
+        )
+
+    def test_create_order_resolves_names_case_insensitively(self):
+        """Test a multi-item order decrements stock and records every line."""
+        before = self._stock("logitech g502 hero")
+        result = self._create_order(
+            [
+                {"ProductName": "Logitech G502 HERO", "Quantity": 2},
+                {"ProductName": "LOGITECH G502 HERO", "Quantity": 1},
+                {"ProductName": "Razer DeathAdder V3 Pro", "Quantity": 1},
+            ]
+        )
+
+        self.assertEqual(result["status"], "success")
+        self.assertEqual(len(result["products"]), 3)
+        self.assertEqual(self._stock("logitech g502 hero"), before - 3)
+        with self.db_manager.get_connection() as conn:
+            lines = conn.execute(
+                "SELECT COUNT(*) FROM orders_details WHERE OrderId = ?",
+                (int(result["order_id"]),),
+            ).fetchone()[0]
+        self.assertEqual(lines, 3)
+
+    def test_create_order_rolls_back_on_insufficient_stock(self):
+        """Test a failing line item leaves stock and orders untouched."""
+        before = self._stock("logitech g502 hero")
+        result = self._create_order(
+            [
+                {"ProductName": "Logitech G502 HERO", "Quantity": 1},
+                {"ProductName": "Razer DeathAdder V3 Pro", "Quantity": 10_000},
+            ]
+        )
+
+        self.assertEqual(result["status"], "error")
+        self.assertIn("Insufficient stock", result["message"])
+        self.assertEqual(self._stock("logitech g502 hero"), before)
+        with self.db_manager.get_connection() as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM orders").fetchone()[0], 0)
+
+    def test_create_order_unknown_product(self):
+        """Test ordering a product that does not exist."""
+        result = self._create_order([{"ProductName": "Nonexistent", "Quantity": 1}])
+        self.assertEqual(result["status"], "error")
+        self.assertIn("Product not found", result["message"])
+
+    def test_concurrent_orders_cannot_oversell(self):
+        """Test concurrent checkouts on a hot product never oversell it."""
+        with self.db_manager.get_connection() as conn:
+            conn.execute(
+                "UPDATE products SET Quantity = 5 WHERE ProductName = ?",
+                ("logitech g502 hero",),
+            )
+            conn.commit()
+
+        results = []
+
+        def checkout(customer_id):
+            results.append(
+                self._create_order(
+                    [{"ProductName": "Logitech G502 HERO", "Quantity": 1}],
+                    customer_id=str(customer_id),
+                )
+            )
+
+        threads = [threading.Thread(target=checkout, args=(i,)) for i in range(1, 13)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        succeeded = [r for r in results if r["status"] == "success"]
+        self.assertEqual(len(succeeded), 5)
+        self.assertEqual(len(results), 12)
+        self.assertEqual(self._stock("logitech g502 hero"), 0)
+
+        # Orders were grouped into shared transactions
+        stats = self.order_writer.stats()
+        self.assertEqual(stats["items"], 12)
+        self.assertEqual(stats["failed_items"], 7)
+        self.assertLess(stats["batches"], 12)
+
+    def _recommend(self, customer_id):
+        return tools.search_products_recommendations.invoke(
+            {}, config={"configurable": {"customer_id": customer_id}}
+        )["recommendations"]
+
+    def test_order_status_pages_through_orders(self):
+        """Test order listing uses stored totals and keyset pagination."""
+        config = {"configurable": {"customer_id": "pager"}}
+        created = [
+            tools.create_order.invoke(
+                {"products": [
+                    {"ProductName": "Razer BlackWidow V3", "Quantity": 1},
+                    {"ProductName": "Logitech G502 HERO", "Quantity": i + 1},
+                ]},
+                config=config,
+            )
+            for i in range(5)
+        ]
+
+        seen = []
+        page = {"order_id": None, "limit": 2}
+        while True:
+            result = tools.check_order_status.invoke(page, config=config)
+            self.assertLessEqual(len(result["orders"]), 2)
+            seen.extend(result["orders"])
+            if not result["has_more"]:
+                break
+            page["before_order_id"] = result["next_before_order_id"]
+
+        self.assertEqual(
+            [o["order_id"] for o in seen], [o["order_id"] for o in reversed(created)]
+        )
+        self.assertEqual(
+            [o["total_amount"] for o in seen], [o["total_amount"] for o in reversed(created)]
+        )
+        self.assertTrue(all(o["item_count"] == 2 for o in seen))
+
+        detail = tools.check_order_status.invoke({"order_id": created[0]["order_id"]}, config=config)
+        self.assertAlmostEqual(detail["total_amount"], created[0]["total_amount"])
+
+    def test_order_status_without_stored_totals(self):
+        """Test orders written without TotalAmount/ItemCount are still reported."""
+        config = {"configurable": {"customer_id": "legacy"}}
+        with self.db_manager.get_connection() as conn:
+            order_id = conn.execute(
+                "INSERT INTO orders (CustomerId, OrderDate, Status) VALUES (?, ?, ?)",
+                ("legacy", datetime.now().isoformat(), "Pending"),
+            ).lastrowid
+            product_id = conn.execute(
+                "SELECT ProductId FROM products WHERE ProductName = 'razer blackwidow v3'"
+            ).fetchone()[0]
+            conn.execute(
+                "INSERT INTO orders_details (OrderId, ProductId, Quantity, UnitPrice)"
+                " VALUES (?, ?, 2, 10.5)",
+                (order_id, product_id),
+            )
+            conn.commit()
+
+        detail = tools.check_order_status.invoke({"order_id": str(order_id)}, config=config)
+        self.assertEqual(detail["total_amount"], 21.0)
+        listed = tools.check_order_status.invoke({"order_id": None}, config=config)["orders"]
+        self.assertEqual((listed[0]["total_amount"], listed[0]["item_count"]), (21.0, 1))
+
+    def test_order_status_date_range(self):
+        """Test the date filters, including a whole-day end date."""
+        config = {"configurable": {"customer_id": "dates"}}
+        tools.create_order.invoke(
+            {"products": [{"ProductName": "Razer BlackWidow V3", "Quantity": 1}]}, config=config
+        )
+        today = datetime.now().date()
+
+        def listed(**filters):
+            result = tools.check_order_status.invoke(dict(order_id=None, **filters), config=config)
+            return result.get("orders")
+
+        self.assertEqual(len(listed(start_date=str(today), end_date=str(today))), 1)
+        self.assertEqual(listed(end_date=str(today - timedelta(days=1))), [])
+        self.assertEqual(listed(start_date=str(today + timedelta(days=1))), [])
+        self.assertIsNone(listed(start_date="last week"))
+
+    def test_recommendations_cold_start(self):
+        """Test a customer without history still gets in-stock products."""
+        recommendations = self._recommend("new-customer")
+        self.assertEqual(len(recommendations), 5)
+        self.assertTrue(all(r["stock"] > 0 for r in recommendations))
+
+    def test_recommendations_follow_co_purchases(self):
+        """Test co-purchased products are recommended and updated incrementally."""
+        # Load the model before any orders exist
+        self._recommend("7")
+
+        for customer_id in ("1", "2", "3"):
+            self._create_order(
+                [
+                    {"ProductName": "Logitech G502 HERO", "Quantity": 1},
+                    {"ProductName": "Razer BlackWidow V3", "Quantity": 1},
+                ],
+                customer_id=customer_id,
+            )
+        self._create_order(
+            [{"ProductName": "Logitech G502 HERO", "Quantity": 1}], customer_id="7"
+        )
+
+        recommendations = self._recommend("7")
+        self.assertEqual(recommendations[0]["name"], "razer blackwidow v3")
+        self.assertNotIn("logitech g502 hero", [r["name"] for r in recommendations])
+
+        # A fresh model built from the order history agrees
+        fresh = RecommendationEngine(self.db_manager).recommend("7", k=5)
+        self.assertEqual(fresh[0]["ProductName"], "razer blackwidow v3")
+
+    def test_orders_read_by_load_are_not_recorded_twice(self):
+        """Test an order committed during the first load is counted once."""
+        order = self._create_order(
+            [
+                {"ProductName": "Logitech G502 HERO", "Quantity": 1},
+                {"ProductName": "Razer BlackWidow V3", "Quantity": 1},
+            ]
+        )
+        engine = RecommendationEngine(self.db_manager)
+        engine.load()
+        # create_order reports the order after load() already read it
+        engine.record_order("42", order)
+
+        a, b = sorted(int(p["product_id"]) for p in order["products"])
+        self.assertEqual(engine._co_counts[a][b], 1.0)
+
+        later = self._create_order([{"ProductName": "Logitech G502 HERO", "Quantity": 1}])
+        engine.record_order("42", later)
+        self.assertEqual(engine._order_counts[a] + engine._order_counts[b], 3)
+
+    def test_recommendations_skip_out_of_stock(self):
+        """Test sold-out products are never recommended."""
+        self._create_order(
+            [
+                {"ProductName": "Logitech G502 HERO", "Quantity": 1},
+                {"ProductName": "Razer BlackWidow V3", "Quantity": 1},
+            ],
+            customer_id="1",
+        )
+        self._create_order([{"ProductName": "Logitech G502 HERO", "Quantity": 1}], customer_id="7")
+        with self.db_manager.get_connection() as conn:
+            conn.execute("UPDATE products SET Quantity = 0 WHERE ProductName = 'razer blackwidow v3'")
+            conn.commit()
+
+        names = [r["name"] for r in self._recommend("7")]
+        self.assertNotIn("razer blackwidow v3", names)
+
+    def test_async_tools_match_sync_results(self):
+        """Test the async tool variants run off the event loop with the same results."""
+        config = {"configurable": {"customer_id": "async-customer"}}
+
+        async def run():
+            return await asyncio.gather(
+                tools.get_available_categories.ainvoke({}),
+                tools.search_products.ainvoke({"query": "gaming mouse"}),
+                tools.check_order_status.ainvoke({"order_id": None}, config=config),
+            )
+
+        categories, search, status = asyncio.run(run())
+        self.assertEqual(categories, tools.get_available_categories.invoke({}))
+        self.assertEqual(search, tools.search_products.invoke({"query": "gaming mouse"}))
+        self.assertEqual(status["orders"], [])
+
+    def test_async_orders_are_group_committed(self):
+        """Test concurrent async checkouts await the shared batch commit."""
+        async def checkout(customer_id):
+            return await tools.create_order.ainvoke(
+                {"products": [{"ProductName": "Razer BlackWidow V3", "Quantity": 1}]},
+                config={"configurable": {"customer_id": str(customer_id)}},
+            )
+
+        async def run():
+            return await asyncio.gather(*(checkout(i) for i in range(1, 9)))
+
+        results = asyncio.run(run())
+        self.assertTrue(all(r["status"] == "success" for r in results))
+        self.assertEqual(len({r["order_id"] for r in results}), 8)
+        self.assertLess(self.order_writer.stats()["batches"], 8)
+
+    def test_catalog_reads_are_cached_by_normalized_arguments(self):
+        """Test equivalent searches share one cached result."""
+        stats = tools.result_cache.stats()
+
+        first = tools.search_products.invoke({"query": "Gaming  Mouse"})
+        again = tools.search_products.invoke({"query": "gaming mouse", "limit": 20})
+        self.assertEqual(first, again)
+        self.assertIsNot(first, again)
+
+        after = tools.result_cache.stats()
+        self.assertEqual(after["hits"] - stats["hits"], 1)
+
+    def test_cache_is_invalidated_by_stock_changes(self):
+        """Test orders, and writes from other processes, invalidate cached results."""
+        def stock():
+            result = tools.search_products.invoke({"query": "razer blackwidow"})
+            return result["products"][0]["stock"]
+
+        before = stock()
+        self.assertEqual(stock(), before)
+
+        tools.create_order.invoke(
+            {"products": [{"ProductName": "Razer BlackWidow V3", "Quantity": 1}]},
+            config={"configurable": {"customer_id": "cache-customer"}},
+        )
+        self.assertEqual(stock(), before - 1)
+
+        # Another process sharing the database file
+        other = DatabaseManager(self.config)
+        try:
+            with other.get_connection() as conn:
+                conn.execute(
+                    "UPDATE products SET Quantity = 0 WHERE ProductName = 'razer blackwidow v3'"
+                )
+                conn.commit()
+        finally:
+            other.close()
+        result = tools.search_products.invoke({"query": "razer blackwidow"})
+        self.assertNotIn("razer blackwidow v3", [p["name"] for p in result["products"]])
+
+    def test_semantic_search_finds_products_by_meaning(self):
+        """Test semantic and hybrid modes use the vector index once it is built."""
+        query = {"query": "something to stream with", "limit": 3}
+        result = tools.search_products.invoke(dict(query, mode="semantic"))
+        # No index yet: keyword search is used instead
+        self.assertEqual(result["metadata"]["search_mode"], "keyword")
+
+        _, count = embeddings.build_index(self.db_manager)
+        self.assertEqual(count, 20)
+
+        for mode in ("semantic", "hybrid"):
+            result = tools.search_products.invoke(dict(query, mode=mode))
+            self.assertEqual(result["metadata"]["search_mode"], mode)
+            categories = [p["category"] for p in result["products"]]
+            self.assertIn("webcams", categories, mode)
+
+        result = tools.search_products.invoke(
+            {"query": "headset", "mode": "semantic", "max_price": 150}
+        )
+        self.assertTrue(result["products"])
+        self.assertTrue(all(p["price"] <= 150 for p in result["products"]))
+
+    def test_hybrid_search_stays_on_topic(self):
+        """Test weak semantic neighbours are not fused into hybrid results."""
+        embeddings.build_index(self.db_manager)
+        for query, category in (("mouse", "gaming mice"), ("headset", "gaming audio")):
+            result = tools.search_products.invoke({"query": query})
+            self.assertEqual(result["metadata"]["search_mode"], "hybrid")
+            self.assertTrue(result["products"], query)
+            self.assertEqual({p["category"] for p in result["products"]}, {category}, query)
+
+    def test_search_corrects_misspelled_words(self):
+        """Test typos are corrected before the query runs."""
+        result = tools.search_products.invoke({"query": "alienwear laptop", "limit": 3})
+        self.assertEqual(result["metadata"]["corrected_query"], "alienware laptop")
+        self.assertEqual(result["products"][0]["name"], "alienware m17 r5")
+
+        # Known words and prefixes are left alone
+        result = tools.search_products.invoke({"query": "logi"})
+        self.assertNotIn("corrected_query", result["metadata"])
+
+        # New products extend the vocabulary
+        self.db_manager.insert_product("Quasar Deck", "Accessories", "Stream controller", 99.0, 3)
+        result = tools.search_products.invoke({"query": "qasar"})
+        self.assertEqual(result["metadata"]["corrected_query"], "quasar")
+        self.assertEqual(result["products"][0]["name"], "quasar deck")
+
+    def test_search_rejects_unknown_mode(self):
+        """Test an invalid search mode is reported."""
+        with self.assertRaises(ValueError):
+            tools.search_products.invoke({"query": "mouse", "mode": "fuzzy"})
+
+    def test_support_requests_are_batched_per_thread(self):
+        """Test concurrent support requests share commits and stay per thread."""
+        def request(i):
+            return tools.request_human_representative.invoke(
+                {"full_name": f"Customer {i}", "email": f"c{i}@example.com", "phone": "+1 555 0100"},
+                config={"configurable": {"customer_id": "123", "thread_id": f"thread-{i % 2}"}},
+            )
+
+        results = [None] * 10
+        threads = [
+            threading.Thread(target=lambda i=i: results.__setitem__(i, request(i)))
+            for i in range(10)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertTrue(all(r["status"] == "success" for r in results))
+        self.assertLess(self.support_writer.stats()["batches"], 10)
+
+        lines = "".join(iter_support_requests_csv(self.db_manager, "thread-1", batch_size=2)).splitlines()
+        self.assertEqual(lines[0], "Name,Email,Phone,Timestamp")
+        self.assertEqual(
+            sorted(line.split(",")[0] for line in lines[1:]),
+            [f"Customer {i}" for i in (1, 3, 5, 7, 9)],
+        )
+        self.assertFalse(Path("download_ready.txt").exists())
+
+    def test_support_request_validation_and_async(self):
+        """Test invalid contact details are rejected and the async path records requests."""
+        config = {"configurable": {"customer_id": "123", "thread_id": "async-thread"}}
+        result = tools.request_human_representative.invoke(
+            {"full_name": "Ann", "email": "not-an-email", "phone": "555 0100"}, config=config
+        )
+        self.assertEqual(result["status"], "error")
+
+        result = asyncio.run(
+            tools.request_human_representative.ainvoke(
+                {"full_name": "Ann Lee", "email": "ann@example.com", "phone": "555 0100"},
+                config=config,
+            )
+        )
+        self.assertEqual(result["status"], "success")
+        csv_text = "".join(iter_support_requests_csv(self.db_manager, "async-thread"))
+        self.assertIn("Ann Lee,ann@example.com,555 0100", csv_text)
+
+
+class TestEmbeddings(unittest.TestCase):
+    """Test cases for the local embeddings."""
+
+    def test_trigrams_relate_word_forms(self):
+        embedder = embeddings.HashingEmbedder()
+        stream = embedder.embed("stream")
+        self.assertGreater(float(stream @ embedder.embed("streaming video")), 0.3)
+        self.assertAlmostEqual(float(stream @ stream), 1.0, places=5)
+        self.assertFalse(embedder.embed("the with some").any())
+
+    def test_reciprocal_rank_fusion(self):
+        fused = embeddings.reciprocal_rank_fusion([[1, 2, 3], [3, 1, 4]])
+        self.assertEqual(fused[0], 1)
+        self.assertEqual(set(fused), {1, 2, 3, 4})
+
+
+class TestSpellingIndex(unittest.TestCase):
+    """Test cases for the deletion-dictionary spelling index."""
+
+    def setUp(self):
+        self.index = SpellingIndex()
+        self.index.update({"logitech": 5, "alienware": 1, "keyboard": 3, "keyboards": 1})
+
+    def test_suggestions(self):
+        self.assertEqual(self.index.suggest("alienwear"), [("alienware", 2)])
+        self.assertEqual(self.index.suggest("keybaord")[0], ("keyboard", 1))
+        self.assertEqual(self.index.suggest("xyzzy"), [])
+        self.assertEqual(self.index.correct(["logi", "keybord", "to"]), {"keybord": ["keyboard"]})
+
+    def test_incremental_updates(self):
+        added, removed = self.index.update({"logitech": 5, "razer": 2})
+        self.assertEqual((added, removed), (1, 3))
+        self.assertEqual(self.index.suggest("alienwear"), [])
+        self.assertEqual(self.index.suggest("razr"), [("razer", 1)])
+
+    def test_damerau_levenshtein(self):
+        self.assertEqual(damerau_levenshtein("abcd", "acbd", 2), 1)
+        self.assertEqual(damerau_levenshtein("kitten", "sitting", 3), 3)
+        self.assertEqual(damerau_levenshtein("kitten", "sitting", 1), 2)
+
+
+class TestResultCache(unittest.TestCase):
+    """Test cases for the versioned result cache."""
+
+    def test_lru_eviction_and_versions(self):
+        cache = ResultCache(max_entries=2)
+        cache.set("a", 1, "A")
+        cache.set("b", 1, "B")
+        self.assertEqual(cache.get("a", 1), "A")
+        cache.set("c", 1, "C")
+
+        self.assertEqual(cache.get("a", 1), "A")
+        self.assertIsNot(cache.get("b", 1), "B")
+        self.assertIsNot(cache.get("c", 2), "C")
+        self.assertEqual(cache.stats()["evictions"], 1)
+        self.assertEqual(cache.stats()["entries"], 1)
+
+    def test_ttl_expiry(self):
+        cache = ResultCache(ttl_seconds=0.0)
+        cache.set("a", 1, "A")
+        self.assertIsNot(cache.get("a", 1), "A")
+
+    def test_normalize_arg(self):
+        self.assertEqual(normalize_arg(" Gaming\tMOUSE "), "gaming mouse")
+        self.assertEqual(normalize_arg(20), normalize_arg(20.0))
+        self.assertEqual(normalize_arg({"b": 1, "a": [2]}), normalize_arg({"a": [2], "b": 1}))
+
+
+if __name__ == '__main__':
+    unittest.main()
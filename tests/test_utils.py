@@ -0,0 +1,143 @@
+import time
+import unittest
+
+from langchain_core.messages import AIMessage, HumanMessage, SystemMessage, ToolMessage
+from langchain_core.tools import tool
+from langgraph.checkpoint.memory import MemorySaver
+
+from benchmarks.fake_llm import ScriptedChatModel
+from virtual_sales_agent.graph import build_graph
+from virtual_sales_agent.utils import create_tool_node_with_fallback, pending_tool_calls
+
+
+@tool
+def slow_lookup(query: str) -> str:
+    """Looks something up slowly."""
+    time.sleep(0.3)
+    return f"found {query}"
+
+
+@tool
+def failing_lookup(query: str) -> str:
+    """Always fails."""
+    raise RuntimeError("boom")
+
+
+@tool
+def place_order(item: str) -> str:
+    """Places an order."""
+    return f"ordered {item}"
+
+
+def multi_call_message():
+    return AIMessage(
+        content="",
+        tool_calls=[
+            {"name": "slow_lookup", "args": {"query": "mice"}, "id": "c1"},
+            {"name": "place_order", "args": {"item": "mouse"}, "id": "c2"},
+            {"name": "slow_lookup", "args": {"query": "keyboards"}, "id": "c3"},
+            {"name": "slow_lookup", "args": {"query": "monitors"}, "id": "c4"},
+        ],
+    )
+
+
+class TestPendingToolCalls(unittest.TestCase):
+    def test_filters_answered_and_by_name(self):
+        messages = [
+            HumanMessage(content="hi"),
+            multi_call_message(),
+            ToolMessage(content="found mice", tool_call_id="c1"),
+        ]
+        self.assertEqual(
+            [tc["id"] for tc in pending_tool_calls(messages)], ["c2", "c3", "c4"]
+        )
+        self.assertEqual(
+            [tc["id"] for tc in pending_tool_calls(messages, {"place_order"})], ["c2"]
+        )
+
+    def test_no_pending_calls_after_human_message(self):
+        messages = [multi_call_message(), HumanMessage(content="never mind")]
+        self.assertEqual(pending_tool_calls(messages), [])
+
+
+class TestPartitionedToolNode(unittest.TestCase):
+    def test_runs_only_its_own_calls_concurrently(self):
+        node = create_tool_node_with_fallback([slow_lookup])
+        state = {"messages": [HumanMessage(content="hi"), multi_call_message()]}
+
+        start = time.perf_counter()
+        result = node.invoke(state)
+        elapsed = time.perf_counter() - start
+
+        self.assertEqual(
+            [m.tool_call_id for m in result["messages"]], ["c1", "c3", "c4"]
+        )
+        # Three 0.3s calls take about as long as the slowest one
+        self.assertLess(elapsed, 0.75)
+
+    def test_second_node_picks_up_remaining_calls(self):
+        state = {"messages": [HumanMessage(content="hi"), multi_call_message()]}
+        safe_result = create_tool_node_with_fallback([slow_lookup]).invoke(state)
+        state["messages"] += safe_result["messages"]
+
+        result = create_tool_node_with_fallback([place_order]).invoke(state)
+
+        self.assertEqual(len(result["messages"]), 1)
+        self.assertEqual(result["messages"][0].tool_call_id, "c2")
+        self.assertEqual(result["messages"][0].content, "ordered mouse")
+
+    def test_errors_answer_only_own_calls(self):
+        message = AIMessage(
+            content="",
+            tool_calls=[
+                {"name": "failing_lookup", "args": {"query": "x"}, "id": "f1"},
+                {"name": "place_order", "args": {"item": "mouse"}, "id": "o1"},
+            ],
+        )
+        node = create_tool_node_with_fallback([failing_lookup])
+        result = node.invoke({"messages": [message]})
+
+        self.assertEqual([m.tool_call_id for m in result["messages"]], ["f1"])
+        self.assertIn("boom", result["messages"][0].content)
+
+    def test_unknown_tools_are_answered_with_an_error(self):
+        message = AIMessage(
+            content="",
+            tool_calls=[
+                {"name": "slow_lookup", "args": {"query": "mice"}, "id": "s1"},
+                {"name": "made_up_tool", "args": {}, "id": "u1"},
+                {"name": "place_order", "args": {"item": "mouse"}, "id": "o1"},
+            ],
+        )
+        node = create_tool_node_with_fallback([slow_lookup], other_tool_names={"place_order"})
+        result = node.invoke({"messages": [message]})
+
+        by_id = {m.tool_call_id: m for m in result["messages"]}
+        self.assertEqual(set(by_id), {"s1", "u1"})
+        self.assertEqual(by_id["u1"].status, "error")
+        self.assertIn("not a valid tool", by_id["u1"].content)
+
+
+def unknown_tool_script(messages):
+    messages = [m for m in messages if not isinstance(m, SystemMessage)]
+    if isinstance(messages[-1], ToolMessage):
+        return AIMessage(content="Sorry, I can't do that.")
+    return AIMessage(
+        content="", tool_calls=[{"name": "made_up_tool", "args": {}, "id": "u1"}]
+    )
+
+
+class TestToolRouting(unittest.TestCase):
+    def test_unknown_tool_does_not_wait_for_approval(self):
+        llm = ScriptedChatModel(script=unknown_tool_script)
+        graph = build_graph(llm, MemorySaver(), fast_path=False)
+        config = {"configurable": {"customer_id": "123", "thread_id": "unknown-tool"}}
+        result = graph.invoke({"messages": [HumanMessage(content="do something")]}, config)
+
+        self.assertFalse(graph.get_state(config).next)
+        self.assertEqual(result["messages"][-1].content, "Sorry, I can't do that.")
+        self.assertEqual(result["messages"][-2].status, "error")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,6 +1,5 @@
 """Chat UI components for the Tech Shop Assistant."""
 import streamlit as st
-from langchain_core.messages import HumanMessage
 
 def display_chat_history():
     """Display the chat history and suggestions if empty."""
@@ -15,8 +14,7 @@ def display_chat_history():
 def _render_messages():
     """Render all messages in the chat history."""
     for message in st.session_state.messages:
-        role = "user" if isinstance(message, HumanMessage) else "assistant"
-        with st.chat_message(role):
+        with st.chat_message(message.role):
             st.write(message.content)
 
 def _display_typing_indicator():
@@ -113,28 +111,35 @@ def display_chat_suggestions():
     )
 
 def handle_file_download():
-    """Check for and handle file downloads."""
-    import os
-    
-    if os.path.exists("download_ready.txt"):
-        try:
-            with open("download_ready.txt", "r") as f:
-                download_path = f.read().strip()
-            
-            if os.path.exists(download_path):
-                with open(download_path, "r") as file:
-                    csv_content = file.read()
-                
-                # Remove the marker file
-                os.remove("download_ready.txt")
-                
-                # Place the download button prominently in the UI
-                st.success("✅ Your request has been successfully recorded!")
-                st.download_button(
-                    label="📥 Download Your Support Request",
-                    data=csv_content,
-                    file_name="support_request.csv",
-                    mime="text/csv",
-                )
-        except Exception as e:
-            st.error(f"Error preparing download: {e}")
\ No newline at end of file
+    """Offer this conversation's support requests as a CSV download."""
+    from database.support_requests import count_support_requests, iter_support_requests_csv
+    from virtual_sales_agent.tools import get_db_manager
+
+    thread_id = st.session_state.config["configurable"]["thread_id"]
+    try:
+        db_manager = get_db_manager()
+        count = count_support_requests(db_manager, thread_id)
+        if not count:
+            return
+
+        # Confirm only when a new request was recorded since the last rerun
+        if count > st.session_state.get("support_request_count", 0):
+            st.success("✅ Your request has been successfully recorded!")
+        st.session_state.support_request_count = count
+
+        # Requests are only ever appended, so the count identifies the
+        # export; rebuild it only when a request was added
+        version = (thread_id, count)
+        cached = st.session_state.get("support_request_csv")
+        if cached is None or cached[0] != version:
+            cached = (version, "".join(iter_support_requests_csv(db_manager, thread_id)))
+            st.session_state.support_request_csv = cached
+
+        st.download_button(
+            label="📥 Download Your Support Request",
+            data=cached[1],
+            file_name="support_request.csv",
+            mime="text/csv",
+        )
+    except Exception as e:
+        st.error(f"Error preparing download: {e}")
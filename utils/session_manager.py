@@ -6,6 +6,7 @@ def initialize_session_state():
     """Initialize all session state variables."""
     # Chat state
     if "messages" not in st.session_state:
+        # Display-only view of the checkpointed conversation
         st.session_state.messages = []
 
     # Thread/customer identification
@@ -0,0 +1,168 @@
+"""Versioned LRU/TTL result cache for the read-only catalog tools."""
+import copy
+import functools
+import inspect
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Hashable, Tuple
+
+from langchain_core.tools import BaseTool
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+
+class ResultCache:
+    """
+    Thread-safe LRU cache whose entries carry a version and an expiry time.
+
+    An entry is only served while its version equals the caller's current
+    version and its TTL has not passed. The least recently used entries are
+    evicted once `max_entries` is reached.
+    """
+
+    def __init__(self, max_entries: int = 1024, ttl_seconds: float = 300.0):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of cached results
+            ttl_seconds (float): Maximum age of a cached result
+        """
+        self.max_entries = max(1, max_entries)
+        self.ttl = ttl_seconds
+        self._entries: "OrderedDict[Hashable, Tuple[Any, float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+        # Stats
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+
+    def get(self, key: Hashable, version: Any) -> Any:
+        """Returns the cached value, or _MISSING if absent, stale or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                entry_version, expires_at, value = entry
+                if entry_version == version and expires_at > time.monotonic():
+                    self._entries.move_to_end(key)
+                    self._hits += 1
+                    return value
+                del self._entries[key]
+            self._misses += 1
+            return _MISSING
+
+    def set(self, key: Hashable, version: Any, value: Any) -> None:
+        """Stores a value computed at the given version."""
+        with self._lock:
+            self._entries[key] = (version, time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self._evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns entry count and hit/miss statistics.
+
+        Returns:
+            Dict[str, Any]: Current cache counters.
+        """
+        with self._lock:
+            lookups = self._hits + self._misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "hits": self._hits,
+                "misses": self._misses,
+                "evictions": self._evictions,
+                "hit_rate": round(self._hits / lookups, 3) if lookups else 0.0,
+            }
+
+
+def normalize_arg(value: Any) -> Hashable:
+    """
+    Normalizes a tool argument for use in a cache key.
+
+    Strings are case-folded with whitespace collapsed, numbers compare by
+    value (20 == 20.0), and containers are converted to sorted tuples.
+    """
+    if isinstance(value, str):
+        return " ".join(value.lower().split())
+    if isinstance(value, bool) or value is None:
+        return value
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, dict):
+        return tuple(sorted((str(k), normalize_arg(v)) for k, v in value.items()))
+    if isinstance(value, (list, tuple, set)):
+        return tuple(normalize_arg(v) for v in value)
+    return repr(value)
+
+
+def cached_tool(
+    cache: ResultCache,
+    version: Callable[[], Tuple[Hashable, Any]],
+    config_keys: Tuple[str, ...] = ("customer_id",),
+) -> Callable[[BaseTool], BaseTool]:
+    """
+    Caches the results of a read-only tool.
+
+    Keys are built from the tool name and its normalized arguments, with
+    defaults applied, so equivalent calls share an entry. An injected
+    RunnableConfig contributes only the `config_keys` of its configurable
+    section. Results are deep-copied on the way in and out, so callers can
+    never modify a cached value.
+
+    Args:
+        cache (ResultCache): Cache holding the results
+        version: Returns (scope, version) for the data behind the tool; the
+            scope (e.g. the database path) is part of the key and the version
+            must change whenever the data does. A None version disables
+            caching for that call.
+        config_keys (Tuple[str, ...]): configurable values included in the key
+
+    Returns:
+        Callable[[BaseTool], BaseTool]: Decorator replacing the tool's func.
+    """
+
+    def decorator(db_tool: BaseTool) -> BaseTool:
+        func = db_tool.func
+        signature = inspect.signature(func)
+
+        def make_key(scope: Hashable, args: tuple, kwargs: dict) -> Hashable:
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            parts = []
+            for name, value in bound.arguments.items():
+                if name == "config":
+                    configurable = (value or {}).get("configurable", {})
+                    value = {key: configurable.get(key) for key in config_keys}
+                parts.append((name, normalize_arg(value)))
+            return (db_tool.name, scope, tuple(parts))
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            scope, current = version()
+            if current is None:
+                return func(*args, **kwargs)
+            key = make_key(scope, args, kwargs)
+            value = cache.get(key, current)
+            if value is _MISSING:
+                value = func(*args, **kwargs)
+                cache.set(key, current, copy.deepcopy(value))
+                return value
+            return copy.deepcopy(value)
+
+        db_tool.func = wrapper
+        return db_tool
+
+    return decorator
@@ -0,0 +1,494 @@
+"""SQLite-backed LangGraph checkpointer with bounded retention."""
+import asyncio
+import logging
+import random
+import threading
+import time
+import zlib
+from typing import Any, AsyncIterator, Dict, Iterator, Optional, Sequence, Tuple
+
+from langchain_core.runnables import RunnableConfig
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    ChannelVersions,
+    Checkpoint,
+    CheckpointMetadata,
+    CheckpointTuple,
+    SerializerProtocol,
+    get_checkpoint_id,
+)
+from langgraph.checkpoint.serde.types import TASKS, ChannelProtocol
+
+from database.config import CHECKPOINT_CONFIG, DatabaseConfig
+from database.db_manager import DatabaseManager
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+
+CREATE TABLE IF NOT EXISTS threads (
+    thread_id TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL
+);
+
+CREATE INDEX IF NOT EXISTS idx_threads_updated_at ON threads(updated_at);
+"""
+
+
+class SqliteCheckpointer(BaseCheckpointSaver[str]):
+    """
+    Persists graph checkpoints to a SQLite file instead of the process heap.
+
+    Checkpoints are serialized with the saver's serde (msgpack by default)
+    and zlib-compressed above a size threshold. Only the most recent
+    `max_checkpoints_per_thread` checkpoints of each thread are kept, and a
+    background thread deletes threads that have been idle for longer than
+    `idle_thread_ttl` seconds.
+    """
+
+    def __init__(
+        self,
+        config: DatabaseConfig = CHECKPOINT_CONFIG,
+        *,
+        max_checkpoints_per_thread: int = 10,
+        idle_thread_ttl: Optional[float] = 7 * 24 * 3600,
+        prune_interval: float = 600.0,
+        compress_threshold: int = 1024,
+        serde: Optional[SerializerProtocol] = None,
+    ) -> None:
+        """
+        Initialize the checkpointer.
+
+        Args:
+            config (DatabaseConfig): Location and pool settings for the checkpoint database
+            max_checkpoints_per_thread (int): Checkpoints kept per thread and namespace
+            idle_thread_ttl (float, optional): Seconds of inactivity after which a
+                thread is deleted. None disables idle pruning.
+            prune_interval (float): Seconds between background pruning runs
+            compress_threshold (int): Serialized size in bytes above which
+                values are zlib-compressed
+            serde (SerializerProtocol, optional): Serializer override
+        """
+        super().__init__(serde=serde)
+        # The latest checkpoint reads pending sends from its parent
+        self.max_checkpoints_per_thread = max(2, max_checkpoints_per_thread)
+        self.idle_thread_ttl = idle_thread_ttl
+        self.prune_interval = prune_interval
+        self.compress_threshold = compress_threshold
+
+        self.db_manager = DatabaseManager(config)
+        with self.db_manager.get_connection() as conn:
+            conn.executescript(SCHEMA)
+
+        self._stop = threading.Event()
+        self._pruner: Optional[threading.Thread] = None
+        if idle_thread_ttl is not None and prune_interval > 0:
+            self._pruner = threading.Thread(
+                target=self._prune_loop, name="checkpoint-pruner", daemon=True
+            )
+            self._pruner.start()
+
+    # --- serialization ---
+
+    def _dumps(self, obj: Any) -> Tuple[str, bytes]:
+        type_, data = self.serde.dumps_typed(obj)
+        if len(data) >= self.compress_threshold:
+            return f"{type_}+zlib", zlib.compress(data)
+        return type_, data
+
+    def _loads(self, type_: str, data: bytes) -> Any:
+        if type_.endswith("+zlib"):
+            type_, data = type_[: -len("+zlib")], zlib.decompress(data)
+        return self.serde.loads_typed((type_, data))
+
+    # --- reads ---
+
+    def _load_tuple(self, cursor: Any, row: Any) -> CheckpointTuple:
+        """Builds a CheckpointTuple from a checkpoints row."""
+        thread_id = row["thread_id"]
+        checkpoint_ns = row["checkpoint_ns"]
+        checkpoint_id = row["checkpoint_id"]
+        parent_checkpoint_id = row["parent_checkpoint_id"]
+
+        cursor.execute(
+            """SELECT task_id, channel, type, value FROM writes
+               WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?
+               ORDER BY task_id, idx""",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        )
+        pending_writes = [
+            (w["task_id"], w["channel"], self._loads(w["type"], w["value"]))
+            for w in cursor.fetchall()
+        ]
+
+        sends = []
+        if parent_checkpoint_id:
+            cursor.execute(
+                """SELECT type, value FROM writes
+                   WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?
+                   AND channel = ?
+                   ORDER BY task_id, idx""",
+                (thread_id, checkpoint_ns, parent_checkpoint_id, TASKS),
+            )
+            sends = [self._loads(w["type"], w["value"]) for w in cursor.fetchall()]
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **self._loads(row["type"], row["checkpoint"]),
+                "pending_sends": sends,
+            },
+            metadata=self._loads(row["metadata_type"], row["metadata"]),
+            parent_config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": parent_checkpoint_id,
+                }
+            }
+            if parent_checkpoint_id
+            else None,
+            pending_writes=pending_writes,
+        )
+
+    def get_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """
+        Get a checkpoint tuple from the database.
+
+        Returns the checkpoint matching the config's checkpoint_id, or the
+        latest checkpoint of the thread when no checkpoint_id is given.
+
+        Args:
+            config (RunnableConfig): The config to use for retrieving the checkpoint.
+
+        Returns:
+            Optional[CheckpointTuple]: The retrieved checkpoint tuple, or None if not found.
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            if checkpoint_id := get_checkpoint_id(config):
+                cursor.execute(
+                    """SELECT * FROM checkpoints
+                       WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?""",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                )
+            else:
+                cursor.execute(
+                    """SELECT * FROM checkpoints
+                       WHERE thread_id = ? AND checkpoint_ns = ?
+                       ORDER BY checkpoint_id DESC LIMIT 1""",
+                    (thread_id, checkpoint_ns),
+                )
+            row = cursor.fetchone()
+            return self._load_tuple(cursor, row) if row else None
+
+    def list(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> Iterator[CheckpointTuple]:
+        """
+        List checkpoints from the database, newest first.
+
+        Args:
+            config (Optional[RunnableConfig]): Base configuration for filtering checkpoints.
+            filter (Optional[Dict[str, Any]]): Additional filtering criteria for metadata.
+            before (Optional[RunnableConfig]): List checkpoints created before this configuration.
+            limit (Optional[int]): Maximum number of checkpoints to return.
+
+        Yields:
+            Iterator[CheckpointTuple]: Matching checkpoint tuples.
+        """
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_checkpoint_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_checkpoint_id)
+
+        where = f"WHERE {' AND '.join(clauses)}" if clauses else ""
+        results = []
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            rows = cursor.execute(
+                f"SELECT * FROM checkpoints {where} ORDER BY checkpoint_id DESC", params
+            ).fetchall()
+
+            for row in rows:
+                if limit is not None and len(results) >= limit:
+                    break
+                if filter:
+                    metadata = self._loads(row["metadata_type"], row["metadata"])
+                    if not all(metadata.get(k) == v for k, v in filter.items()):
+                        continue
+                results.append(self._load_tuple(cursor, row))
+
+        yield from results
+
+    # --- writes ---
+
+    def put(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """
+        Save a checkpoint and drop the thread's checkpoints beyond the retention limit.
+
+        Args:
+            config (RunnableConfig): The config to associate with the checkpoint.
+            checkpoint (Checkpoint): The checkpoint to save.
+            metadata (CheckpointMetadata): Additional metadata to save with the checkpoint.
+            new_versions (dict): New versions as of this write
+
+        Returns:
+            RunnableConfig: The updated config containing the saved checkpoint's id.
+        """
+        c = checkpoint.copy()
+        c.pop("pending_sends", None)  # type: ignore[misc]
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        type_, data = self._dumps(c)
+        metadata_type, metadata_data = self._dumps(metadata)
+
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute(
+                """INSERT OR REPLACE INTO checkpoints
+                   (thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id,
+                    type, checkpoint, metadata_type, metadata)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),
+                    type_,
+                    data,
+                    metadata_type,
+                    metadata_data,
+                ),
+            )
+            cursor.execute(
+                "INSERT OR REPLACE INTO threads (thread_id, updated_at) VALUES (?, ?)",
+                (thread_id, time.time()),
+            )
+            self._apply_retention(cursor, thread_id, checkpoint_ns)
+            conn.commit()
+
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def _apply_retention(self, cursor: Any, thread_id: str, checkpoint_ns: str) -> None:
+        """Deletes checkpoints and writes older than the newest N of a thread."""
+        cursor.execute(
+            """SELECT checkpoint_id FROM checkpoints
+               WHERE thread_id = ? AND checkpoint_ns = ?
+               ORDER BY checkpoint_id DESC LIMIT 1 OFFSET ?""",
+            (thread_id, checkpoint_ns, self.max_checkpoints_per_thread - 1),
+        )
+        oldest_kept = cursor.fetchone()
+        if not oldest_kept:
+            return
+        for table in ("checkpoints", "writes"):
+            cursor.execute(
+                f"""DELETE FROM {table}
+                    WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id < ?""",
+                (thread_id, checkpoint_ns, oldest_kept["checkpoint_id"]),
+            )
+
+    def put_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+    ) -> None:
+        """
+        Save a list of writes associated with a checkpoint.
+
+        Args:
+            config (RunnableConfig): The config to associate with the writes.
+            writes (list[tuple[str, Any]]): The writes to save.
+            task_id (str): Identifier for the task creating the writes.
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        # Special writes (errors, interrupts, ...) replace earlier ones;
+        # regular writes are only recorded once per task and index
+        special, regular = [], []
+        for idx, (channel, value) in enumerate(writes):
+            type_, data = self._dumps(value)
+            row = (
+                thread_id,
+                checkpoint_ns,
+                checkpoint_id,
+                task_id,
+                WRITES_IDX_MAP.get(channel, idx),
+                channel,
+                type_,
+                data,
+            )
+            (special if channel in WRITES_IDX_MAP else regular).append(row)
+
+        with self.db_manager.get_connection() as conn:
+            for conflict, rows in (("REPLACE", special), ("IGNORE", regular)):
+                if rows:
+                    conn.executemany(
+                        f"""INSERT OR {conflict} INTO writes
+                            (thread_id, checkpoint_ns, checkpoint_id, task_id, idx,
+                             channel, type, value)
+                            VALUES (?, ?, ?, ?, ?, ?, ?, ?)""",
+                        rows,
+                    )
+            conn.commit()
+
+    # --- pruning ---
+
+    def prune_idle_threads(self, idle_for: Optional[float] = None) -> int:
+        """
+        Deletes every checkpoint of threads idle for longer than `idle_for` seconds.
+
+        Args:
+            idle_for (float, optional): Idle threshold. Uses idle_thread_ttl if None.
+
+        Returns:
+            int: Number of threads deleted.
+        """
+        idle_for = self.idle_thread_ttl if idle_for is None else idle_for
+        if idle_for is None:
+            return 0
+        cutoff = time.time() - idle_for
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
+            cursor.execute("SELECT thread_id FROM threads WHERE updated_at < ?", (cutoff,))
+            thread_ids = [(row["thread_id"],) for row in cursor.fetchall()]
+            for table in ("checkpoints", "writes", "threads"):
+                cursor.executemany(f"DELETE FROM {table} WHERE thread_id = ?", thread_ids)
+            cursor.execute("COMMIT")
+        if thread_ids:
+            logger.info(f"Pruned {len(thread_ids)} idle conversation threads")
+        return len(thread_ids)
+
+    def _prune_loop(self) -> None:
+        while not self._stop.wait(self.prune_interval):
+            try:
+                self.prune_idle_threads()
+            except Exception as e:
+                logger.error(f"Failed to prune idle threads: {e}")
+
+    def delete_thread(self, thread_id: str) -> None:
+        """Deletes all checkpoints and writes of a thread."""
+        with self.db_manager.get_connection() as conn:
+            for table in ("checkpoints", "writes", "threads"):
+                conn.execute(f"DELETE FROM {table} WHERE thread_id = ?", (thread_id,))
+            conn.commit()
+
+    def close(self) -> None:
+        """Stops the background pruner and closes pooled connections."""
+        self._stop.set()
+        if self._pruner is not None:
+            self._pruner.join()
+        self.db_manager.close()
+
+    # --- async wrappers ---
+
+    async def aget_tuple(self, config: RunnableConfig) -> Optional[CheckpointTuple]:
+        """Asynchronous version of get_tuple, run in a worker thread."""
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(
+        self,
+        config: Optional[RunnableConfig],
+        *,
+        filter: Optional[Dict[str, Any]] = None,
+        before: Optional[RunnableConfig] = None,
+        limit: Optional[int] = None,
+    ) -> AsyncIterator[CheckpointTuple]:
+        """Asynchronous version of list, run in a worker thread."""
+        items = await asyncio.to_thread(
+            lambda: [*self.list(config, filter=filter, before=before, limit=limit)]
+        )
+        for item in items:
+            yield item
+
+    async def aput(
+        self,
+        config: RunnableConfig,
+        checkpoint: Checkpoint,
+        metadata: CheckpointMetadata,
+        new_versions: ChannelVersions,
+    ) -> RunnableConfig:
+        """Asynchronous version of put, run in a worker thread."""
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(
+        self,
+        config: RunnableConfig,
+        writes: Sequence[Tuple[str, Any]],
+        task_id: str,
+    ) -> None:
+        """Asynchronous version of put_writes, run in a worker thread."""
+        return await asyncio.to_thread(self.put_writes, config, writes, task_id)
+
+    def get_next_version(self, current: Optional[str], channel: ChannelProtocol) -> str:
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        next_v = current_v + 1
+        next_h = random.random()
+        return f"{next_v:032}.{next_h:016}"
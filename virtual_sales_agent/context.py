@@ -0,0 +1,236 @@
+"""Token-budgeted conversation window for the assistant prompt."""
+import json
+import logging
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any, List, Optional, Sequence
+
+from langchain_core.messages import (
+    AIMessage,
+    AnyMessage,
+    HumanMessage,
+    SystemMessage,
+    ToolMessage,
+)
+
+logger = logging.getLogger(__name__)
+
+# Per-message overhead of the chat format (role, separators)
+MESSAGE_OVERHEAD_TOKENS = 4
+
+_encoding_lock = threading.Lock()
+
+
+def _get_encoding(model: str) -> Any:
+    """Loads the tiktoken encoding for a model, or None if it is unavailable."""
+    # Serialize the first load so concurrent turns don't all try to fetch it
+    with _encoding_lock:
+        return _load_encoding(model)
+
+
+@lru_cache(maxsize=None)
+def _load_encoding(model: str) -> Any:
+    try:
+        import tiktoken
+
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        logger.warning(f"tiktoken encoding unavailable, estimating token counts: {e}")
+        return None
+
+
+def count_text_tokens(text: str, model: str = "gpt-4o") -> int:
+    """
+    Counts the tokens of a string.
+
+    Falls back to a ~4 characters per token estimate when the tiktoken
+    encoding cannot be loaded (e.g. offline).
+    """
+    if not text:
+        return 0
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return len(text) // 4 + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def _message_text(message: AnyMessage) -> str:
+    content = message.content
+    if isinstance(content, str):
+        return content
+    return " ".join(
+        part.get("text", "") if isinstance(part, dict) else str(part) for part in content
+    )
+
+
+class ConversationWindow:
+    """
+    Fits the conversation sent to the LLM into a token budget.
+
+    The system prompt is added by the prompt template, so the window only
+    shapes state["messages"]. The most recent turns are kept verbatim; once
+    the budget is exceeded, older turns are compacted to the customer's
+    message and the assistant's final reply, and the oldest of those are
+    folded into a short summary message. The graph state itself is never
+    modified, so the checkpoint keeps the full history.
+    """
+
+    def __init__(
+        self,
+        max_tokens: int = 6000,
+        keep_recent_turns: int = 3,
+        compact_chars: int = 300,
+        summary_chars: int = 120,
+        max_summary_lines: int = 20,
+        model: str = "gpt-4o",
+        cache_size: int = 4096,
+    ):
+        """
+        Initialize the window.
+
+        Args:
+            max_tokens (int): Token budget for the conversation messages
+            keep_recent_turns (int): Turns always kept verbatim
+            compact_chars (int): Characters kept from messages of compacted turns
+            summary_chars (int): Characters kept per summarized turn
+            max_summary_lines (int): Maximum number of summarized turns
+            model (str): Model name used to pick the tokenizer
+            cache_size (int): Number of per-message token counts to cache
+        """
+        self.max_tokens = max_tokens
+        self.keep_recent_turns = max(1, keep_recent_turns)
+        self.compact_chars = compact_chars
+        self.summary_chars = summary_chars
+        self.max_summary_lines = max_summary_lines
+        self.model = model
+        self.cache_size = cache_size
+        self._cache: "OrderedDict[Any, int]" = OrderedDict()
+        # One window is shared by concurrent turns
+        self._cache_lock = threading.Lock()
+
+    def count_message_tokens(self, message: AnyMessage) -> int:
+        """Counts the tokens of one message, cached by message id."""
+        key = (message.id, len(_message_text(message))) if message.id else None
+        if key is not None:
+            with self._cache_lock:
+                tokens = self._cache.get(key)
+                if tokens is not None:
+                    self._cache.move_to_end(key)
+                    return tokens
+
+        text = _message_text(message)
+        if isinstance(message, AIMessage) and message.tool_calls:
+            text += json.dumps([tc.get("args", {}) for tc in message.tool_calls])
+        tokens = count_text_tokens(text, self.model) + MESSAGE_OVERHEAD_TOKENS
+
+        if key is not None:
+            with self._cache_lock:
+                self._cache[key] = tokens
+                if len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+        return tokens
+
+    def count_tokens(self, messages: Sequence[AnyMessage]) -> int:
+        """Counts the tokens of a list of messages."""
+        return sum(self.count_message_tokens(m) for m in messages)
+
+    @staticmethod
+    def _split_turns(messages: Sequence[AnyMessage]) -> List[List[AnyMessage]]:
+        """Splits messages into turns, each starting at a customer message."""
+        turns: List[List[AnyMessage]] = []
+        for message in messages:
+            if isinstance(message, HumanMessage) or not turns:
+                turns.append([])
+            turns[-1].append(message)
+        return turns
+
+    def _truncate(self, text: str, limit: int) -> str:
+        text = " ".join(text.split())
+        return text if len(text) <= limit else text[: limit - 3] + "..."
+
+    def _compact_turn(self, turn: List[AnyMessage]) -> List[AnyMessage]:
+        """Reduces a turn to the customer message and the final reply."""
+        compacted: List[AnyMessage] = []
+        human = next((m for m in turn if isinstance(m, HumanMessage)), None)
+        if human is not None:
+            compacted.append(
+                HumanMessage(content=self._truncate(_message_text(human), self.compact_chars))
+            )
+
+        tools = sorted({m.name for m in turn if isinstance(m, ToolMessage) and m.name})
+        reply = next(
+            (
+                m
+                for m in reversed(turn)
+                if isinstance(m, AIMessage) and not m.tool_calls and _message_text(m)
+            ),
+            None,
+        )
+        text = self._truncate(_message_text(reply), self.compact_chars) if reply else ""
+        if tools:
+            text = f"{text}\n[Tools used: {', '.join(tools)}]".strip()
+        if text:
+            compacted.append(AIMessage(content=text))
+        return compacted
+
+    def _summarize(self, turns: List[List[AnyMessage]]) -> Optional[SystemMessage]:
+        """Folds turns into a single summary message."""
+        lines = []
+        for turn in turns[-self.max_summary_lines:]:
+            for message in turn:
+                if isinstance(message, HumanMessage):
+                    lines.append(
+                        f"- Customer: {self._truncate(_message_text(message), self.summary_chars)}"
+                    )
+                elif isinstance(message, AIMessage) and _message_text(message):
+                    lines.append(
+                        f"  Assistant: {self._truncate(_message_text(message), self.summary_chars)}"
+                    )
+        if not lines:
+            return None
+        omitted = len(turns) - self.max_summary_lines
+        header = "Summary of the earlier conversation"
+        if omitted > 0:
+            header += f" ({omitted} older turns omitted)"
+        return SystemMessage(content=header + ":\n" + "\n".join(lines))
+
+    def __call__(self, messages: Sequence[AnyMessage]) -> List[AnyMessage]:
+        """
+        Returns the messages to send to the LLM.
+
+        Args:
+            messages (Sequence[AnyMessage]): The full conversation from the state
+
+        Returns:
+            List[AnyMessage]: The conversation fitted to the token budget.
+        """
+        messages = list(messages)
+        if self.count_tokens(messages) <= self.max_tokens:
+            return messages
+
+        turns = self._split_turns(messages)
+        recent = turns[-self.keep_recent_turns:]
+        older = [self._compact_turn(turn) for turn in turns[: -self.keep_recent_turns]]
+
+        recent_messages = [m for turn in recent for m in turn]
+        budget = self.max_tokens - self.count_tokens(recent_messages)
+
+        # Fold the oldest compacted turns into a summary until the rest fits
+        older_tokens = [self.count_tokens(turn) for turn in older]
+        remaining = sum(older_tokens)
+        summarized: List[List[AnyMessage]] = []
+        summary = None
+        while older:
+            summary_tokens = self.count_message_tokens(summary) if summary else 0
+            if remaining + summary_tokens <= budget:
+                break
+            summarized.append(older.pop(0))
+            remaining -= older_tokens.pop(0)
+            summary = self._summarize(summarized)
+
+        window = ([summary] if summary else []) + [m for turn in older for m in turn]
+        return window + recent_messages
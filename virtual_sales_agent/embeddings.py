@@ -0,0 +1,307 @@
+"""
+Local product embeddings and top-k cosine search.
+
+Products are embedded offline with a signed feature-hashing vectorizer over
+words and character trigrams (so "stream" is close to "streaming"),
+weighted by IDF and L2-normalized. No model download or network access is
+needed. The vectors are stored as a float32 matrix next to the database and
+memory-mapped at query time, so a search is one matrix-vector product plus
+an argpartition.
+
+Usage:
+    python -m virtual_sales_agent.embeddings
+"""
+import argparse
+import logging
+import math
+import os
+import re
+import sys
+import threading
+import time
+import zlib
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DIM = 512
+
+# Relative weight of each product field and of trigram features
+FIELD_WEIGHTS = {"ProductName": 2.0, "Category": 1.5, "Description": 1.0}
+TRIGRAM_WEIGHT = 0.5
+
+STOPWORDS = frozenset(
+    """a an and any are as at be best but by can do for from get good have i
+    if in is it its me my need of on or some something that the thing this to
+    up use want what which with you your""".split()
+)
+
+
+def index_paths(db_path: str) -> Tuple[str, str]:
+    """Returns the vector matrix and metadata paths for a database."""
+    base = os.path.splitext(db_path)[0]
+    return f"{base}.vectors.npy", f"{base}.vectors.npz"
+
+
+def _features(text: str, weight: float) -> Iterable[Tuple[str, float]]:
+    for word in re.findall(r"\w+", text.lower()):
+        if word in STOPWORDS:
+            continue
+        yield f"w:{word}", weight
+        if len(word) > 3 and not word.isdigit():
+            padded = f"<{word}>"
+            for i in range(len(padded) - 2):
+                yield f"g:{padded[i:i + 3]}", weight * TRIGRAM_WEIGHT
+
+
+class HashingEmbedder:
+    """Maps text to sparse hashed feature counts of a fixed dimension."""
+
+    def __init__(self, dim: int = DEFAULT_DIM):
+        self.dim = dim
+        self._buckets: Dict[str, Tuple[int, float]] = {}
+
+    def _bucket(self, feature: str) -> Tuple[int, float]:
+        # crc32 is stable across processes, unlike hash()
+        bucket = self._buckets.get(feature)
+        if bucket is None:
+            h = zlib.crc32(feature.encode("utf-8"))
+            bucket = (h % self.dim, 1.0 if (h >> 31) & 1 else -1.0)
+            if len(self._buckets) < 500_000:
+                self._buckets[feature] = bucket
+        return bucket
+
+    def counts(self, fields: Dict[str, Optional[str]]) -> Dict[int, float]:
+        """
+        Computes sublinear term frequencies per hash bucket.
+
+        Args:
+            fields (Dict[str, Optional[str]]): Field name to text; fields
+                are weighted by FIELD_WEIGHTS
+
+        Returns:
+            Dict[int, float]: Signed (1 + log tf) values keyed by bucket.
+        """
+        tf: Dict[str, float] = defaultdict(float)
+        for field, text in fields.items():
+            if text:
+                for feature, weight in _features(text, FIELD_WEIGHTS.get(field, 1.0)):
+                    tf[feature] += weight
+        values: Dict[int, float] = defaultdict(float)
+        for feature, count in tf.items():
+            bucket, sign = self._bucket(feature)
+            weight = 1.0 + math.log(count) if count >= 1 else count
+            values[bucket] += sign * weight
+        return values
+
+    def embed(self, text: str, idf: Optional[np.ndarray] = None) -> np.ndarray:
+        """Embeds a free-text query as a unit float32 vector."""
+        vector = np.zeros(self.dim, dtype=np.float32)
+        for bucket, value in self.counts({"Query": text}).items():
+            vector[bucket] = value
+        if idf is not None:
+            vector *= idf
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+
+def build_index(
+    db_manager: Any, dim: int = DEFAULT_DIM, batch_size: int = 10_000
+) -> Tuple[str, int]:
+    """
+    Embeds every product and writes the memory-mapped vector index.
+
+    The matrix is written to a temporary file and renamed into place, so
+    readers in other processes never see a partial index. The catalog
+    version is bumped afterwards so cached search results are refreshed.
+
+    Args:
+        db_manager: The database manager providing connections
+        dim (int): Embedding dimension
+        batch_size (int): Rows fetched and embedded at a time
+
+    Returns:
+        Tuple[str, int]: The matrix path and the number of products indexed.
+    """
+    started = time.perf_counter()
+    matrix_path, meta_path = index_paths(db_manager.config.db_path)
+    embedder = HashingEmbedder(dim)
+
+    with db_manager.get_connection() as conn:
+        count = conn.execute("SELECT COUNT(*) FROM products").fetchone()[0]
+        tmp_matrix = f"{matrix_path}.tmp.npy"
+        matrix = np.lib.format.open_memmap(
+            tmp_matrix, mode="w+", dtype=np.float32, shape=(count, dim)
+        )
+        # Rows left unfilled (products deleted mid-build) keep id -1 and a
+        # zero vector, which never matches
+        ids = np.full(count, -1, dtype=np.int64)
+        df = np.zeros(dim, dtype=np.float64)
+
+        cursor = conn.execute(
+            """SELECT ProductId, ProductName, Category, Description
+               FROM products ORDER BY ProductId"""
+        )
+        row_index = 0
+        while row_index < count:
+            rows = cursor.fetchmany(batch_size)
+            if not rows:
+                break
+            rows = rows[: count - row_index]
+            block = np.zeros((len(rows), dim), dtype=np.float32)
+            for i, row in enumerate(rows):
+                ids[row_index + i] = row["ProductId"]
+                for bucket, value in embedder.counts(
+                    {field: row[field] for field in FIELD_WEIGHTS}
+                ).items():
+                    block[i, bucket] = value
+            df += np.count_nonzero(block, axis=0)
+            matrix[row_index:row_index + len(rows)] = block
+            row_index += len(rows)
+
+    # Products inserted while we were reading are picked up by the next build
+    idf = np.log((1 + row_index) / (1 + df)).astype(np.float32) + 1.0
+    for start in range(0, row_index, batch_size):
+        block = matrix[start:start + batch_size] * idf
+        norms = np.linalg.norm(block, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        matrix[start:start + batch_size] = block / norms
+    matrix.flush()
+    del matrix
+
+    tmp_meta = f"{meta_path}.tmp.npz"
+    np.savez(tmp_meta, ids=ids, idf=idf)
+    # Readers reload when the matrix file changes, so it is swapped in last
+    os.replace(tmp_meta, meta_path)
+    os.replace(tmp_matrix, matrix_path)
+
+    try:
+        with db_manager.get_connection() as conn:
+            conn.execute("UPDATE catalog_version SET Version = Version + 1 WHERE Id = 1")
+            conn.commit()
+    except Exception as e:
+        logger.warning(f"Could not bump the catalog version: {e}")
+
+    logger.info(
+        f"Indexed {row_index} products ({dim} dims) in {time.perf_counter() - started:.2f}s"
+    )
+    return matrix_path, row_index
+
+
+class VectorIndex:
+    """Memory-mapped product vectors with top-k cosine search."""
+
+    def __init__(self, matrix: np.ndarray, ids: np.ndarray, idf: np.ndarray):
+        self.matrix = matrix
+        self.ids = ids
+        self.idf = idf
+        self.embedder = HashingEmbedder(matrix.shape[1])
+
+    @classmethod
+    def load(cls, db_path: str) -> Optional["VectorIndex"]:
+        """Opens the index for a database, or returns None if it was never built."""
+        matrix_path, meta_path = index_paths(db_path)
+        if not (os.path.exists(matrix_path) and os.path.exists(meta_path)):
+            return None
+        with np.load(meta_path) as meta:
+            ids, idf = meta["ids"], meta["idf"]
+        matrix = np.load(matrix_path, mmap_mode="r")
+        if matrix.shape[0] != len(ids):
+            logger.warning(f"Ignoring inconsistent vector index {matrix_path}")
+            return None
+        return cls(matrix, ids, idf)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def search(self, query: str, k: int = 20) -> List[Tuple[int, float]]:
+        """
+        Finds the products most similar to a query.
+
+        Args:
+            query (str): Free-text query
+            k (int): Number of results
+
+        Returns:
+            List[Tuple[int, float]]: (ProductId, cosine similarity) pairs,
+            best first, excluding products with no similarity at all.
+        """
+        vector = self.embedder.embed(query, self.idf)
+        if not len(self.ids) or not vector.any():
+            return []
+        scores = self.matrix @ vector
+        k = min(k, len(scores))
+        top = np.argpartition(-scores, k - 1)[:k]
+        top = top[np.argsort(-scores[top], kind="stable")]
+        return [(int(self.ids[i]), float(scores[i])) for i in top if scores[i] > 0]
+
+
+_indexes: Dict[str, Tuple[Any, Optional[VectorIndex]]] = {}
+_indexes_lock = threading.Lock()
+
+
+def get_index(db_path: str) -> Optional[VectorIndex]:
+    """
+    Returns the vector index for a database, reloading it after a rebuild.
+
+    Args:
+        db_path (str): Path of the SQLite database the index belongs to
+
+    Returns:
+        Optional[VectorIndex]: The index, or None if it has not been built.
+    """
+    matrix_path, _ = index_paths(db_path)
+    try:
+        stat = os.stat(matrix_path)
+        # A rebuild renames a new file into place
+        stamp = (stat.st_ino, stat.st_mtime_ns)
+    except FileNotFoundError:
+        stamp = None
+    with _indexes_lock:
+        cached = _indexes.get(db_path)
+        if cached is None or cached[0] != stamp:
+            cached = (stamp, VectorIndex.load(db_path) if stamp is not None else None)
+            _indexes[db_path] = cached
+        return cached[1]
+
+
+def reciprocal_rank_fusion(rankings: Sequence[Sequence[int]], k: int = 60) -> List[int]:
+    """
+    Merges several rankings of ids by reciprocal rank fusion.
+
+    Args:
+        rankings (Sequence[Sequence[int]]): Id lists, best first
+        k (int): Damping constant; larger values flatten the rank weights
+
+    Returns:
+        List[int]: Ids ordered by fused score.
+    """
+    scores: Dict[int, float] = defaultdict(float)
+    for ranking in rankings:
+        for rank, item in enumerate(ranking):
+            scores[item] += 1.0 / (k + rank + 1)
+    return sorted(scores, key=lambda item: -scores[item])
+
+
+def main(argv: Optional[Sequence[str]] = None) -> int:
+    from database.db_manager import DatabaseManager
+
+    parser = argparse.ArgumentParser(description="Build the product vector index.")
+    parser.add_argument("--dim", type=int, default=DEFAULT_DIM, help="Embedding dimension")
+    args = parser.parse_args(argv)
+
+    db_manager = DatabaseManager()
+    try:
+        db_manager.run_migrations()
+        path, count = build_index(db_manager, dim=args.dim)
+    finally:
+        db_manager.close()
+    print(f"Indexed {count} products into {path}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
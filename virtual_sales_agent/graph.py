@@ -1,17 +1,21 @@
+import functools
+import json
 import os
-from datetime import datetime
-from typing import Annotated
-
-from dotenv import load_dotenv
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.runnables import Runnable, RunnableConfig
-from langchain_openai import ChatOpenAI
-from langgraph.checkpoint.memory import MemorySaver
+import threading
+from typing import TYPE_CHECKING, Annotated, Any, Callable, Optional
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+from langchain_core.utils.function_calling import convert_to_openai_tool
 from langgraph.graph import END, START, StateGraph
 from langgraph.graph.message import AnyMessage, add_messages
 from langgraph.prebuilt import tools_condition
 from typing_extensions import TypedDict
 
+from virtual_sales_agent.context import ConversationWindow
+from virtual_sales_agent.intents import RETURN_POLICY, IntentRouter
+from virtual_sales_agent.prompts import AssistantPrompt, PromptMetrics
+from virtual_sales_agent.responses import DirectResponder
 from virtual_sales_agent.tools import (
     check_order_status,
     create_order,
@@ -19,16 +23,14 @@ from virtual_sales_agent.tools import (
     request_human_representative,
     search_products,
     search_products_recommendations,
+    tool_payloads,
 )
-from virtual_sales_agent.utils import create_tool_node_with_fallback
-
-load_dotenv()
+from virtual_sales_agent.utils import create_tool_node_with_fallback, pending_tool_calls
 
-os.environ["LANGSMITH_API_KEY"] = os.getenv("LANGSMITH_API_KEY")
-os.environ["LANGSMITH_TRACING"] = os.getenv("LANGSMITH_TRACING")
-os.environ["LANGSMITH_API_KEY"] = os.getenv("LANGSMITH_API_KEY")
-os.environ["LANGSMITH_PROJECT"] = os.getenv("LANGSMITH_PROJECT")
-os.environ["OPENAI_API_KEY"] = os.getenv("OPENAI_API_KEY")
+if TYPE_CHECKING:
+    from langchain_core.language_models import BaseChatModel
+    from langgraph.checkpoint.base import BaseCheckpointSaver
+    from langgraph.graph.state import CompiledStateGraph
 
 
 class State(TypedDict):
@@ -37,40 +39,67 @@ class State(TypedDict):
 
 
 class Assistant:
-    def __init__(self, runnable: Runnable):
+    def __init__(
+        self,
+        runnable: Runnable,
+        window: Optional[ConversationWindow] = None,
+        metrics: Optional[PromptMetrics] = None,
+    ):
         self.runnable = runnable
+        self.window = window
+        self.metrics = metrics
+
+    def _prepare(self, state: State, config: RunnableConfig) -> State:
+        if self.window:
+            # Only the prompt is windowed; the checkpointed state keeps everything
+            state = {**state, "messages": self.window(state["messages"])}
+        configuration = config.get("configurable", {})
+        customer_id = configuration.get("customer_id", None)
+        return {**state, "user_info": customer_id}
+
+    def _record(self, state: State, result) -> None:
+        if self.metrics:
+            self.metrics.record(result, state["messages"])
+
+    @staticmethod
+    def _is_empty(result) -> bool:
+        return not result.tool_calls and (
+            not result.content
+            or isinstance(result.content, list)
+            and not result.content[0].get("text")
+        )
 
     def __call__(self, state: State, config: RunnableConfig):
+        state = self._prepare(state, config)
         while True:
-            configuration = config.get("configurable", {})
-            customer_id = configuration.get("customer_id", None)
-            state = {**state, "user_info": customer_id}
             result = self.runnable.invoke(state)
-            if not result.tool_calls and (
-                not result.content
-                or isinstance(result.content, list)
-                and not result.content[0].get("text")
-            ):
-                messages = state["messages"] + [("user", "Respond with a real output.")]
+            self._record(state, result)
+            if self._is_empty(result):
+                messages = state["messages"] + [HumanMessage(content="Respond with a real output.")]
                 state = {**state, "messages": messages}
             else:
                 break
         return {"messages": result}
 
+    async def acall(self, state: State, config: RunnableConfig):
+        """Async version of __call__, used when the graph runs on an event loop."""
+        state = self._prepare(state, config)
+        while True:
+            result = await self.runnable.ainvoke(state)
+            self._record(state, result)
+            if self._is_empty(result):
+                messages = state["messages"] + [HumanMessage(content="Respond with a real output.")]
+                state = {**state, "messages": messages}
+            else:
+                break
+        return {"messages": result}
 
-llm = ChatOpenAI(
-    model="gpt-4o",
-    temperature=0,
-    max_tokens=None,
-    timeout=None,
-    max_retries=5
-)
 
-assistant_prompt = ChatPromptTemplate.from_messages(
-    [
-        (
-            "system",
-            """You are a helpful virtual sales assistant for our online store. Your goal is to provide excellent customer service by helping customers find products, make purchases, and track their orders.
+# Static instructions: sent first and identical on every call, so the
+# provider can serve them from its prompt cache. The per-customer and
+# per-call context is added after the conversation by AssistantPrompt.
+SYSTEM_PROMPT = (
+    """You are a helpful virtual sales assistant for our online store. Your goal is to provide excellent customer service by helping customers find products, make purchases, and track their orders.
 
 Use the provided tools to:
 - Search for products and provide relevant recommendations
@@ -92,6 +121,7 @@ When searching for products:
 - Use the get product categories tool to help customers explore options
 - Use category and price range flexibility to find relevant options if the customer provides this information
 - Provide detailed product information including price, availability in bullet points style.
+- Product results come as a table: a header line with the column names, then one line per product with the values separated by "|"
 
 When making recommendations:
 - Consider customer's past purchases and preferences
@@ -110,6 +140,7 @@ When a customer asks about order status:
 - Use the check_order_status tool with the order ID to get detailed information
 - Present order status, date, products, and total amount in a clear format
 - If order ID is invalid or not found, explain that to the customer and ask for a valid ID
+- Order lists are paginated, newest first: if has_more is true, pass next_before_order_id as before_order_id to get older orders, and use start_date/end_date for a specific period
 
 When a customer wants to speak with a human representative:
 - Acknowledge their request immediately
@@ -121,22 +152,9 @@ When a customer wants to speak with a human representative:
 
 You know the following information about our store's return policies:
 
-1. General Return Policy:
-   - Customers can return most items within 30 days of purchase for a full refund or exchange
-   - Items must be in their original condition with all tags and packaging intact
-   - Customers must present a receipt or proof of purchase when returning items
-
-2. Non-Returnable Items:
-   - Clearance merchandise (marked as final sale)
-   - Perishable goods (including food items)
-   - Personal care items (once opened)
-   - Special order or customized items
-
-3. Refund Methods:
-   - Refunds are issued to the original form of payment
-   - Credit card purchases are refunded to the same card
-   - Cash or check purchases receive cash refunds
-   - Store credit may be issued if original receipt is not available
+"""
+    + RETURN_POLICY
+    + """
 
 When customers ask about return policies, provide clear and accurate information based on the above details. If they ask about a specific scenario not covered in these policies, inform them that they can contact customer service for more information.
 
@@ -149,14 +167,10 @@ Always maintain a friendly, professional tone and:
 - Follow up on order status proactively
 - Explain any limitations or restrictions clearly
 
-If you can't find exactly what the customer is looking for, explore alternatives and provide helpful suggestions before concluding that an item is unavailable.
+If you can't find exactly what the customer is looking for, explore alternatives and provide helpful suggestions before concluding that an item is unavailable."""
+)
 
-\n\nCurrent user:\n<User>\n{user_info}\n</User>
-\nCurrent time: {time}.""",
-        ),
-        ("placeholder", "{messages}"),
-    ]
-).partial(time=datetime.now)
+assistant_prompt = AssistantPrompt(SYSTEM_PROMPT)
 
 # "Read"-only tools
 safe_tools = [
@@ -172,17 +186,17 @@ sensitive_tools = [
     create_order,
 ]
 
+safe_tool_names = {tool.name for tool in safe_tools}
 sensitive_tool_names = {tool.name for tool in sensitive_tools}
 
-assistant_runnable = assistant_prompt | llm.bind_tools(safe_tools + sensitive_tools)
 
-builder = StateGraph(State)
+def _tool_schemas() -> str:
+    return json.dumps([convert_to_openai_tool(t) for t in safe_tools + sensitive_tools])
 
 
-# Define nodes: these do the work
-builder.add_node("assistant", Assistant(assistant_runnable))
-builder.add_node("safe_tools", create_tool_node_with_fallback(safe_tools))
-builder.add_node("sensitive_tools", create_tool_node_with_fallback(sensitive_tools))
+# Input tokens of every assistant call, shared by the graphs of this process.
+# The cacheable prefix is the instructions plus the tool schemas.
+prompt_metrics = PromptMetrics(SYSTEM_PROMPT, prefix_extra=_tool_schemas)
 
 
 def route_tools(state: State):
@@ -190,23 +204,178 @@ def route_tools(state: State):
     # If no tools are invoked, return to the user
     if next_node == END:
         return END
-    ai_message = state["messages"][-1]
-    # This assumes single tool calls. To handle parallel tool calling, you'd want to
-    # use an ANY condition
-    first_tool_call = ai_message.tool_calls[0]
-    if first_tool_call["name"] in sensitive_tool_names:
-        return "sensitive_tools"
-    return "safe_tools"
-
+    # Run every safe call first (concurrently) and hold the sensitive ones
+    # for approval afterwards. Calls to unknown tools are answered with an
+    # error by the safe tool node, never sent for approval.
+    pending = pending_tool_calls(state["messages"])
+    if any(tc["name"] not in sensitive_tool_names for tc in pending):
+        return "safe_tools"
+    return "sensitive_tools"
+
+
+def route_answered(state: State):
+    # The fast-path nodes either answered the turn themselves or left it to
+    # the assistant
+    if isinstance(state["messages"][-1], AIMessage):
+        return END
+    return "assistant"
 
-# Define edges: these determine how the control flow moves
-builder.add_edge(START, "assistant")
-builder.add_conditional_edges(
-    "assistant", route_tools, ["safe_tools", "sensitive_tools", END]
-)
-builder.add_edge("safe_tools", "assistant")
-builder.add_edge("sensitive_tools", "assistant")
 
-# Compile the graph
-memory = MemorySaver()
-graph = builder.compile(checkpointer=memory, interrupt_before=["sensitive_tools"])
+def route_after_safe_tools(state: State):
+    if pending_tool_calls(state["messages"], sensitive_tool_names):
+        return "sensitive_tools"
+    return "assistant"
+
+
+def build_graph(
+    llm: "BaseChatModel",
+    checkpointer: Optional["BaseCheckpointSaver"] = None,
+    fast_path: Optional[bool] = None,
+    direct_responses: Optional[bool] = None,
+    compact_tool_results: Optional[bool] = None,
+) -> "CompiledStateGraph":
+    """
+    Builds the sales agent graph around a chat model.
+
+    Args:
+        llm (BaseChatModel): Chat model supporting bind_tools
+        checkpointer (BaseCheckpointSaver, optional): Where conversations are persisted
+        fast_path (bool, optional): Answer policy, contact and greeting turns
+            from templates before the assistant. Reads ASSISTANT_FAST_PATH
+            (default on) if None.
+        direct_responses (bool, optional): Show order status and category
+            results with Markdown templates instead of a second model call.
+            Reads ASSISTANT_DIRECT_RESPONSES (default off) if None.
+        compact_tool_results (bool, optional): Send product results to the
+            model as compact tables (see tools.tool_payloads). Reads
+            ASSISTANT_COMPACT_TOOL_RESULTS (default on) if None.
+
+    Returns:
+        CompiledStateGraph: The compiled graph, interrupting before sensitive tools.
+    """
+    assistant_runnable = RunnableLambda(assistant_prompt) | llm.bind_tools(
+        safe_tools + sensitive_tools
+    )
+
+    builder = StateGraph(State)
+
+    # Define nodes: these do the work
+    window = ConversationWindow(
+        max_tokens=int(os.getenv("ASSISTANT_CONTEXT_TOKENS", "6000")),
+        keep_recent_turns=int(os.getenv("ASSISTANT_RECENT_TURNS", "3")),
+    )
+    assistant = Assistant(assistant_runnable, window, prompt_metrics)
+    builder.add_node("assistant", RunnableLambda(assistant, afunc=assistant.acall))
+    if compact_tool_results is None:
+        compact_tool_results = os.getenv("ASSISTANT_COMPACT_TOOL_RESULTS", "1") != "0"
+    builder.add_node(
+        "safe_tools",
+        create_tool_node_with_fallback(
+            safe_tools,
+            payloads=tool_payloads if compact_tool_results else None,
+            other_tool_names=sensitive_tool_names,
+        ),
+    )
+    builder.add_node("sensitive_tools", create_tool_node_with_fallback(sensitive_tools))
+
+    if fast_path is None:
+        fast_path = os.getenv("ASSISTANT_FAST_PATH", "1") != "0"
+    if fast_path:
+        router = IntentRouter()
+        builder.add_node("intent_router", RunnableLambda(router, afunc=router.acall))
+    if direct_responses is None:
+        direct_responses = os.getenv("ASSISTANT_DIRECT_RESPONSES", "0") == "1"
+    if direct_responses:
+        responder = DirectResponder()
+        builder.add_node("direct_response", RunnableLambda(responder, afunc=responder.acall))
+
+    # Define edges: these determine how the control flow moves
+    if fast_path:
+        builder.add_edge(START, "intent_router")
+        builder.add_conditional_edges("intent_router", route_answered, ["assistant", END])
+    else:
+        builder.add_edge(START, "assistant")
+    builder.add_conditional_edges(
+        "assistant", route_tools, ["safe_tools", "sensitive_tools", END]
+    )
+    if direct_responses:
+        # Templated results end the turn; anything else goes on to the assistant
+        builder.add_conditional_edges(
+            "safe_tools",
+            route_after_safe_tools,
+            {"sensitive_tools": "sensitive_tools", "assistant": "direct_response"},
+        )
+        builder.add_conditional_edges("direct_response", route_answered, ["assistant", END])
+    else:
+        builder.add_conditional_edges(
+            "safe_tools", route_after_safe_tools, ["sensitive_tools", "assistant"]
+        )
+    builder.add_edge("sensitive_tools", "assistant")
+
+    # Compile the graph
+    return builder.compile(checkpointer=checkpointer, interrupt_before=["sensitive_tools"])
+
+
+def _once(func: Callable[[], Any]) -> Callable[[], Any]:
+    """Caches a factory's result; concurrent first calls build it only once."""
+    lock = threading.Lock()
+    result: list = []
+
+    @functools.wraps(func)
+    def wrapper():
+        if not result:
+            with lock:
+                if not result:
+                    result.append(func())
+        return result[0]
+
+    wrapper.cache_clear = result.clear
+    return wrapper
+
+
+@_once
+def _load_env() -> None:
+    """Loads .env; variables that are already set are left alone."""
+    from dotenv import load_dotenv
+
+    load_dotenv()
+
+
+@_once
+def get_llm() -> "BaseChatModel":
+    """Returns the shared chat model, created on first use."""
+    _load_env()
+    from langchain_openai import ChatOpenAI
+
+    return ChatOpenAI(
+        model="gpt-4o",
+        temperature=0,
+        max_tokens=None,
+        timeout=None,
+        max_retries=5
+    )
+
+
+@_once
+def get_checkpointer() -> "BaseCheckpointSaver":
+    """Returns the shared SQLite checkpointer, created on first use."""
+    from virtual_sales_agent.checkpointer import SqliteCheckpointer
+
+    return SqliteCheckpointer()
+
+
+@_once
+def get_graph() -> "CompiledStateGraph":
+    """Returns the application graph, built on first use."""
+    return build_graph(get_llm(), get_checkpointer())
+
+
+_LAZY_ATTRIBUTES = {"llm": get_llm, "checkpointer": get_checkpointer, "graph": get_graph}
+
+
+def __getattr__(name: str) -> Any:
+    # Keeps `from virtual_sales_agent.graph import graph` working without
+    # building the model and graph at import time
+    if name in _LAZY_ATTRIBUTES:
+        return _LAZY_ATTRIBUTES[name]()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
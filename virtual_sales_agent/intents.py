@@ -0,0 +1,193 @@
+"""Deterministic answers for policy, contact and greeting turns."""
+import functools
+import logging
+import re
+import threading
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, FrozenSet, Optional, Sequence
+
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
+
+logger = logging.getLogger(__name__)
+
+# Shared by the assistant prompt and the templated answer, so they never drift
+RETURN_POLICY = """1. General Return Policy:
+   - Customers can return most items within 30 days of purchase for a full refund or exchange
+   - Items must be in their original condition with all tags and packaging intact
+   - Customers must present a receipt or proof of purchase when returning items
+
+2. Non-Returnable Items:
+   - Clearance merchandise (marked as final sale)
+   - Perishable goods (including food items)
+   - Personal care items (once opened)
+   - Special order or customized items
+
+3. Refund Methods:
+   - Refunds are issued to the original form of payment
+   - Credit card purchases are refunded to the same card
+   - Cash or check purchases receive cash refunds
+   - Store credit may be issued if original receipt is not available"""
+
+TEMPLATES = {
+    "return_policy": (
+        "Here is our return policy:\n\n"
+        f"{RETURN_POLICY}\n\n"
+        "If your situation isn't covered here, just let me know the details, "
+        "or ask to speak with a human representative."
+    ),
+    "contact": (
+        "I'd be happy to have a human representative reach out to you. "
+        "I'll just need a few contact details, one at a time.\n\n"
+        "First, could you please tell me your **full name**?"
+    ),
+    "greeting": (
+        "Hello! 👋 Welcome to Tech Shop. I can help you find products, get "
+        "recommendations, place orders and check your order status.\n\n"
+        "What are you looking for today?"
+    ),
+}
+
+# Words that may appear in any templated question without changing its meaning
+FILLER = frozenset(
+    """a an and are can could do does i i'd i'm id is it me my please s so the
+    thanks thank to what what's whats would you your""".split()
+)
+
+
+@dataclass(frozen=True)
+class Intent:
+    """
+    A question with a fixed answer.
+
+    A message matches when the trigger is found and every word is either
+    filler or part of the intent's vocabulary, so anything more specific
+    (a product, an order id, a scenario) is left to the assistant.
+    """
+
+    name: str
+    trigger: "re.Pattern[str]"
+    vocabulary: FrozenSet[str]
+
+    def matches(self, text: str, words: Sequence[str]) -> bool:
+        return bool(self.trigger.search(text)) and all(
+            word in FILLER or word in self.vocabulary for word in words
+        )
+
+
+INTENTS = (
+    Intent(
+        "return_policy",
+        re.compile(r"\b(returns?|returning|refunds?)\b"),
+        frozenset(
+            """about return returns returning refund refunds policy policies
+            how work works tell store your exchange exchanges item items""".split()
+        ),
+    ),
+    Intent(
+        "contact",
+        re.compile(r"\b(human|representative|real person|customer (service|support)|agent)\b"),
+        frozenset(
+            """speak talk chat with human representative person real customer
+            service support agent like want need connect get contact someone
+            let""".split()
+        ),
+    ),
+    Intent(
+        "greeting",
+        re.compile(r"^(hi|hello|hey|howdy|greetings|good (morning|afternoon|evening))\b"),
+        frozenset(
+            """hi hello hey howdy greetings good morning afternoon evening
+            there""".split()
+        ),
+    ),
+)
+
+
+class IntentRouter:
+    """
+    Answers templated intents before the assistant, without an LLM call.
+
+    Classification is a keyword match over the latest customer message and
+    is memoized per normalized text, since the same suggestion bubbles are
+    sent over and over. Turns that don't match exactly one intent, and
+    turns that are not a new customer message, pass through unchanged.
+    """
+
+    def __init__(
+        self,
+        intents: Sequence[Intent] = INTENTS,
+        templates: Optional[Dict[str, str]] = None,
+        max_words: int = 12,
+        cache_size: int = 4096,
+    ):
+        """
+        Initialize the router.
+
+        Args:
+            intents (Sequence[Intent]): Intents in priority order
+            templates (Dict[str, str], optional): Answer per intent name
+            max_words (int): Longer messages always go to the assistant
+            cache_size (int): Number of classified messages to remember
+        """
+        self.intents = tuple(intents)
+        self.templates = templates if templates is not None else TEMPLATES
+        self.max_words = max_words
+        self.classify = functools.lru_cache(maxsize=cache_size)(self._classify)
+        self._lock = threading.Lock()
+        self._answered: Counter = Counter()
+        self._passed = 0
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        return " ".join(re.findall(r"[a-z0-9']+", text.lower().replace("’", "'")))
+
+    def _classify(self, text: str) -> Optional[str]:
+        """Returns the intent of a normalized message, or None."""
+        words = text.split()
+        if not words or len(words) > self.max_words:
+            return None
+        for intent in self.intents:
+            if intent.name in self.templates and intent.matches(text, words):
+                return intent.name
+        return None
+
+    def answer(self, message: Any) -> Optional[AIMessage]:
+        """Returns the templated reply to a customer message, or None."""
+        if not isinstance(message, HumanMessage) or not isinstance(message.content, str):
+            return None
+        intent = self.classify(self.normalize(message.content))
+        with self._lock:
+            if intent is None:
+                self._passed += 1
+                return None
+            self._answered[intent] += 1
+        logger.debug(f"Answered '{intent}' intent from template")
+        return AIMessage(content=self.templates[intent], response_metadata={"intent": intent})
+
+    def __call__(self, state: Dict[str, Any], config: RunnableConfig) -> Optional[Dict[str, Any]]:
+        reply = self.answer(state["messages"][-1]) if state["messages"] else None
+        return {"messages": reply} if reply is not None else None
+
+    async def acall(self, state: Dict[str, Any], config: RunnableConfig) -> Optional[Dict[str, Any]]:
+        """Async version of __call__; classification never blocks."""
+        return self(state, config)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns how many turns were answered per intent and passed on.
+
+        Returns:
+            Dict[str, Any]: Router counters and classification cache info.
+        """
+        with self._lock:
+            answered = dict(self._answered)
+            passed = self._passed
+        info = self.classify.cache_info()
+        return {
+            "answered": answered,
+            "passed_to_assistant": passed,
+            "cache_hits": info.hits,
+            "cache_misses": info.misses,
+        }
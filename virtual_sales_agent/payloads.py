@@ -0,0 +1,173 @@
+"""Compact, field-projected encodings of tool results for the model's context."""
+import json
+import logging
+import threading
+from collections import defaultdict
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple
+
+from virtual_sales_agent.context import count_text_tokens
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass(frozen=True)
+class Projection:
+    """
+    How a tool result is reduced before it is added to the conversation.
+
+    The items under `list_key` are cut to the best `max_items`, reduced to
+    `fields` and encoded as one header line plus one "|"-separated line per
+    item. Of the rest of the result, only the `keep` keys and the
+    `keep_metadata` keys of its "metadata" section are sent.
+    """
+
+    list_key: str
+    fields: Tuple[str, ...]
+    max_items: int = 8
+    text_limits: Mapping[str, int] = field(default_factory=dict)
+    keep: Tuple[str, ...] = ("status", "message")
+    keep_metadata: Tuple[str, ...] = ()
+
+
+def _cell(value: Any, limit: Optional[int] = None) -> str:
+    if value is None:
+        return ""
+    if isinstance(value, float):
+        text = f"{value:.2f}".rstrip("0").rstrip(".")
+    else:
+        text = " ".join(str(value).split()).replace("|", "/")
+    if limit and len(text) > limit:
+        text = text[: limit - 3].rstrip() + "..."
+    return text
+
+
+def encode_table(
+    rows: Sequence[Mapping[str, Any]],
+    fields: Sequence[str],
+    text_limits: Optional[Mapping[str, int]] = None,
+) -> str:
+    """
+    Encodes records as a header line and one "|"-separated line per record.
+
+    Args:
+        rows (Sequence[Mapping[str, Any]]): The records
+        fields (Sequence[str]): Columns to keep, in order
+        text_limits (Mapping[str, int], optional): Maximum characters per column
+
+    Returns:
+        str: The table, without a trailing newline.
+    """
+    text_limits = text_limits or {}
+    lines = ["|".join(fields)]
+    lines.extend(
+        "|".join(_cell(row.get(name), text_limits.get(name)) for name in fields) for row in rows
+    )
+    return "\n".join(lines)
+
+
+def project(result: Mapping[str, Any], projection: Projection) -> str:
+    """
+    Encodes a tool result according to a projection.
+
+    Args:
+        result (Mapping[str, Any]): The tool's result
+        projection (Projection): What to keep
+
+    Returns:
+        str: "key: value" lines followed by the item table.
+    """
+    lines = [f"{key}: {_cell(result[key])}" for key in projection.keep if key in result]
+    metadata = result.get("metadata") or {}
+    lines.extend(
+        f"{key}: {_cell(metadata[key])}" for key in projection.keep_metadata if key in metadata
+    )
+    items = result.get(projection.list_key) or []
+    shown = items[: projection.max_items]
+    if len(shown) < len(items):
+        lines.append(f"{projection.list_key}: {len(shown)} of {len(items)} shown, best first")
+    else:
+        lines.append(f"{projection.list_key}: {len(items)}")
+    if shown:
+        lines.append(encode_table(shown, projection.fields, projection.text_limits))
+    return "\n".join(lines)
+
+
+class PayloadCompactor:
+    """
+    Replaces the JSON results of selected tools with compact encodings.
+
+    Tool results stay in the conversation and are re-sent to the model on
+    every later turn, so they are projected once, when the tool returns.
+    Errors and results of unknown shape are passed through unchanged. The
+    token sizes before and after are recorded per tool.
+    """
+
+    def __init__(self, projections: Mapping[str, Projection], model: str = "gpt-4o"):
+        """
+        Initialize the compactor.
+
+        Args:
+            projections (Mapping[str, Projection]): Projection per tool name
+            model (str): Model name used to pick the tokenizer for the report
+        """
+        self.projections = dict(projections)
+        self.model = model
+        self._lock = threading.Lock()
+        self._sizes: Dict[str, List[int]] = defaultdict(lambda: [0, 0, 0])
+
+    def __contains__(self, tool_name: str) -> bool:
+        return tool_name in self.projections
+
+    def compact(self, tool_name: str, content: Any) -> Any:
+        """
+        Returns the compact encoding of a serialized tool result.
+
+        Args:
+            tool_name (str): Name of the tool that produced the result
+            content: The ToolMessage content (a JSON string)
+
+        Returns:
+            The compact text, or the content unchanged if it can't be projected.
+        """
+        projection = self.projections.get(tool_name)
+        if projection is None or not isinstance(content, str):
+            return content
+        try:
+            result = json.loads(content)
+        except ValueError:
+            return content
+        if not isinstance(result, dict) or result.get("status") == "error":
+            return content
+
+        compacted = project(result, projection)
+        raw_tokens = count_text_tokens(content, self.model)
+        compact_tokens = count_text_tokens(compacted, self.model)
+        with self._lock:
+            sizes = self._sizes[tool_name]
+            sizes[0] += 1
+            sizes[1] += raw_tokens
+            sizes[2] += compact_tokens
+        logger.debug(f"{tool_name} result compacted from {raw_tokens} to {compact_tokens} tokens")
+        return compacted
+
+    def report(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Returns the token sizes of the compacted results per tool.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Calls, raw and compact tokens, and the
+            average compact tokens per call, by tool name.
+        """
+        with self._lock:
+            sizes = {name: list(values) for name, values in self._sizes.items()}
+        return {
+            name: {
+                "calls": calls,
+                "raw_tokens": raw,
+                "compact_tokens": compact,
+                "avg_compact_tokens": round(compact / calls, 1),
+                "reduction": round(1 - compact / raw, 3) if raw else 0.0,
+            }
+            for name, (calls, raw, compact) in sorted(sizes.items())
+        }
@@ -0,0 +1,168 @@
+"""Assistant prompt layout with a stable, provider-cacheable prefix."""
+import functools
+import logging
+import threading
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Sequence
+
+from langchain_core.messages import AIMessage, AnyMessage, SystemMessage, convert_to_messages
+from langchain_core.prompt_values import ChatPromptValue
+from langchain_core.prompts import PromptTemplate
+
+from virtual_sales_agent.context import (
+    MESSAGE_OVERHEAD_TOKENS,
+    ConversationWindow,
+    count_text_tokens,
+)
+
+logger = logging.getLogger(__name__)
+
+CONTEXT_TEMPLATE = "Current user:\n<User>\n{user_info}\n</User>\nCurrent time: {time}."
+
+
+class AssistantPrompt:
+    """
+    Lays out the messages sent to the model for prefix caching.
+
+    Providers cache the longest previously seen prefix of a request, so the
+    large instructions go first as one fixed system message, followed by
+    the conversation, which only ever grows at the end. The per-customer
+    and per-call context (customer id, current time) changes on every call
+    and is sent last, as a separate system message, where it can't
+    invalidate anything before it. The context template is compiled once
+    per customer.
+    """
+
+    def __init__(self, instructions: str, cache_size: int = 1024):
+        """
+        Initialize the prompt.
+
+        Args:
+            instructions (str): The static system prompt
+            cache_size (int): Number of per-customer context templates to keep
+        """
+        self.system_message = SystemMessage(content=instructions)
+        self._context_template = PromptTemplate.from_template(CONTEXT_TEMPLATE)
+        self.context_template = functools.lru_cache(maxsize=cache_size)(self._compile)
+
+    def _compile(self, user_info: str) -> PromptTemplate:
+        return self._context_template.partial(user_info=user_info)
+
+    def context_message(self, user_info: Any) -> SystemMessage:
+        """Returns the volatile context message for a customer."""
+        template = self.context_template(str(user_info))
+        return SystemMessage(content=template.format(time=datetime.now().isoformat(timespec="minutes")))
+
+    def __call__(self, state: Dict[str, Any]) -> ChatPromptValue:
+        return ChatPromptValue(
+            messages=[
+                self.system_message,
+                # Accepts message-like tuples and dicts as well
+                *convert_to_messages(state["messages"]),
+                self.context_message(state.get("user_info")),
+            ]
+        )
+
+
+class PromptMetrics:
+    """
+    Per-call prompt token counts of the assistant.
+
+    Uses the usage reported by the provider when available, including how
+    many input tokens were served from its prompt cache; otherwise the
+    prompt size is estimated locally.
+    """
+
+    def __init__(
+        self,
+        prefix: str,
+        prefix_extra: Optional[Callable[[], str]] = None,
+        count_tokens: Optional[Callable[[Sequence[AnyMessage]], int]] = None,
+        model: str = "gpt-4o",
+    ):
+        """
+        Initialize the metrics.
+
+        Args:
+            prefix (str): The static part of the prompt
+            prefix_extra (Callable, optional): Returns more static text sent
+                with the prefix (e.g. tool schemas); called on first use
+            count_tokens (Callable, optional): Counts the tokens of messages
+                for estimates; defaults to a ConversationWindow's counter
+            model (str): Model name used to pick the tokenizer for estimates
+        """
+        self.prefix = prefix
+        self.prefix_extra = prefix_extra
+        self.model = model
+        self.count_tokens = count_tokens or ConversationWindow(model=model).count_tokens
+        self._prefix_tokens: Optional[int] = None
+        self._lock = threading.Lock()
+
+        # Stats
+        self._calls = 0
+        self._input_tokens = 0
+        self._cached_tokens = 0
+        self._estimated_calls = 0
+        self._max_input_tokens = 0
+
+    @property
+    def prefix_tokens(self) -> int:
+        """Token count of the static prefix, computed on first use."""
+        if self._prefix_tokens is None:
+            prefix = self.prefix + (self.prefix_extra() if self.prefix_extra else "")
+            self._prefix_tokens = count_text_tokens(prefix, self.model) + MESSAGE_OVERHEAD_TOKENS
+        return self._prefix_tokens
+
+    def record(self, result: AIMessage, messages: Sequence[AnyMessage] = ()) -> int:
+        """
+        Records one model call.
+
+        Args:
+            result (AIMessage): The model's reply
+            messages (Sequence[AnyMessage]): The messages sent after the
+                prefix, counted only when the provider reports no usage
+
+        Returns:
+            int: The call's input tokens.
+        """
+        usage = getattr(result, "usage_metadata", None) or {}
+        input_tokens = usage.get("input_tokens")
+        cached = (usage.get("input_token_details") or {}).get("cache_read") or 0
+        estimated = input_tokens is None
+        if estimated:
+            input_tokens = self.prefix_tokens + self.count_tokens(messages)
+        with self._lock:
+            self._calls += 1
+            self._input_tokens += input_tokens
+            self._cached_tokens += cached
+            self._estimated_calls += estimated
+            self._max_input_tokens = max(self._max_input_tokens, input_tokens)
+        logger.debug(
+            f"Assistant prompt: {input_tokens} input tokens"
+            + (" (estimated)" if estimated else f", {cached} cached")
+        )
+        return input_tokens
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Returns prompt size and cache statistics.
+
+        Returns:
+            Dict[str, Any]: Call count, token totals and cached share.
+        """
+        prefix_tokens = self.prefix_tokens
+        with self._lock:
+            calls = self._calls
+            return {
+                "calls": calls,
+                "prefix_tokens": prefix_tokens,
+                "input_tokens": self._input_tokens,
+                "avg_input_tokens": round(self._input_tokens / calls, 1) if calls else 0.0,
+                "max_input_tokens": self._max_input_tokens,
+                "cached_tokens": self._cached_tokens,
+                "cached_ratio": round(self._cached_tokens / self._input_tokens, 3)
+                if self._input_tokens
+                else 0.0,
+                "estimated_calls": self._estimated_calls,
+            }
+
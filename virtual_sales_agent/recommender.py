@@ -0,0 +1,320 @@
+"""Item-to-item product recommendations built from order history."""
+import logging
+import threading
+from collections import defaultdict, deque
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+_EMPTY = (np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32))
+
+
+class RecommendationEngine:
+    """
+    Recommends in-stock products from co-purchases and category affinity.
+
+    The engine keeps, in memory:
+
+    - a sparse product x product co-purchase matrix (dictionary-of-keys rows,
+      each compacted on demand into NumPy arrays of its strongest neighbours)
+    - per-customer recent purchases and exponentially decayed category
+      affinity scores
+    - product popularity, overall and per category
+
+    It is loaded once from orders_details and then updated incrementally as
+    orders are created, so a recommendation is an O(k) lookup plus a single
+    primary-key query to keep only items that are still in stock.
+    """
+
+    def __init__(
+        self,
+        db_manager: Any,
+        neighbors_per_product: int = 20,
+        history_size: int = 10,
+        affinity_decay: float = 0.8,
+        affinity_weight: float = 0.5,
+    ):
+        """
+        Initialize the recommendation engine.
+
+        Args:
+            db_manager: The database manager providing connections
+            neighbors_per_product (int): Neighbours kept per matrix row
+            history_size (int): Recent purchases kept per customer
+            affinity_decay (float): Decay applied to a customer's category
+                scores each time they place an order
+            affinity_weight (float): Weight of category affinity relative to
+                co-purchase scores
+        """
+        self.db_manager = db_manager
+        self.neighbors_per_product = neighbors_per_product
+        self.history_size = history_size
+        self.affinity_decay = affinity_decay
+        self.affinity_weight = affinity_weight
+
+        self._lock = threading.RLock()
+        self._loaded = False
+        self._reset()
+
+    def _reset(self) -> None:
+        # Sparse co-purchase counts: product -> {product: orders containing both}
+        self._co_counts: Dict[int, Dict[int, float]] = defaultdict(dict)
+        self._order_counts: Dict[int, int] = defaultdict(int)
+        self._popularity: Dict[int, float] = defaultdict(float)
+        self._category_of: Dict[int, str] = {}
+        self._category_products: Dict[str, set] = defaultdict(set)
+        self._history: Dict[str, deque] = {}
+        self._affinity: Dict[str, Dict[str, float]] = defaultdict(dict)
+
+        # Compacted views, rebuilt lazily when their inputs change
+        self._neighbors: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self._dirty_rows: set = set()
+        self._top_by_category: Dict[str, np.ndarray] = {}
+        self._top_overall: Optional[np.ndarray] = None
+
+        # Newest order folded in by load(); record_order skips older ones
+        self._loaded_order_id = 0
+
+    def load(self) -> None:
+        """Builds the in-memory model from the full order history."""
+        with self._lock:
+            self._reset()
+            with self.db_manager.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute("SELECT ProductId, Category FROM products")
+                for row in cursor.fetchall():
+                    self._add_product(row["ProductId"], row["Category"])
+
+                cursor.execute(
+                    """
+                    SELECT o.OrderId, o.CustomerId, od.ProductId, od.Quantity
+                    FROM orders o
+                    JOIN orders_details od ON o.OrderId = od.OrderId
+                    ORDER BY o.OrderId
+                """
+                )
+                current_order, customer_id, items = None, None, []
+                for row in cursor:
+                    if row["OrderId"] != current_order:
+                        if items:
+                            self._apply_order(customer_id, items)
+                        current_order, customer_id, items = row["OrderId"], row["CustomerId"], []
+                    items.append((row["ProductId"], row["Quantity"]))
+                if items:
+                    self._apply_order(customer_id, items)
+                self._loaded_order_id = current_order or 0
+            self._loaded = True
+            logger.info(
+                f"Loaded recommendation model for {len(self._history)} customers"
+            )
+
+    def _ensure_loaded(self) -> None:
+        if not self._loaded:
+            self.load()
+
+    def _add_product(self, product_id: int, category: str) -> None:
+        self._category_of[product_id] = category
+        self._category_products[category].add(product_id)
+
+    def _apply_order(self, customer_id: Any, items: Sequence[Tuple[int, int]]) -> None:
+        """Folds one order into the matrix, popularity and customer profile."""
+        customer_key = str(customer_id)
+        product_ids = sorted({product_id for product_id, _ in items})
+
+        for product_id in product_ids:
+            self._order_counts[product_id] += 1
+        for i, a in enumerate(product_ids):
+            for b in product_ids[i + 1:]:
+                self._co_counts[a][b] = self._co_counts[a].get(b, 0.0) + 1.0
+                self._co_counts[b][a] = self._co_counts[b].get(a, 0.0) + 1.0
+        self._dirty_rows.update(product_ids)
+
+        for product_id, quantity in items:
+            self._popularity[product_id] += quantity
+            self._top_by_category.pop(self._category_of.get(product_id), None)
+        self._top_overall = None
+
+        history = self._history.setdefault(customer_key, deque(maxlen=self.history_size))
+        affinity = self._affinity[customer_key]
+        for category in affinity:
+            affinity[category] *= self.affinity_decay
+        for product_id in product_ids:
+            if product_id in history:
+                history.remove(product_id)
+            history.append(product_id)
+            category = self._category_of.get(product_id)
+            if category is not None:
+                affinity[category] = affinity.get(category, 0.0) + 1.0
+
+    def record_order(self, customer_id: Any, order: Dict[str, Any]) -> None:
+        """
+        Updates the model with a newly created order.
+
+        Args:
+            customer_id: The customer who placed the order
+            order (Dict[str, Any]): Successful create_order result
+        """
+        with self._lock:
+            # An unloaded model will pick the order up when it loads
+            if not self._loaded:
+                return
+            # Orders committed while the model was loading were already read
+            order_id = order.get("order_id")
+            if order_id is not None and int(order_id) <= self._loaded_order_id:
+                return
+            items = [
+                (int(product["product_id"]), product["quantity"])
+                for product in order.get("products", [])
+                if product.get("product_id")
+            ]
+            unknown = [pid for pid, _ in items if pid not in self._category_of]
+            if unknown:
+                self._load_categories(unknown)
+            if items:
+                self._apply_order(customer_id, items)
+
+    def _load_categories(self, product_ids: List[int]) -> None:
+        placeholders = ",".join("?" * len(product_ids))
+        with self.db_manager.get_connection() as conn:
+            rows = conn.execute(
+                f"SELECT ProductId, Category FROM products WHERE ProductId IN ({placeholders})",
+                product_ids,
+            ).fetchall()
+        for row in rows:
+            self._add_product(row["ProductId"], row["Category"])
+
+    def _row(self, product_id: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns a product's strongest neighbours as (ids, weights) arrays."""
+        if product_id in self._dirty_rows or product_id not in self._neighbors:
+            counts = self._co_counts.get(product_id)
+            if not counts:
+                self._neighbors[product_id] = _EMPTY
+            else:
+                ids = np.fromiter(counts.keys(), dtype=np.int64, count=len(counts))
+                co = np.fromiter(counts.values(), dtype=np.float32, count=len(counts))
+                norms = np.fromiter(
+                    (self._order_counts[i] for i in counts), dtype=np.float32, count=len(counts)
+                )
+                # Cosine similarity between the two products' order vectors
+                weights = co / np.sqrt(norms * self._order_counts[product_id])
+                ids, weights = self._top(ids, weights, self.neighbors_per_product)
+                self._neighbors[product_id] = (ids, weights)
+            self._dirty_rows.discard(product_id)
+        return self._neighbors[product_id]
+
+    @staticmethod
+    def _top(ids: np.ndarray, scores: np.ndarray, n: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Returns the n highest-scoring ids, best first."""
+        if len(ids) > n:
+            keep = np.argpartition(-scores, n)[:n]
+            ids, scores = ids[keep], scores[keep]
+        order = np.argsort(-scores, kind="stable")
+        return ids[order], scores[order]
+
+    def _popular(self, product_ids: Iterable[int], n: int) -> np.ndarray:
+        product_ids = list(product_ids)
+        if not product_ids:
+            return _EMPTY[0]
+        ids = np.asarray(product_ids, dtype=np.int64)
+        scores = np.fromiter(
+            (self._popularity.get(i, 0.0) for i in product_ids), dtype=np.float32, count=len(ids)
+        )
+        return self._top(ids, scores, n)[0]
+
+    def _candidates(self, customer_id: str, k: int) -> List[int]:
+        """Ranks candidate product ids for a customer, best first."""
+        history = list(self._history.get(customer_id, ()))
+        pool = max(k * 4, self.neighbors_per_product)
+
+        ids_parts, score_parts = [], []
+
+        # Co-purchases of recent items, most recent purchases weigh more
+        for age, product_id in enumerate(reversed(history)):
+            ids, weights = self._row(product_id)
+            if len(ids):
+                ids_parts.append(ids)
+                score_parts.append(weights * (self.affinity_decay ** age))
+
+        # Popular products from the customer's favourite categories
+        affinity = self._affinity.get(customer_id, {})
+        if affinity:
+            total = sum(affinity.values())
+            for category, score in sorted(affinity.items(), key=lambda kv: -kv[1])[:3]:
+                top = self._top_by_category.get(category)
+                if top is None:
+                    top = self._popular(self._category_products.get(category, ()), pool)
+                    self._top_by_category[category] = top
+                if len(top):
+                    rank_scores = 1.0 / (1.0 + np.arange(len(top), dtype=np.float32))
+                    ids_parts.append(top)
+                    score_parts.append(rank_scores * self.affinity_weight * score / total)
+
+        if not ids_parts:
+            if self._top_overall is None:
+                self._top_overall = self._popular(self._popularity.keys(), pool)
+            return self._top_overall.tolist()
+
+        ids = np.concatenate(ids_parts)
+        scores = np.concatenate(score_parts)
+        unique_ids, inverse = np.unique(ids, return_inverse=True)
+        totals = np.bincount(inverse, weights=scores).astype(np.float32)
+
+        # Don't recommend what the customer just bought
+        if history:
+            fresh = ~np.isin(unique_ids, np.asarray(history, dtype=np.int64))
+            unique_ids, totals = unique_ids[fresh], totals[fresh]
+
+        return self._top(unique_ids, totals, pool)[0].tolist()
+
+    def recommend(self, customer_id: Any, k: int = 5) -> List[Dict[str, Any]]:
+        """
+        Returns up to k ranked, in-stock product rows for a customer.
+
+        Args:
+            customer_id: The customer to recommend for
+            k (int): Number of recommendations
+
+        Returns:
+            List[Dict[str, Any]]: Product rows, best recommendation first.
+        """
+        with self._lock:
+            self._ensure_loaded()
+            candidates = self._candidates(str(customer_id), k)
+            history = list(self._history.get(str(customer_id), ()))
+
+        columns = "ProductId, ProductName, Category, Description, Price, Quantity, ImageUrl"
+        with self.db_manager.get_connection() as conn:
+            cursor = conn.cursor()
+            rows = []
+            if candidates:
+                placeholders = ",".join("?" * len(candidates))
+                cursor.execute(
+                    f"""SELECT {columns} FROM products
+                        WHERE ProductId IN ({placeholders}) AND Quantity > 0""",
+                    candidates,
+                )
+                by_id = {row["ProductId"]: row for row in cursor.fetchall()}
+                rows = [by_id[i] for i in candidates if i in by_id][:k]
+
+            # Top up with other in-stock products (cold start)
+            if len(rows) < k:
+                excluded = [row["ProductId"] for row in rows] + history
+                query = f"SELECT {columns} FROM products WHERE Quantity > 0"
+                if excluded:
+                    query += f" AND ProductId NOT IN ({','.join('?' * len(excluded))})"
+                cursor.execute(query + " LIMIT ?", [*excluded, k - len(rows)])
+                rows.extend(cursor.fetchall())
+
+        return [dict(row) for row in rows]
+
+    def stats(self) -> Dict[str, Any]:
+        """Returns the size of the in-memory model."""
+        with self._lock:
+            return {
+                "loaded": self._loaded,
+                "products": len(self._category_of),
+                "customers": len(self._history),
+                "matrix_nonzeros": sum(len(row) for row in self._co_counts.values()),
+            }
@@ -0,0 +1,151 @@
+"""Markdown rendering of tool results that can be shown without the LLM."""
+import json
+import logging
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, AnyMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig
+
+logger = logging.getLogger(__name__)
+
+# A renderer turns a tool result into Markdown, or returns None when the
+# result needs the assistant (errors, unexpected shapes)
+Renderer = Callable[[Dict[str, Any]], Optional[str]]
+
+
+def _money(amount: Any) -> str:
+    return f"${float(amount):,.2f}"
+
+
+def _date(value: Any) -> str:
+    # OrderDate is an ISO timestamp; seconds and fractions are noise here
+    return str(value or "").replace("T", " ")[:16]
+
+
+def render_order_status(result: Dict[str, Any]) -> Optional[str]:
+    """Renders a single order or a page of the customer's orders."""
+    if result.get("status") != "success":
+        return None
+
+    if "orders" not in result:
+        return "\n".join(
+            [
+                f"**Order #{result['order_id']}**",
+                "",
+                f"- **Status:** {result['order_status']}",
+                f"- **Date:** {_date(result['order_date'])}",
+                f"- **Products:** {result['products']}",
+                f"- **Total:** {_money(result['total_amount'])}",
+            ]
+        )
+
+    orders = result["orders"]
+    if not orders:
+        return "I couldn't find any orders for your account."
+    lines = [
+        "Here are your orders, newest first:",
+        "",
+        "| Order | Date | Status | Items | Total |",
+        "|---|---|---|---|---|",
+    ]
+    lines.extend(
+        f"| #{order['order_id']} | {_date(order['order_date'])} | {order['status']} "
+        f"| {order['item_count']} | {_money(order['total_amount'])} |"
+        for order in orders
+    )
+    lines.append("")
+    if result.get("has_more"):
+        lines.append("You have older orders too; just ask and I'll show them.")
+    else:
+        lines.append("Give me an order number for the full details of an order.")
+    return "\n".join(lines)
+
+
+def render_categories(result: Dict[str, Any]) -> Optional[str]:
+    """Renders the list of available product categories."""
+    categories = result.get("categories")
+    if not categories:
+        return None
+    lines = ["These are the product categories we currently have in stock:", ""]
+    lines.extend(f"- {category.title()}" for category in sorted(categories))
+    lines.extend(["", "Which one would you like to explore?"])
+    return "\n".join(lines)
+
+
+# Tools whose results are shown to the customer as-is
+DIRECT_RESPONSES: Dict[str, Renderer] = {
+    "check_order_status": render_order_status,
+    "get_available_categories": render_categories,
+}
+
+
+def _parse(message: ToolMessage) -> Optional[Dict[str, Any]]:
+    if message.status == "error" or not isinstance(message.content, str):
+        return None
+    try:
+        result = json.loads(message.content)
+    except ValueError:
+        return None
+    return result if isinstance(result, dict) else None
+
+
+def tool_results(messages: Sequence[AnyMessage]) -> List[ToolMessage]:
+    """Returns the tool results that follow the last assistant message."""
+    results = []
+    for message in reversed(messages):
+        if not isinstance(message, ToolMessage):
+            break
+        results.append(message)
+    return results[::-1]
+
+
+class DirectResponder:
+    """
+    Shows tool results to the customer without a second LLM call.
+
+    After the safe tools ran, the results are rendered with the tool's
+    Markdown template and the turn ends. If any result of the turn has no
+    template or cannot be rendered, nothing is produced and the assistant
+    writes the reply as usual.
+    """
+
+    def __init__(self, renderers: Optional[Dict[str, Renderer]] = None):
+        """
+        Initialize the responder.
+
+        Args:
+            renderers (Dict[str, Renderer], optional): Renderer per tool name
+        """
+        self.renderers = renderers if renderers is not None else DIRECT_RESPONSES
+
+    def render(self, messages: Sequence[AnyMessage]) -> Optional[AIMessage]:
+        """Renders the latest tool results, or returns None."""
+        results = tool_results(messages)
+        if not results:
+            return None
+        parts = []
+        for message in results:
+            renderer = self.renderers.get(message.name)
+            result = _parse(message)
+            if renderer is None or result is None:
+                return None
+            try:
+                text = renderer(result)
+            except (KeyError, TypeError, ValueError) as e:
+                logger.warning(f"Could not render {message.name} result: {e}")
+                return None
+            if text is None:
+                return None
+            parts.append(text)
+        return AIMessage(
+            content="\n\n".join(parts),
+            response_metadata={"direct_response": [m.name for m in results]},
+        )
+
+    def __call__(self, state: Dict[str, Any], config: RunnableConfig) -> Optional[Dict[str, Any]]:
+        reply = self.render(state["messages"])
+        return {"messages": reply} if reply is not None else None
+
+    async def acall(self, state: Dict[str, Any], config: RunnableConfig) -> Optional[Dict[str, Any]]:
+        """Async version of __call__; rendering never blocks."""
+        return self(state, config)
@@ -0,0 +1,239 @@
+"""Typo-tolerant query correction over the product search vocabulary."""
+import bisect
+import logging
+import sqlite3
+import threading
+from collections import defaultdict
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def damerau_levenshtein(a: str, b: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance, with an early exit.
+
+    Returns:
+        int: The distance, or max_distance + 1 if it exceeds max_distance.
+    """
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+    previous_previous: List[int] = []
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous_previous[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous_previous, previous = previous, current
+    return previous[-1] if previous[-1] <= max_distance else max_distance + 1
+
+
+class SpellingIndex:
+    """
+    SymSpell-style deletion dictionary over a term vocabulary.
+
+    Every term is indexed under all strings obtained by deleting up to
+    `max_distance` characters from its first `prefix_length` characters. A
+    lookup generates the same deletions for the query word, so candidates
+    are found with a handful of dictionary probes instead of comparing
+    against the whole vocabulary; only those candidates are verified with
+    an edit distance. Terms can be added and removed incrementally.
+    """
+
+    def __init__(self, max_distance: int = 2, prefix_length: int = 7, min_length: int = 3):
+        """
+        Initialize the index.
+
+        Args:
+            max_distance (int): Maximum edit distance of a correction
+            prefix_length (int): Characters of each term used for deletions
+            min_length (int): Shorter words are never corrected
+        """
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.min_length = min_length
+
+        self._frequency: Dict[str, int] = {}
+        self._deletes: Dict[str, Set[str]] = defaultdict(set)
+        self._sorted_terms: Optional[List[str]] = None
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._frequency)
+
+    def __contains__(self, term: str) -> bool:
+        return term in self._frequency
+
+    def _edits(self, word: str) -> Set[str]:
+        """All strings within max_distance deletions of the word's prefix."""
+        word = word[: self.prefix_length]
+        edits = {word}
+        frontier = {word}
+        for _ in range(self.max_distance):
+            frontier = {
+                candidate[:i] + candidate[i + 1:]
+                for candidate in frontier
+                if len(candidate) > 1
+                for i in range(len(candidate))
+            }
+            edits |= frontier
+        return edits
+
+    def add(self, term: str, frequency: int = 1) -> None:
+        """Adds a term, or updates its frequency if it is already indexed."""
+        with self._lock:
+            if term not in self._frequency:
+                for edit in self._edits(term):
+                    self._deletes[edit].add(term)
+                self._sorted_terms = None
+            self._frequency[term] = frequency
+
+    def remove(self, term: str) -> None:
+        with self._lock:
+            if self._frequency.pop(term, None) is None:
+                return
+            for edit in self._edits(term):
+                terms = self._deletes.get(edit)
+                if terms is not None:
+                    terms.discard(term)
+                    if not terms:
+                        del self._deletes[edit]
+            self._sorted_terms = None
+
+    def update(self, vocabulary: Dict[str, int]) -> Tuple[int, int]:
+        """
+        Syncs the index with a full vocabulary, touching only changed terms.
+
+        Args:
+            vocabulary (Dict[str, int]): Term to document frequency
+
+        Returns:
+            Tuple[int, int]: Number of terms added and removed.
+        """
+        with self._lock:
+            removed = [term for term in self._frequency if term not in vocabulary]
+            for term in removed:
+                self.remove(term)
+            added = 0
+            for term, frequency in vocabulary.items():
+                if term not in self._frequency:
+                    added += 1
+                self.add(term, frequency)
+            return added, len(removed)
+
+    def is_prefix(self, word: str) -> bool:
+        """Whether the word is a known term or the prefix of one."""
+        with self._lock:
+            if self._sorted_terms is None:
+                self._sorted_terms = sorted(self._frequency)
+            terms = self._sorted_terms
+        i = bisect.bisect_left(terms, word)
+        return i < len(terms) and terms[i].startswith(word)
+
+    def suggest(self, word: str) -> List[Tuple[str, int]]:
+        """
+        Returns known terms closest to a word.
+
+        Args:
+            word (str): A lowercase word
+
+        Returns:
+            List[Tuple[str, int]]: (term, distance) pairs at the smallest
+            distance found, most frequent first; empty if none is within
+            max_distance.
+        """
+        if word in self._frequency:
+            return [(word, 0)]
+        max_distance = self.max_distance if len(word) > 4 else 1
+        with self._lock:
+            candidates = set()
+            for edit in self._edits(word):
+                candidates.update(self._deletes.get(edit, ()))
+            scored = []
+            for term in candidates:
+                distance = damerau_levenshtein(word, term, max_distance)
+                if distance <= max_distance:
+                    scored.append((distance, -self._frequency.get(term, 0), term))
+        if not scored:
+            return []
+        best = min(distance for distance, _, _ in scored)
+        return [(term, distance) for distance, _, term in sorted(scored) if distance == best]
+
+    def correct(self, words: Iterable[str], max_expansions: int = 2) -> Dict[str, List[str]]:
+        """
+        Finds corrections for the words that match nothing in the vocabulary.
+
+        Words that are known terms, or prefixes of one, are left alone since
+        the full-text search already matches them as prefixes.
+
+        Args:
+            words (Iterable[str]): Lowercase query words
+            max_expansions (int): Maximum corrections per word
+
+        Returns:
+            Dict[str, List[str]]: Misspelled word to its corrections.
+        """
+        corrections = {}
+        for word in words:
+            if len(word) < self.min_length or word.isdigit() or self.is_prefix(word):
+                continue
+            suggestions = self.suggest(word)[:max_expansions]
+            if suggestions:
+                corrections[word] = [term for term, _ in suggestions]
+        return corrections
+
+
+class VocabularySpeller:
+    """
+    Keeps a SpellingIndex in sync with the products full-text vocabulary.
+
+    The vocabulary is re-read from the products_vocab table only when the
+    catalog's TextVersion changes, and only new or removed terms are
+    re-indexed.
+    """
+
+    def __init__(self, db_manager: Any, **index_options: Any):
+        self.db_manager = db_manager
+        self.index = SpellingIndex(**index_options)
+        self._version: Optional[int] = None
+        self._lock = threading.Lock()
+
+    def refresh(self, conn: Any) -> bool:
+        """
+        Reloads changed terms if the searchable text changed.
+
+        Args:
+            conn: Open database connection
+
+        Returns:
+            bool: False if the database has no vocabulary table.
+        """
+        try:
+            row = conn.execute("SELECT TextVersion FROM catalog_version WHERE Id = 1").fetchone()
+        except sqlite3.OperationalError:
+            return False
+        version = row[0] if row else None
+        if version == self._version:
+            return True
+        with self._lock:
+            if version != self._version:
+                vocabulary = {
+                    term: doc
+                    for term, doc in conn.execute("SELECT term, doc FROM products_vocab")
+                    if not term.isdigit()
+                }
+                added, removed = self.index.update(vocabulary)
+                self._version = version
+                logger.debug(f"Spelling vocabulary refreshed: +{added} -{removed} terms")
+        return True
+
+    def correct(self, conn: Any, words: Iterable[str]) -> Dict[str, List[str]]:
+        """Returns corrections for misspelled words, or {} without a vocabulary."""
+        if not self.refresh(conn):
+            return {}
+        return self.index.correct(words)
@@ -1,22 +1,242 @@
-import csv
-import os
+import functools
 import re
-from datetime import datetime
-from decimal import Decimal
-from typing import Any, Dict, List, Optional, Union
+import sqlite3
+import threading
+from datetime import datetime, timedelta
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
 
 from langchain_core.runnables import RunnableConfig
-from langchain_core.tools import tool
+from langchain_core.tools import BaseTool, tool
 
-from database.db_manager import DatabaseManager
+from virtual_sales_agent.cache import ResultCache, cached_tool
+from virtual_sales_agent.payloads import PayloadCompactor, Projection
+from virtual_sales_agent.spelling import VocabularySpeller
 
-db_manager = DatabaseManager()
+if TYPE_CHECKING:
+    from database.db_manager import DatabaseManager
+    from database.order_writer import OrderWriter
+    from database.support_requests import SupportRequestWriter
+    from virtual_sales_agent.recommender import RecommendationEngine
 
+# Shared services, created on first use so importing the tools stays cheap
+# and never touches the database. Tests and benchmarks may assign them.
+db_manager: Optional["DatabaseManager"] = None
+order_writer: Optional["OrderWriter"] = None
+support_writer: Optional["SupportRequestWriter"] = None
+recommender: Optional["RecommendationEngine"] = None
+_init_lock = threading.RLock()
 
+
+def get_db_manager() -> "DatabaseManager":
+    """Returns the shared database manager, migrating the database on first use."""
+    global db_manager
+    if db_manager is None:
+        with _init_lock:
+            if db_manager is None:
+                from database.db_manager import DatabaseManager
+
+                manager = DatabaseManager()
+                manager.run_migrations()
+                db_manager = manager
+    return db_manager
+
+
+def get_order_writer() -> "OrderWriter":
+    """Returns the shared group-commit order writer."""
+    global order_writer
+    if order_writer is None:
+        with _init_lock:
+            if order_writer is None:
+                from database.order_writer import OrderWriter
+
+                order_writer = OrderWriter(get_db_manager())
+    return order_writer
+
+
+def get_support_writer() -> "SupportRequestWriter":
+    """Returns the shared group-commit support request writer."""
+    global support_writer
+    if support_writer is None:
+        with _init_lock:
+            if support_writer is None:
+                from database.support_requests import SupportRequestWriter
+
+                support_writer = SupportRequestWriter(get_db_manager())
+    return support_writer
+
+
+def get_recommender() -> "RecommendationEngine":
+    """Returns the shared recommendation engine."""
+    global recommender
+    if recommender is None:
+        with _init_lock:
+            if recommender is None:
+                from virtual_sales_agent.recommender import RecommendationEngine
+
+                recommender = RecommendationEngine(get_db_manager())
+    return recommender
+
+
+# Spelling correctors over the search vocabulary, one per database
+_spellers: Dict[str, VocabularySpeller] = {}
+
+
+def get_speller() -> VocabularySpeller:
+    """Returns the spelling corrector for the shared database."""
+    manager = get_db_manager()
+    speller = _spellers.get(manager.config.db_path)
+    if speller is None:
+        with _init_lock:
+            speller = _spellers.setdefault(manager.config.db_path, VocabularySpeller(manager))
+    return speller
+
+
+# Results of the read-only catalog tools, shared by all sessions in this
+# process and invalidated whenever the catalog version changes
+result_cache = ResultCache(max_entries=1024, ttl_seconds=300.0)
+
+
+def catalog_version() -> Tuple[str, Optional[int]]:
+    """
+    Returns the database path and its current catalog version.
+
+    The version is maintained by triggers on products, so it changes with
+    every product or stock update made by any process sharing the database.
+    It is None (caching disabled) if the database has not been migrated.
+    """
+    manager = get_db_manager()
+    try:
+        with manager.get_connection() as conn:
+            row = conn.execute("SELECT Version FROM catalog_version WHERE Id = 1").fetchone()
+    except sqlite3.OperationalError:
+        row = None
+    return manager.config.db_path, row[0] if row else None
+
+
+cached_catalog_read = cached_tool(result_cache, catalog_version)
+
+# Product results are re-sent to the model on every later turn, so the tool
+# node sends only the best few, with the fields the assistant needs (it
+# shows the images) and short descriptions, as a compact table
+PRODUCT_FIELDS = ("name", "category", "price", "stock", "image_url", "description")
+tool_payloads = PayloadCompactor(
+    {
+        "search_products": Projection(
+            "products",
+            PRODUCT_FIELDS,
+            max_items=8,
+            text_limits={"description": 120},
+            keep_metadata=("corrected_query", "search_mode"),
+        ),
+        "search_products_recommendations": Projection(
+            "recommendations",
+            PRODUCT_FIELDS,
+            max_items=5,
+            text_limits={"description": 120},
+        ),
+    }
+)
+
+# Column weights for bm25() over products_fts (ProductName, Description, Category)
+SEARCH_RANK_WEIGHTS = (10.0, 1.0, 5.0)
+
+SEARCH_MODES = ("keyword", "semantic", "hybrid")
+
+# Semantic hits fused into hybrid results must score at least this cosine
+# similarity, and this share of the best hit's score; weaker neighbours
+# share only generic words with the query
+SEMANTIC_MIN_SCORE = 0.05
+SEMANTIC_MIN_RELATIVE_SCORE = 0.5
+
+
+def _build_match_query(query: str) -> Optional[str]:
+    """
+    Builds an FTS5 MATCH expression from a free-text query.
+
+    Each word becomes a quoted prefix term and the terms are OR-ed together,
+    so any matching word is enough and bm25 ranks rows matching more of them
+    higher.
+    """
+    terms = re.findall(r"\w+", query.lower())
+    if not terms:
+        return None
+    return " OR ".join(f'"{term}"*' for term in terms)
+
+
+def _keyword_search(
+    cursor: sqlite3.Cursor, match_query: str, where: str, params: List[Any], limit: int
+) -> List[sqlite3.Row]:
+    """Full-text search, ranked by bm25 (lower is better)."""
+    weights = ", ".join(str(w) for w in SEARCH_RANK_WEIGHTS)
+    cursor.execute(
+        f"""SELECT p.* FROM products_fts
+            JOIN products p ON p.ProductId = products_fts.rowid
+            WHERE products_fts MATCH ? AND {where}
+            ORDER BY bm25(products_fts, {weights})
+            LIMIT ?""",
+        [match_query] + params + [limit],
+    )
+    return cursor.fetchall()
+
+
+def _semantic_search(
+    cursor: sqlite3.Cursor,
+    index: Any,
+    query: str,
+    where: str,
+    params: List[Any],
+    limit: int,
+    min_score: float = 0.0,
+    min_relative_score: float = 0.0,
+) -> List[sqlite3.Row]:
+    """Top-k cosine search over the vector index, filtered in SQL."""
+    # Over-fetch so the stock and price filters still leave enough results
+    hits = index.search(query, k=max(limit * 4, 100))
+    if hits:
+        floor = max(min_score, hits[0][1] * min_relative_score)
+        hits = [(product_id, score) for product_id, score in hits if score >= floor]
+    ranked = [product_id for product_id, _ in hits]
+    if not ranked:
+        return []
+    placeholders = ",".join("?" * len(ranked))
+    cursor.execute(
+        f"SELECT p.* FROM products p WHERE p.ProductId IN ({placeholders}) AND {where}",
+        ranked + params,
+    )
+    rows = {row["ProductId"]: row for row in cursor.fetchall()}
+    return [rows[product_id] for product_id in ranked if product_id in rows][:limit]
+
+
+def _get_vector_index() -> Any:
+    """Returns the product vector index of the shared database, if it was built."""
+    from virtual_sales_agent.embeddings import get_index
+
+    return get_index(get_db_manager().config.db_path)
+
+
+def offload_to_db(db_tool: BaseTool) -> BaseTool:
+    """
+    Gives a synchronous tool an async variant.
+
+    The tool body runs on the database executor, so awaiting the tool
+    (ainvoke) never blocks the event loop on sqlite3.
+    """
+    func = db_tool.func
+
+    @functools.wraps(func)
+    async def coroutine(*args, **kwargs):
+        return await get_db_manager().run_in_executor(func, *args, **kwargs)
+
+    db_tool.coroutine = coroutine
+    return db_tool
+
+
+@offload_to_db
+@cached_catalog_read
 @tool
 def get_available_categories() -> Dict[str, List[str]]:
     """Returns a list of available product categories."""
-    with db_manager.get_connection() as conn:
+    with get_db_manager().get_connection() as conn:
         cursor = conn.cursor()
         cursor.execute(
             """
@@ -29,21 +249,29 @@ def get_available_categories() -> Dict[str, List[str]]:
         return {"categories": [category["Category"] for category in categories]}
 
 
+@offload_to_db
+@cached_catalog_read
 @tool
 def search_products(
     query: Optional[str] = None,
     category: Optional[str] = None,
     min_price: Optional[float] = None,
     max_price: Optional[float] = None,
+    limit: int = 20,
+    mode: str = "hybrid",
 ) -> Dict[str, Any]:
     """
     Searches for products based on various criteria.
 
     Arguments:
-        query (Optional[str]): Search term for product name or description
+        query (Optional[str]): Search term for product name, description or category
         category (Optional[str]): Filter by product category
         min_price (Optional[float]): Minimum price filter
         max_price (Optional[float]): Maximum price filter
+        limit (int): Maximum number of products to return, best matches first
+        mode (str): How the query is matched: "keyword" (words in the name,
+            description or category), "semantic" (similar meaning, e.g.
+            "something to stream with" finds webcams) or "hybrid" (both)
 
     Returns:
         Dict[str, Any]: Search results with products and metadata
@@ -51,70 +279,112 @@ def search_products(
     Example:
         search_products(query="keyboard", category="gaming", max_price=200.00)
     """
-    with db_manager.get_connection() as conn:
+    if mode not in SEARCH_MODES:
+        raise ValueError(f"mode must be one of {', '.join(SEARCH_MODES)}")
+    limit = max(1, int(limit))
+
+    with get_db_manager().get_connection() as conn:
         cursor = conn.cursor()
 
-        query_parts = ["SELECT * FROM products WHERE Quantity > 0"]
+        filters = ["p.Quantity > 0"]
         params = []
 
-        if query:
-            # Split the query into individual terms for better matching
-            search_terms = query.lower().split()
-            if search_terms:
-                search_conditions = []
-                for term in search_terms:
-                    search_term = f"%{term}%"
-                    search_conditions.append("(LOWER(ProductName) LIKE ? OR LOWER(Description) LIKE ?)")
-                    params.extend([search_term, search_term])
-                
-                query_parts.append(f"AND ({' OR '.join(search_conditions)})")
-
         if category:
             # Make category matching more flexible
             if not category.lower().endswith('s') and not category.lower().endswith('es'):
                 # Handle both singular and plural forms
-                query_parts.append("AND (LOWER(Category) LIKE ? OR LOWER(Category) LIKE ?)")
+                filters.append("(LOWER(p.Category) LIKE ? OR LOWER(p.Category) LIKE ?)")
                 params.extend([f"%{category.lower()}%", f"%{category.lower()}s%"])
             else:
-                query_parts.append("AND LOWER(Category) LIKE ?")
+                filters.append("LOWER(p.Category) LIKE ?")
                 params.append(f"%{category.lower()}%")
 
         if min_price is not None:
-            query_parts.append("AND Price >= ?")
+            filters.append("p.Price >= ?")
             params.append(min_price)
 
         if max_price is not None:
-            query_parts.append("AND Price <= ?")
+            filters.append("p.Price <= ?")
             params.append(max_price)
 
-        # Execute search query
-        cursor.execute(" ".join(query_parts), params)
-        products = cursor.fetchall()
+        where = " AND ".join(filters)
 
-        # Get available categories for metadata
+        # Correct misspelled words in-process; the keyword search also
+        # matches the original words, the semantic search the corrected text
+        corrections = {}
+        if query:
+            words = re.findall(r"\w+", query.lower())
+            corrections = get_speller().correct(conn, words)
+            if corrections:
+                expansions = [term for terms in corrections.values() for term in terms]
+                query = " ".join(corrections.get(word, [word])[0] for word in words)
+                match_query = _build_match_query(" ".join(words + expansions))
+            else:
+                match_query = _build_match_query(query)
+        else:
+            match_query = None
+        index = _get_vector_index() if match_query and mode != "keyword" else None
+
+        if not match_query:
+            search_mode = "browse"
+            cursor.execute(
+                f"SELECT p.* FROM products p WHERE {where} ORDER BY p.ProductId LIMIT ?",
+                params + [limit],
+            )
+            products = cursor.fetchall()
+        elif index is None:
+            # Without a vector index every mode falls back to keyword search
+            search_mode = "keyword"
+            products = _keyword_search(cursor, match_query, where, params, limit)
+        elif mode == "semantic":
+            search_mode = "semantic"
+            products = _semantic_search(cursor, index, query, where, params, limit)
+        else:
+            # Fuse both rankings; candidates beyond the limit let an item
+            # ranked well by one method surface in the fused top results
+            from virtual_sales_agent.embeddings import reciprocal_rank_fusion
+
+            search_mode = "hybrid"
+            candidates = max(limit * 5, 50)
+            keyword = _keyword_search(cursor, match_query, where, params, candidates)
+            semantic = _semantic_search(
+                cursor,
+                index,
+                query,
+                where,
+                params,
+                candidates,
+                min_score=SEMANTIC_MIN_SCORE,
+                min_relative_score=SEMANTIC_MIN_RELATIVE_SCORE,
+            )
+            by_id = {row["ProductId"]: row for row in keyword + semantic}
+            ranked = reciprocal_rank_fusion(
+                [[row["ProductId"] for row in keyword], [row["ProductId"] for row in semantic]]
+            )
+            products = [by_id[product_id] for product_id in ranked[:limit]]
+
+        # Catalog metadata comes from the trigger-maintained summary tables
         cursor.execute(
             """
-            SELECT DISTINCT Category, COUNT(*) as count 
-            FROM products 
-            WHERE Quantity > 0 
-            GROUP BY Category
+            SELECT Category, ProductCount
+            FROM category_stats
+            WHERE ProductCount > 0
+            ORDER BY Category
         """
         )
         categories = cursor.fetchall()
 
-        # Get price range for metadata
         cursor.execute(
             """
-            SELECT 
-                MIN(Price) as min_price,
-                MAX(Price) as max_price,
-                AVG(Price) as avg_price
-            FROM products
-            WHERE Quantity > 0
+            SELECT ProductCount, PriceSum, MinPrice, MaxPrice
+            FROM catalog_stats
+            WHERE Id = 1
         """
         )
         price_stats = cursor.fetchone()
+        in_stock_count = price_stats["ProductCount"] if price_stats else 0
 
+        metadata = {"corrected_query": query} if corrections else {}
         return {
             "status": "success",
             "products": [
@@ -130,15 +400,19 @@ def search_products(
                 for product in products
             ],
             "metadata": {
+                **metadata,
                 "total_results": len(products),
+                "search_mode": search_mode,
                 "categories": [
-                    {"name": cat["Category"], "product_count": cat["count"]}
+                    {"name": cat["Category"], "product_count": cat["ProductCount"]}
                     for cat in categories
                 ],
                 "price_range": {
-                    "min": float(price_stats["min_price"]),
-                    "max": float(price_stats["max_price"]),
-                    "average": round(float(price_stats["avg_price"]), 2),
+                    "min": float(price_stats["MinPrice"]) if in_stock_count else 0.0,
+                    "max": float(price_stats["MaxPrice"]) if in_stock_count else 0.0,
+                    "average": round(price_stats["PriceSum"] / in_stock_count, 2)
+                    if in_stock_count
+                    else 0.0,
                 },
             },
         }
@@ -165,92 +439,87 @@ def create_order(
     if not customer_id:
         return ValueError("No customer ID configured.")
 
-    with db_manager.get_connection() as conn:
-        cursor = conn.cursor()
-        try:
-            # Start transaction
-            cursor.execute("BEGIN TRANSACTION")
+    # Orders from all sessions are committed in micro-batches by the writer
+    try:
+        result = get_order_writer().create_order(customer_id, products)
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": str(e),
+            "customer_id": str(customer_id),
+        }
 
-            # Create order
-            cursor.execute(
-                """INSERT INTO orders (CustomerId, OrderDate, Status) 
-                   VALUES (?, ?, ?)""",
-                (customer_id, datetime.now().isoformat(), "Pending"),
-            )
-            order_id = cursor.lastrowid
-
-            total_amount = Decimal("0")
-            ordered_products = []
-
-            # Process each product
-            for item in products:
-                product_name = item["ProductName"]
-                quantity = item["Quantity"]
-
-                # Get product details
-                cursor.execute(
-                    "SELECT ProductId, Price, Quantity FROM products WHERE LOWER(ProductName) = LOWER(?)",
-                    (product_name,),
-                )
-                product = cursor.fetchone()
-
-                if not product:
-                    raise ValueError(f"Product not found: {product_name}")
-
-                if product["Quantity"] < quantity:
-                    raise ValueError(f"Insufficient stock for {product_name}")
-
-                # Add order detail
-                cursor.execute(
-                    """INSERT INTO orders_details (OrderId, ProductId, Quantity, UnitPrice) 
-                       VALUES (?, ?, ?, ?)""",
-                    (order_id, product["ProductId"], quantity, product["Price"]),
-                )
-
-                # Update inventory
-                cursor.execute(
-                    "UPDATE products SET Quantity = Quantity - ? WHERE ProductId = ?",
-                    (quantity, product["ProductId"]),
-                )
-
-                total_amount += Decimal(str(product["Price"])) * Decimal(str(quantity))
-                ordered_products.append(
-                    {
-                        "name": product_name,
-                        "quantity": quantity,
-                        "unit_price": float(product["Price"]),
-                    }
-                )
+    get_recommender().record_order(customer_id, result)
+    return result
 
-            cursor.execute("COMMIT")
 
-            return {
-                "order_id": str(order_id),
-                "status": "success",
-                "message": "Order created successfully",
-                "total_amount": float(total_amount),
-                "products": ordered_products,
-                "customer_id": str(customer_id),
-            }
+async def _acreate_order(
+    products: List[Dict[str, Any]], *, config: RunnableConfig
+) -> Dict[str, str]:
+    """Async create_order: awaits the group commit instead of blocking a thread."""
+    configuration = config.get("configurable", {})
+    customer_id = configuration.get("customer_id", None)
 
-        except Exception as e:
-            cursor.execute("ROLLBACK")
-            return {
-                "status": "error",
-                "message": str(e),
-                "customer_id": str(customer_id),
-            }
+    if not customer_id:
+        return ValueError("No customer ID configured.")
 
+    try:
+        result = await get_order_writer().acreate_order(customer_id, products)
+    except Exception as e:
+        return {
+            "status": "error",
+            "message": str(e),
+            "customer_id": str(customer_id),
+        }
+
+    get_recommender().record_order(customer_id, result)
+    return result
+
+
+create_order.coroutine = _acreate_order
+
+
+def _date_bound(value: str, end: bool = False) -> Tuple[str, str]:
+    """
+    Converts an ISO date or datetime into an OrderDate comparison.
 
+    A date-only end bound includes that whole day.
+
+    Returns:
+        Tuple[str, str]: The SQL operator and the ISO value to compare with.
+
+    Raises:
+        ValueError: If the value is not an ISO date.
+    """
+    parsed = datetime.fromisoformat(value.strip())
+    date_only = len(value.strip()) == 10
+    if not end:
+        return ">=", parsed.isoformat()
+    if date_only:
+        return "<", (parsed + timedelta(days=1)).isoformat()
+    return "<=", parsed.isoformat()
+
+
+@offload_to_db
 @tool
 def check_order_status(
-    order_id: Union[str, None], *, config: RunnableConfig
+    order_id: Union[str, None],
+    limit: int = 10,
+    before_order_id: Optional[str] = None,
+    start_date: Optional[str] = None,
+    end_date: Optional[str] = None,
+    *,
+    config: RunnableConfig,
 ) -> Dict[str, Union[str, None]]:
     """
-    Checks the status of a specific order or all customer orders.
+    Checks the status of a specific order or lists the customer's orders.
 
     Arguments:
-        order_id (Union[str, None]): The ID of the order to check. If None, all customer orders will be returned.
+        order_id (Union[str, None]): The ID of the order to check. If None, the customer's orders are listed, newest first.
+        limit (int): Maximum number of orders to list (at most 100)
+        before_order_id (Optional[str]): List orders older than this one; pass next_before_order_id from the previous page
+        start_date (Optional[str]): Only list orders placed on or after this ISO date (YYYY-MM-DD)
+        end_date (Optional[str]): Only list orders placed on or before this ISO date (YYYY-MM-DD)
     """
     configuration = config.get("configurable", {})
     customer_id = configuration.get("customer_id", None)
@@ -258,7 +527,7 @@ def check_order_status(
     if not customer_id:
         raise ValueError("No customer ID configured.")
 
-    with db_manager.get_connection() as conn:
+    with get_db_manager().get_connection() as conn:
         cursor = conn.cursor()
 
         if order_id:
@@ -269,8 +538,9 @@ def check_order_status(
                     o.OrderId,
                     o.OrderDate,
                     o.Status,
-                    GROUP_CONCAT(p.ProductName || ' (x' || od.Quantity || ')') as Products,
-                    SUM(od.Quantity * od.UnitPrice) as TotalAmount
+                    -- Orders written outside write_order have no stored total
+                    COALESCE(o.TotalAmount, SUM(od.Quantity * od.UnitPrice)) AS TotalAmount,
+                    GROUP_CONCAT(p.ProductName || ' (x' || od.Quantity || ')') as Products
                 FROM orders o
                 JOIN orders_details od ON o.OrderId = od.OrderId
                 JOIN products p ON od.ProductId = p.ProductId
@@ -299,25 +569,60 @@ def check_order_status(
                 "customer_id": str(customer_id),
             }
         else:
-            # Query all customer orders
+            # Keyset pagination over the covering (CustomerId, OrderId, ...)
+            # index: newest first, resuming below the previous page's last id
+            conditions = ["CustomerId = ?"]
+            params: List[Any] = [customer_id]
+            try:
+                if before_order_id:
+                    conditions.append("OrderId < ?")
+                    params.append(int(before_order_id))
+                if start_date:
+                    operator, value = _date_bound(start_date)
+                    conditions.append(f"OrderDate {operator} ?")
+                    params.append(value)
+                if end_date:
+                    operator, value = _date_bound(end_date, end=True)
+                    conditions.append(f"OrderDate {operator} ?")
+                    params.append(value)
+            except ValueError as e:
+                return {
+                    "status": "error",
+                    "message": f"Invalid pagination or date filter: {e}",
+                    "customer_id": str(customer_id),
+                }
+
+            page_size = min(max(1, int(limit)), 100)
             cursor.execute(
-                """
-                SELECT 
-                    o.OrderId,
-                    o.OrderDate,
-                    o.Status,
-                    COUNT(od.OrderDetailId) as ItemCount,
-                    SUM(od.Quantity * od.UnitPrice) as TotalAmount
-                FROM orders o
-                JOIN orders_details od ON o.OrderId = od.OrderId
-                WHERE o.CustomerId = ?
-                GROUP BY o.OrderId
-                ORDER BY o.OrderDate DESC
+                f"""
+                SELECT
+                    OrderId,
+                    OrderDate,
+                    Status,
+                    -- Only orders written outside write_order lack the
+                    -- stored totals; COALESCE reads the details just for them
+                    COALESCE(
+                        ItemCount,
+                        (SELECT COUNT(*) FROM orders_details od WHERE od.OrderId = orders.OrderId)
+                    ) AS ItemCount,
+                    COALESCE(
+                        TotalAmount,
+                        (
+                            SELECT COALESCE(SUM(od.Quantity * od.UnitPrice), 0)
+                            FROM orders_details od WHERE od.OrderId = orders.OrderId
+                        )
+                    ) AS TotalAmount
+                FROM orders
+                WHERE {" AND ".join(conditions)}
+                ORDER BY OrderId DESC
+                LIMIT ?
             """,
-                (customer_id,),
+                params + [page_size + 1],
             )
 
             orders = cursor.fetchall()
+            has_more = len(orders) > page_size
+            orders = orders[:page_size]
             return {
                 "status": "success",
                 "customer_id": str(customer_id),
@@ -331,9 +636,13 @@ def check_order_status(
                     }
                     for order in orders
                 ],
+                "has_more": has_more,
+                "next_before_order_id": str(orders[-1]["OrderId"]) if has_more else None,
             }
 
 
+@offload_to_db
+@cached_catalog_read
 @tool
 def search_products_recommendations(config: RunnableConfig) -> Dict[str, str]:
     """Searches for product recommendations for the customer."""
@@ -343,90 +652,77 @@ def search_products_recommendations(config: RunnableConfig) -> Dict[str, str]:
     if not customer_id:
         raise ValueError("No customer ID configured.")
 
-    with db_manager.get_connection() as conn:
-        cursor = conn.cursor()
-
-        # Get customer's previous purchases
-        cursor.execute(
-            """
-            SELECT DISTINCT p.Category
-            FROM orders o
-            JOIN orders_details od ON o.OrderId = od.OrderId
-            JOIN products p ON od.ProductId = p.ProductId
-            WHERE o.CustomerId = ?
-            ORDER BY o.OrderDate DESC
-            LIMIT 3
-        """,
-            (customer_id,),
-        )
-
-        favorite_categories = cursor.fetchall()
+    # Ranked from co-purchases and the customer's category affinity
+    recommendations = get_recommender().recommend(customer_id, k=5)
+
+    return {
+        "status": "success",
+        "customer_id": str(customer_id),
+        "recommendations": [
+            {
+                "product_id": str(product["ProductId"]),
+                "name": product["ProductName"],
+                "category": product["Category"],
+                "description": product["Description"],
+                "price": float(product["Price"]),
+                "stock": product["Quantity"],
+                "image_url": product["ImageUrl"],
+            }
+            for product in recommendations
+        ],
+    }
 
-        if not favorite_categories:
-            # If no purchase history, recommend popular products
-            cursor.execute(
-                """
-                SELECT 
-                    ProductId,
-                    ProductName,
-                    Category,
-                    Description,
-                    Price,
-                    Quantity,
-                    ImageUrl
-                FROM products
-                WHERE Quantity > 0
-                ORDER BY RANDOM()
-                LIMIT 5
-            """
-            )
-        else:
-            # Recommend products from favorite categories
-            placeholders = ",".join("?" * len(favorite_categories))
-            categories = [cat["Category"] for cat in favorite_categories]
 
-            cursor.execute(
-                f"""
-                SELECT 
-                    ProductId,
-                    ProductName,
-                    Category,
-                    Description,
-                    Price,
-                    Quantity,
-                    ImageUrl
-                FROM products
-                WHERE Category IN ({placeholders})
-                AND Quantity > 0
-                ORDER BY RANDOM()
-                LIMIT 5
-            """,
-                categories,
-            )
+def _validate_support_request(
+    full_name: str, email: str, phone: str
+) -> Optional[Dict[str, Any]]:
+    """Returns an error response for invalid contact details, or None."""
+    if not full_name or len(full_name.strip()) < 2:
+        return {
+            "status": "error",
+            "message": "Please provide a valid name (at least 2 characters)."
+        }
 
-        recommendations = cursor.fetchall()
+    # Basic email validation using regex
+    email_pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
+    if not re.match(email_pattern, email or ""):
+        return {
+            "status": "error",
+            "message": "Please provide a valid email address."
+        }
 
+    # Basic phone validation - allowing various formats
+    phone_pattern = r'^\+?[\d\s\(\)\-]{7,20}$'
+    if not re.match(phone_pattern, phone or ""):
         return {
-            "status": "success",
-            "customer_id": str(customer_id),
-            "recommendations": [
-                {
-                    "product_id": str(product["ProductId"]),
-                    "name": product["ProductName"],
-                    "category": product["Category"],
-                    "description": product["Description"],
-                    "price": float(product["Price"]),
-                    "stock": product["Quantity"],
-                    "image_url": product["ImageUrl"],
-                }
-                for product in recommendations
-            ],
+            "status": "error",
+            "message": "Please provide a valid phone number."
         }
+    return None
+
+
+def _support_request(
+    full_name: str, email: str, phone: str, config: RunnableConfig
+) -> Dict[str, Any]:
+    configuration = (config or {}).get("configurable", {})
+    customer_id = configuration.get("customer_id")
+    return {
+        "thread_id": str(configuration.get("thread_id") or customer_id or ""),
+        "customer_id": str(customer_id) if customer_id else None,
+        "full_name": full_name.strip(),
+        "email": email.strip(),
+        "phone": phone.strip(),
+    }
+
+
+SUPPORT_REQUEST_RECORDED = (
+    "Your request has been recorded. A customer service representative will contact you shortly."
+)
 
 
 @tool
 def request_human_representative(
-    full_name: str, email: str, phone: str
+    full_name: str, email: str, phone: str, *, config: RunnableConfig
 ) -> Dict[str, Any]:
     """
     Records a request from a customer who wants to speak with a human representative.
@@ -439,59 +735,49 @@ def request_human_representative(
     Returns:
         Dict[str, Any]: Status of the request
     """
-    # Validate inputs
-    if not full_name or len(full_name.strip()) < 2:
-        return {
-            "status": "error",
-            "message": "Please provide a valid name (at least 2 characters)."
-        }
-    
-    # Basic email validation using regex
-    email_pattern = r'^[\w\.-]+@[\w\.-]+\.\w+$'
-    if not re.match(email_pattern, email):
-        return {
-            "status": "error",
-            "message": "Please provide a valid email address."
-        }
-    
-    # Basic phone validation - allowing various formats
-    phone_pattern = r'^\+?[\d\s\(\)\-]{7,20}$'
-    if not re.match(phone_pattern, phone):
+    error = _validate_support_request(full_name, email, phone)
+    if error:
+        return error
+
+    # Requests from all sessions are committed in micro-batches by the writer
+    try:
+        result = get_support_writer().create_request(
+            _support_request(full_name, email, phone, config)
+        )
+    except Exception as e:
         return {
             "status": "error",
-            "message": "Please provide a valid phone number."
+            "message": f"Failed to record your request: {str(e)}",
         }
-    
-    # Save to CSV with timestamp to prevent overwriting
-    timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-    csv_path = "customer_support_requests.csv"
-    file_exists = os.path.isfile(csv_path)
-    download_path = f"support_request_{timestamp}.csv"
-    
+    return {
+        "status": "success",
+        "message": SUPPORT_REQUEST_RECORDED,
+        "request_id": result["request_id"],
+    }
+
+
+async def _arequest_human_representative(
+    full_name: str, email: str, phone: str, *, config: RunnableConfig
+) -> Dict[str, Any]:
+    """Async request_human_representative: awaits the group commit instead of blocking a thread."""
+    error = _validate_support_request(full_name, email, phone)
+    if error:
+        return error
+
     try:
-        # Append to the main history file
-        with open(csv_path, mode='a' if file_exists else 'w', newline='') as file:
-            writer = csv.writer(file)
-            if not file_exists:
-                writer.writerow(['Name', 'Email', 'Phone', 'Timestamp'])
-            writer.writerow([full_name, email, phone, datetime.now().isoformat()])
-        
-        # Create a separate file for download
-        with open(download_path, mode='w', newline='') as file:
-            writer = csv.writer(file)
-            writer.writerow(['Name', 'Email', 'Phone', 'Timestamp'])
-            writer.writerow([full_name, email, phone, datetime.now().isoformat()])
-        
-        # Write a marker file that signals a download is ready
-        with open("download_ready.txt", "w") as f:
-            f.write(download_path)
-        
-        return {
-            "status": "success",
-            "message": "Your request has been recorded. A customer service representative will contact you shortly."
-        }
+        result = await get_support_writer().acreate_request(
+            _support_request(full_name, email, phone, config)
+        )
     except Exception as e:
         return {
             "status": "error",
             "message": f"Failed to record your request: {str(e)}",
         }
+    return {
+        "status": "success",
+        "message": SUPPORT_REQUEST_RECORDED,
+        "request_id": result["request_id"],
+    }
+
+
+request_human_representative.coroutine = _arequest_human_representative
@@ -1,24 +1,131 @@
-from langchain_core.messages import ToolMessage
-from langchain_core.runnables import RunnableLambda
+from typing import TYPE_CHECKING, Any, Collection, List, Optional, Sequence
+
+from langchain_core.messages import AIMessage, AnyMessage, ToolMessage
+from langchain_core.runnables import RunnableConfig, RunnableLambda
 from langgraph.prebuilt import ToolNode
 
+if TYPE_CHECKING:
+    from virtual_sales_agent.payloads import PayloadCompactor
+
+
+def pending_tool_calls(
+    messages: Sequence[AnyMessage], tool_names: Optional[Collection[str]] = None
+) -> List[dict]:
+    """
+    Returns the tool calls of the last assistant message that have no result yet.
+
+    Args:
+        messages (Sequence[AnyMessage]): The conversation messages
+        tool_names (Collection[str], optional): Only return calls to these tools
+
+    Returns:
+        List[dict]: The unanswered tool calls, in the order they were made.
+    """
+    answered = set()
+    for message in reversed(messages):
+        if isinstance(message, ToolMessage):
+            answered.add(message.tool_call_id)
+        elif isinstance(message, AIMessage):
+            return [
+                tc
+                for tc in message.tool_calls
+                if tc["id"] not in answered
+                and (tool_names is None or tc["name"] in tool_names)
+            ]
+        else:
+            break
+    return []
+
+
+class PartitionedToolNode(ToolNode):
+    """
+    ToolNode that only runs the pending tool calls addressed to its own tools.
+
+    The assistant may request several tools in one message; the graph routes
+    that message through more than one tool node, and each node picks up its
+    share of the calls. Calls within a node run concurrently (a thread pool
+    when invoked synchronously, asyncio.gather otherwise).
+
+    With a PayloadCompactor, the results of the tools it knows are replaced
+    by their compact encoding before they are added to the conversation.
 
-def handle_tool_error(state) -> dict:
-    error = state.get("error")
-    tool_calls = state["messages"][-1].tool_calls
-    return {
-        "messages": [
-            ToolMessage(
-                content=f"Error: {repr(error)}\n please fix your mistakes.",
-                tool_call_id=tc["id"],
-            )
-            for tc in tool_calls
+    Given `other_tool_names`, the node also picks up calls to tools that no
+    node has (e.g. a name the model made up) and answers them with the
+    usual invalid-tool error, so every call gets a result.
+    """
+
+    def __init__(
+        self,
+        tools: Sequence[Any],
+        payloads: Optional["PayloadCompactor"] = None,
+        other_tool_names: Optional[Collection[str]] = None,
+        **kwargs: Any,
+    ):
+        super().__init__(tools, **kwargs)
+        self.payloads = payloads
+        self.other_tool_names = other_tool_names
+
+    def owns(self, tool_name: str) -> bool:
+        """Whether this node answers calls to the tool."""
+        if tool_name in self.tools_by_name:
+            return True
+        return self.other_tool_names is not None and tool_name not in self.other_tool_names
+
+    def _compact(self, message: Any) -> Any:
+        if (
+            self.payloads is not None
+            and isinstance(message, ToolMessage)
+            and message.status != "error"
+            and message.name in self.payloads
+        ):
+            message.content = self.payloads.compact(message.name, message.content)
+        return message
+
+    def _run_one(self, call: dict, input_type: str, config: RunnableConfig) -> Any:
+        return self._compact(super()._run_one(call, input_type, config))
+
+    async def _arun_one(self, call: dict, input_type: str, config: RunnableConfig) -> Any:
+        return self._compact(await super()._arun_one(call, input_type, config))
+
+    def _parse_input(self, input: Any, store: Any):
+        if isinstance(input, list):
+            input_type, messages = "list", input
+        elif isinstance(input, dict) and input.get(self.messages_key):
+            input_type, messages = "dict", input[self.messages_key]
+        elif getattr(input, self.messages_key, None):
+            input_type, messages = "dict", getattr(input, self.messages_key)
+        else:
+            raise ValueError("No message found in input")
+
+        tool_calls = [
+            self._inject_tool_args(call, input, store)
+            for call in pending_tool_calls(messages)
+            if self.owns(call["name"])
         ]
-    }
+        return tool_calls, input_type
+
+
+def create_tool_node_with_fallback(
+    tools: list,
+    payloads: Optional["PayloadCompactor"] = None,
+    other_tool_names: Optional[Collection[str]] = None,
+) -> dict:
+    node = PartitionedToolNode(tools, payloads=payloads, other_tool_names=other_tool_names)
 
+    def handle_tool_error(state) -> dict:
+        error = state.get("error")
+        return {
+            "messages": [
+                ToolMessage(
+                    content=f"Error: {repr(error)}\n please fix your mistakes.",
+                    tool_call_id=tc["id"],
+                )
+                for tc in pending_tool_calls(state["messages"])
+                if node.owns(tc["name"])
+            ]
+        }
 
-def create_tool_node_with_fallback(tools: list) -> dict:
-    return ToolNode(tools).with_fallbacks(
+    return node.with_fallbacks(
         [RunnableLambda(handle_tool_error)], exception_key="error"
     )
 